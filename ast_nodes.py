@@ -0,0 +1,234 @@
+from typing import Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+
+# Nós da árvore sintática (AST) do Quokka.
+# Cada nó guarda a linha do token que o originou. Os nós usam identidade
+# (eq=False) para poderem servir de chave em caches dos motores de execução.
+
+class Node:
+    """Classe base de todos os nós da AST"""
+    line = 0
+
+
+# ---------------------------------------------------------------------------
+# Expressões
+# ---------------------------------------------------------------------------
+
+@dataclass(eq=False)
+class Literal(Node):
+    """Valor literal: número, string, key, true, false ou null"""
+    value: Any
+    line: int = 0
+
+@dataclass(eq=False)
+class Name(Node):
+    """Leitura de variável"""
+    name: str
+    line: int = 0
+
+@dataclass(eq=False)
+class ArrayLiteral(Node):
+    """Array literal: { a . b . c } (cria um novo array a cada avaliação)"""
+    elements: List[Node]
+    line: int = 0
+
+@dataclass(eq=False)
+class DictLiteral(Node):
+    """Dicionário literal: { 'a' = 1 . 'b' = 2 }"""
+    pairs: List[Tuple[str, Node]]
+    line: int = 0
+
+@dataclass(eq=False)
+class BinaryOp(Node):
+    """Operação binária aritmética ou de comparação (+, -, *, /, %, **, ==, !=, >, <, >=, <=)"""
+    op: str
+    left: Node
+    right: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class Logical(Node):
+    """Operação lógica (&&, ||) - ambos os lados são sempre avaliados"""
+    op: str
+    left: Node
+    right: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class Index(Node):
+    """Acesso a array: obj[index]"""
+    obj: Node
+    index: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class KeyAccess(Node):
+    """Acesso a dicionário: obj{key}"""
+    obj: Node
+    key: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class Call(Node):
+    """Chamada de função definida pelo usuário ou de biblioteca"""
+    name: str
+    args: List[Node]
+    line: int = 0
+
+@dataclass(eq=False)
+class Conversion(Node):
+    """Função de conversão nativa: to_int(), to_float(), to_bool(), to_str()"""
+    name: str
+    arg: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class Prompt(Node):
+    """Entrada do usuário: prompt(mensagem)"""
+    message: Node
+    line: int = 0
+
+
+# ---------------------------------------------------------------------------
+# Declarações
+# ---------------------------------------------------------------------------
+
+@dataclass(eq=False)
+class Block(Node):
+    """Sequência de declarações entre chaves"""
+    statements: List[Node] = field(default_factory=list)
+    line: int = 0
+
+@dataclass(eq=False)
+class Print(Node):
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class If(Node):
+    """if/else if/else - orelse é um Block, outro If ou None"""
+    condition: Node
+    body: Block
+    orelse: Optional[Node] = None
+    line: int = 0
+
+@dataclass(eq=False)
+class While(Node):
+    condition: Node
+    body: Block
+    line: int = 0
+
+@dataclass(eq=False)
+class Each(Node):
+    """each($colecao : item) { ... }"""
+    collection: str
+    item: str
+    body: Block
+    line: int = 0
+
+@dataclass(eq=False)
+class Break(Node):
+    line: int = 0
+
+@dataclass(eq=False)
+class Continue(Node):
+    line: int = 0
+
+@dataclass(eq=False)
+class Yield(Node):
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class Assign(Node):
+    """var = valor"""
+    name: str
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class IndexAssign(Node):
+    """var[index] = valor"""
+    name: str
+    index: Node
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class KeyAssign(Node):
+    """var{key} = valor"""
+    name: str
+    key: Node
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class CompoundAssign(Node):
+    """var += valor / var -= valor"""
+    name: str
+    op: str
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class IncDec(Node):
+    """var++ / var--"""
+    name: str
+    op: str
+    line: int = 0
+
+@dataclass(eq=False)
+class Append(Node):
+    """colecao << valor"""
+    name: str
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class AppendPair(Node):
+    """dict << ('chave' = valor)"""
+    name: str
+    key: str
+    value: Node
+    line: int = 0
+
+@dataclass(eq=False)
+class ExprStatement(Node):
+    """Expressão usada como declaração (chamada de função sem atribuição)"""
+    expr: Node
+    line: int = 0
+
+
+# ---------------------------------------------------------------------------
+# Estrutura do programa
+# ---------------------------------------------------------------------------
+
+@dataclass(eq=False)
+class Import(Node):
+    modules: List[str]
+    line: int = 0
+
+@dataclass(eq=False)
+class GlobalBlock(Node):
+    """global { ... } - valor None representa variável sem valor inicial"""
+    declarations: List[Tuple[str, Optional[Node]]]
+    line: int = 0
+
+@dataclass(eq=False)
+class FunctionDef(Node):
+    name: str
+    params: List[str]
+    body: Block
+    line: int = 0
+
+@dataclass(eq=False)
+class MainBlock(Node):
+    body: Block
+    line: int = 0
+
+@dataclass(eq=False)
+class Program(Node):
+    """Itens de topo na ordem em que aparecem no arquivo"""
+    body: List[Node] = field(default_factory=list)
+    line: int = 0
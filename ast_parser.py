@@ -0,0 +1,635 @@
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from lexer import Token, TokenView
+from runtime import QuokkaError, CONVERSION_FUNCTIONS
+from ast_nodes import (
+    Node, Literal, Name, ArrayLiteral, DictLiteral, BinaryOp, Logical, Index, KeyAccess,
+    Call, Conversion, Prompt, Block, Print, If, While, Each, Break, Continue, Yield,
+    Assign, IndexAssign, KeyAssign, CompoundAssign, IncDec, Append, AppendPair,
+    ExprStatement, Import, GlobalBlock, FunctionDef, MainBlock, Program,
+)
+
+
+class LazyFunctionDef(FunctionDef):
+    """
+    Função de biblioteca cujo corpo só é analisado no primeiro acesso a body.
+
+    Nome e parâmetros são conhecidos desde a importação; tokens é a visão dos
+    tokens do corpo, de '{' a '}'. Depois de analisado, o Block fica no
+    próprio objeto e os acessos seguintes não têm custo extra.
+    """
+
+    def __init__(self, name: str, params: List[str], tokens: TokenView, line: int = 0):
+        self.name = name
+        self.params = params
+        self.tokens = tokens
+        self.line = line
+
+    @cached_property
+    def body(self) -> Block:
+        return QuokkaParser(self.tokens)._parse_braced_block()
+
+    @property
+    def materialized(self) -> bool:
+        """Indica se o corpo já foi analisado"""
+        return "body" in self.__dict__
+
+
+class QuokkaParser:
+    """
+    Transforma a lista de tokens do QuokkaLexer em uma AST.
+
+    A gramática é a mesma reconhecida pelo interpretador por tokens
+    (QuokkaInterpreter com engine="tokens"), mas a análise acontece uma única vez:
+    loops e corpos de função nunca são re-analisados durante a execução.
+    """
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.current = 0
+
+    # ------------------------------------------------------------------
+    # Estrutura do programa
+    # ------------------------------------------------------------------
+
+    def parse_program(self) -> Program:
+        """Analisa um programa completo (import, global, fun e main)"""
+        program = Program(line=1)
+        while not self._is_at_end():
+            if self._check_keyword("import"):
+                program.body.append(self._parse_import())
+            elif self._check_keyword("global"):
+                program.body.append(self._parse_global_block())
+            elif self._check_keyword("fun"):
+                program.body.append(self._parse_function())
+            elif self._check_keyword("main"):
+                program.body.append(self._parse_main())
+            else:
+                self._advance()  # Pula tokens não reconhecidos
+        return program
+
+    def index_library(self) -> Program:
+        """
+        Índice de um módulo de biblioteca: imports e cabeçalhos das funções.
+
+        Os corpos são apenas pulados (pelo par de delimitadores do TokenView)
+        e viram LazyFunctionDef, analisadas só quando usadas pela primeira vez.
+        """
+        library = Program(line=1)
+        while not self._is_at_end():
+            if self._check_keyword("import"):
+                library.body.append(self._parse_import())
+            elif self._check_keyword("fun"):
+                line, func_name, params = self._parse_function_header()
+                start = self.current
+                self._consume_symbol("{")
+                end = self.tokens.matching_delimiter(start)
+                if end < 0:
+                    raise QuokkaError(f"Esperado '}}' no fim da função '{func_name}'")
+                library.body.append(LazyFunctionDef(func_name, params, self.tokens[start:end + 1], line))
+                self.current = end + 1
+            else:
+                self._advance()
+        return library
+
+    def _parse_import(self) -> Import:
+        """Parse: import { "core" . "utils" }"""
+        line = self._peek().line
+        self._consume_keyword("import")
+        self._consume_symbol("{")
+
+        modules = []
+        while not self._check_symbol("}") and not self._is_at_end():
+            if self._check_type("STRING"):
+                modules.append(self._advance().value)
+            else:
+                self._advance()
+
+        self._consume_symbol("}")
+        return Import(modules, line)
+
+    def _parse_global_block(self) -> GlobalBlock:
+        """Analisa o bloco global"""
+        line = self._peek().line
+        self._consume_keyword("global")
+        self._consume_symbol("{")
+
+        declarations = []
+        while not self._check_symbol("}") and not self._is_at_end():
+            if self._check_type("IDENTIFIER"):
+                var_name = self._advance().value
+
+                if self._check_ooperator("="):
+                    self._advance()  # consome '='
+                    declarations.append((var_name, self._parse_expression()))
+                else:
+                    # Variável sem valor inicial (null)
+                    declarations.append((var_name, None))
+            else:
+                self._advance()
+
+        self._consume_symbol("}")
+        return GlobalBlock(declarations, line)
+
+    def _parse_function(self) -> FunctionDef:
+        """Analisa definição de função"""
+        line, func_name, params = self._parse_function_header()
+        body = self._parse_braced_block()
+        return FunctionDef(func_name, params, body, line)
+
+    def _parse_function_header(self) -> Tuple[int, str, List[str]]:
+        """Analisa 'fun nome(parâmetros)' e devolve (linha, nome, parâmetros)"""
+        line = self._peek().line
+        self._consume_keyword("fun")
+
+        # Nome da função (pode ter pontos: calcular.imc)
+        if not self._check_type("IDENTIFIER"):
+            raise QuokkaError("Esperado nome da função")
+
+        func_name = self._advance().value
+        while self._check_ooperator("."):
+            self._advance()  # consome '.'
+            if not self._check_type("IDENTIFIER"):
+                raise QuokkaError("Esperado nome após '.' em função")
+            func_name += "." + self._advance().value
+
+        # Parâmetros da função
+        self._consume_symbol("(")
+
+        params = []
+        if not self._check_symbol(")"):
+            while True:
+                if not self._check_type("IDENTIFIER"):
+                    raise QuokkaError("Esperado nome do parâmetro")
+
+                params.append(self._advance().value)
+
+                if self._check_symbol(","):
+                    self._advance()
+                    continue
+                elif self._check_symbol(")"):
+                    break
+                else:
+                    raise QuokkaError("Esperado ',' ou ')' em parâmetros")
+
+        self._consume_symbol(")")
+        return line, func_name, params
+
+    def _parse_main(self) -> MainBlock:
+        """Analisa o bloco main"""
+        line = self._peek().line
+        self._consume_keyword("main")
+        return MainBlock(self._parse_braced_block(), line)
+
+    # ------------------------------------------------------------------
+    # Declarações
+    # ------------------------------------------------------------------
+
+    def _parse_braced_block(self) -> Block:
+        """Analisa { declarações }"""
+        line = self._peek().line
+        self._consume_symbol("{")
+        block = self._parse_block(line)
+        self._consume_symbol("}")
+        return block
+
+    def _parse_block(self, line: int = 0) -> Block:
+        """Analisa declarações até o '}' que fecha o bloco"""
+        statements = []
+        while not self._check_symbol("}") and not self._is_at_end():
+            statement = self._parse_statement()
+            if statement is not None:
+                statements.append(statement)
+        return Block(statements, line)
+
+    def _parse_statement(self) -> Optional[Node]:
+        """Analisa uma declaração (None para tokens ignorados)"""
+        if self._check_keyword("print"):
+            line = self._advance().line
+            self._consume_symbol("(")
+            value = self._parse_expression()
+            self._consume_symbol(")")
+            return Print(value, line)
+        elif self._check_keyword("if"):
+            return self._parse_if()
+        elif self._check_keyword("while"):
+            return self._parse_while()
+        elif self._check_keyword("yield"):
+            line = self._advance().line
+            self._consume_symbol("(")
+            value = self._parse_expression()
+            self._consume_symbol(")")
+            return Yield(value, line)
+        elif self._check_keyword("each"):
+            return self._parse_each()
+        elif self._check_keyword("break"):
+            return Break(self._advance().line)
+        elif self._check_keyword("continue"):
+            return Continue(self._advance().line)
+        elif self._check_type("IDENTIFIER"):
+            return self._parse_assignment_or_function_call()
+        else:
+            self._advance()
+            return None
+
+    def _parse_if(self) -> If:
+        """Analisa if com suporte a else if / else"""
+        line = self._peek().line
+        self._consume_keyword("if")
+        self._consume_symbol("(")
+        condition = self._parse_expression()
+        self._consume_symbol(")")
+        body = self._parse_braced_block()
+
+        orelse = None
+        if self._check_keyword("else"):
+            self._advance()  # consome 'else'
+            if self._check_keyword("if"):
+                orelse = self._parse_if()
+            else:
+                orelse = self._parse_braced_block()
+
+        return If(condition, body, orelse, line)
+
+    def _parse_while(self) -> While:
+        """Sintaxe: while(condição) { instruções }"""
+        line = self._peek().line
+        self._consume_keyword("while")
+        self._consume_symbol("(")
+        condition = self._parse_expression()
+        self._consume_symbol(")")
+        return While(condition, self._parse_braced_block(), line)
+
+    def _parse_each(self) -> Each:
+        """Sintaxe: each($coleção : item) { instruções }"""
+        line = self._peek().line
+        self._consume_keyword("each")
+        self._consume_symbol("(")
+
+        if not self._check_ooperator("$"):
+            raise QuokkaError("Esperado '$' antes da coleção em each")
+        self._advance()  # consome $
+
+        if not self._check_type("IDENTIFIER"):
+            raise QuokkaError("Esperado nome da coleção após '$' em each")
+        collection_name = self._advance().value
+
+        self._consume_ooperator(":")
+
+        if not self._check_type("IDENTIFIER"):
+            raise QuokkaError("Esperado nome da variável de iteração em each")
+        item_var_name = self._advance().value
+
+        self._consume_symbol(")")
+        return Each(collection_name, item_var_name, self._parse_braced_block(), line)
+
+    def _parse_assignment_or_function_call(self) -> Optional[Node]:
+        """Analisa atribuição de variável ou chamada de função"""
+        line = self._peek().line
+        var_name = self._parse_dotted_name()
+
+        if self._check_ooperator("="):
+            self._advance()  # =
+            return Assign(var_name, self._parse_expression(), line)
+
+        elif self._check_doperator("+=") or self._check_doperator("-="):
+            operator = self._advance().value
+            return CompoundAssign(var_name, operator, self._parse_expression(), line)
+
+        elif self._check_doperator("<<"):
+            self._advance()  # <<
+            # Sintaxe de dicionário: dict << ('chave' = valor)
+            if (self._check_symbol("(") and self._check_type_at(1, "KEY")
+                    and self._check_ooperator_at(2, "=")):
+                self._advance()  # (
+                key = self._advance().value
+                self._consume_ooperator("=")
+                value = self._parse_expression()
+                self._consume_symbol(")")
+                return AppendPair(var_name, key, value, line)
+            return Append(var_name, self._parse_expression(), line)
+
+        elif self._check_doperator("++") or self._check_doperator("--"):
+            return IncDec(var_name, self._advance().value, line)
+
+        elif self._check_symbol("["):
+            # Atribuição a elemento: var[index] = value
+            self._advance()  # [
+            index = self._parse_expression()
+            self._consume_symbol("]")
+            self._consume_ooperator("=")
+            return IndexAssign(var_name, index, self._parse_expression(), line)
+
+        elif self._check_symbol("{"):
+            # Atribuição a chave: var{'key'} = value
+            self._advance()  # {
+            key = self._parse_expression()
+            self._consume_symbol("}")
+            self._consume_ooperator("=")
+            return KeyAssign(var_name, key, self._parse_expression(), line)
+
+        elif self._check_symbol("("):
+            # Chamada de função sem atribuição: minha_funcao()
+            return ExprStatement(Call(var_name, self._parse_arguments(), line), line)
+
+        # Apenas referência à variável (não faz nada)
+        return None
+
+    def _parse_dotted_name(self) -> str:
+        """Lê um identificador, juntando nomes compostos separados por '.'"""
+        name = self._advance().value
+        while self._check_ooperator("."):
+            self._advance()  # consome '.'
+            if not self._check_type("IDENTIFIER"):
+                raise QuokkaError("Esperado nome após '.' em função")
+            name += "." + self._advance().value
+        return name
+
+    def _parse_arguments(self) -> List[Node]:
+        """Analisa ( arg1, arg2, ... )"""
+        self._consume_symbol("(")
+
+        args = []
+        if not self._check_symbol(")"):
+            while True:
+                args.append(self._parse_expression())
+
+                if self._check_symbol(","):
+                    self._advance()
+                    continue
+                elif self._check_symbol(")"):
+                    break
+                else:
+                    raise QuokkaError("Esperado ',' ou ')' em argumentos da função")
+
+        self._consume_symbol(")")
+        return args
+
+    # ------------------------------------------------------------------
+    # Expressões (mesma precedência do interpretador por tokens)
+    # ------------------------------------------------------------------
+
+    def _parse_expression(self) -> Node:
+        return self._parse_logical_or()
+
+    def _parse_logical_or(self) -> Node:
+        expr = self._parse_logical_and()
+        while self._check_doperator("||"):
+            line = self._advance().line
+            expr = Logical("||", expr, self._parse_logical_and(), line)
+        return expr
+
+    def _parse_logical_and(self) -> Node:
+        expr = self._parse_equality()
+        while self._check_doperator("&&"):
+            line = self._advance().line
+            expr = Logical("&&", expr, self._parse_equality(), line)
+        return expr
+
+    def _parse_equality(self) -> Node:
+        expr = self._parse_1comparison()
+        while self._check_doperator("==") or self._check_doperator("!="):
+            token = self._advance()
+            expr = BinaryOp(token.value, expr, self._parse_1comparison(), token.line)
+        return expr
+
+    def _parse_1comparison(self) -> Node:
+        """Operadores > e <"""
+        expr = self._parse_2comparison()
+        while self._match_ooperators([">", "<"]):
+            token = self._previous()
+            expr = BinaryOp(token.value, expr, self._parse_2comparison(), token.line)
+        return expr
+
+    def _parse_2comparison(self) -> Node:
+        """Operadores >= e <="""
+        expr = self._parse_addition()
+        while self._match_doperators([">=", "<="]):
+            token = self._previous()
+            expr = BinaryOp(token.value, expr, self._parse_addition(), token.line)
+        return expr
+
+    def _parse_addition(self) -> Node:
+        expr = self._parse_multiplication()
+        while self._match_ooperators(["+", "-"]):
+            token = self._previous()
+            expr = BinaryOp(token.value, expr, self._parse_multiplication(), token.line)
+        return expr
+
+    def _parse_multiplication(self) -> Node:
+        expr = self._parse_exponentiation()
+        while self._match_ooperators(["*", "/", "%"]):
+            token = self._previous()
+            expr = BinaryOp(token.value, expr, self._parse_exponentiation(), token.line)
+        return expr
+
+    def _parse_exponentiation(self) -> Node:
+        """Potenciação (right-associative): 2**3**2 = 2**(3**2)"""
+        expr = self._parse_primary()
+        if self._check_doperator("**"):
+            line = self._advance().line
+            expr = BinaryOp("**", expr, self._parse_exponentiation(), line)
+        return expr
+
+    def _parse_primary(self) -> Node:
+        """Analisa valores primários (literais, variáveis, estruturas, chamadas, etc.)"""
+        token = self._peek()
+        line = token.line
+
+        if self._check_type("INT"):
+            return Literal(int(self._advance().value), line)
+
+        if self._check_type("FLOAT"):
+            return Literal(float(self._advance().value), line)
+
+        if self._check_type("STRING") or self._check_type("KEY"):
+            return Literal(self._advance().value, line)
+
+        if self._check_keyword("true"):
+            self._advance()
+            return Literal(True, line)
+
+        if self._check_keyword("false"):
+            self._advance()
+            return Literal(False, line)
+
+        if self._check_keyword("null"):
+            self._advance()
+            return Literal(None, line)
+
+        if self._check_keyword("prompt"):
+            self._advance()
+            self._consume_symbol("(")
+            message = self._parse_expression()
+            self._consume_symbol(")")
+            return Prompt(message, line)
+
+        if self._check_symbol("{"):
+            return self._parse_data_structure()
+
+        if self._check_type("IDENTIFIER"):
+            if token.value in CONVERSION_FUNCTIONS and self._check_symbol_at(1, "("):
+                self._advance()
+                self._consume_symbol("(")
+                arg = self._parse_expression()
+                self._consume_symbol(")")
+                return Conversion(token.value, arg, line)
+
+            var_name = self._parse_dotted_name()
+
+            if self._check_symbol("("):
+                return Call(var_name, self._parse_arguments(), line)
+
+            expr = Name(var_name, line)
+            # Acessos encadeados a array/dicionário
+            while self._check_symbol("[") or self._check_symbol("{"):
+                if self._check_symbol("["):
+                    access_line = self._advance().line
+                    index = self._parse_expression()
+                    self._consume_symbol("]")
+                    expr = Index(expr, index, access_line)
+                else:
+                    access_line = self._advance().line
+                    key = self._parse_expression()
+                    self._consume_symbol("}")
+                    expr = KeyAccess(expr, key, access_line)
+            return expr
+
+        if self._check_symbol("("):
+            self._advance()  # (
+            expr = self._parse_expression()
+            self._consume_symbol(")")
+            return expr
+
+        raise QuokkaError(f"Expressão inválida: {self._peek().value}")
+
+    def _parse_data_structure(self) -> Node:
+        """Analisa arrays e dicionários Quokka"""
+        line = self._peek().line
+        self._consume_symbol("{")
+
+        if self._check_symbol("}"):
+            # Array/dicionário vazio
+            self._advance()
+            return ArrayLiteral([], line)
+
+        # É dicionário se começa com uma key seguida de '='
+        if self._check_type("KEY") and self._check_ooperator_at(1, "="):
+            return self._parse_dictionary(line)
+        return self._parse_array(line)
+
+    def _parse_array(self, line: int) -> ArrayLiteral:
+        """Analisa um array Quokka: { item1 . item2 . item3 }"""
+        elements = []
+        while not self._check_symbol("}") and not self._is_at_end():
+            elements.append(self._parse_expression())
+
+            if self._check_ooperator("."):
+                self._advance()  # consome '.'
+            elif not self._check_symbol("}"):
+                raise QuokkaError("Esperado '.' ou '}' em array")
+
+        self._consume_symbol("}")
+        return ArrayLiteral(elements, line)
+
+    def _parse_dictionary(self, line: int) -> DictLiteral:
+        """Analisa um dicionário Quokka: { 'key1' = value1 . 'key2' = value2 }"""
+        pairs = []
+        while not self._check_symbol("}") and not self._is_at_end():
+            if not self._check_type("KEY"):
+                raise QuokkaError("Esperada chave (com aspas simples) em dicionário")
+
+            key = self._advance().value
+            self._consume_ooperator("=")
+            pairs.append((key, self._parse_expression()))
+
+            if self._check_ooperator("."):
+                self._advance()  # consome '.'
+            elif not self._check_symbol("}"):
+                raise QuokkaError("Esperado '.' ou '}' em dicionário")
+
+        self._consume_symbol("}")
+        return DictLiteral(pairs, line)
+
+    # ------------------------------------------------------------------
+    # Métodos de controle de tokens
+    # ------------------------------------------------------------------
+
+    def _advance(self) -> Token:
+        if not self._is_at_end():
+            self.current += 1
+            return self.tokens[self.current - 1]
+        return self.tokens[-1]
+
+    def _peek(self) -> Token:
+        if self.current < len(self.tokens):
+            return self.tokens[self.current]
+        return self.tokens[-1]
+
+    def _previous(self) -> Token:
+        if 0 <= self.current - 1 < len(self.tokens):
+            return self.tokens[self.current - 1]
+        return self.tokens[0]
+
+    def _is_at_end(self) -> bool:
+        return self.current >= len(self.tokens)
+
+    def _check_type(self, token_type: str) -> bool:
+        if self._is_at_end():
+            return False
+        return self.tokens[self.current].type == token_type
+
+    def _check_type_at(self, offset: int, token_type: str) -> bool:
+        position = self.current + offset
+        return position < len(self.tokens) and self.tokens[position].type == token_type
+
+    def _check_keyword(self, keyword: str) -> bool:
+        return self._check_type("KEYWORD") and self.tokens[self.current].value == keyword
+
+    def _check_symbol(self, symbol: str) -> bool:
+        return self._check_type("SYMBOL") and self.tokens[self.current].value == symbol
+
+    def _check_symbol_at(self, offset: int, symbol: str) -> bool:
+        return self._check_type_at(offset, "SYMBOL") and self.tokens[self.current + offset].value == symbol
+
+    def _check_doperator(self, doperator: str) -> bool:
+        return self._check_type("DOPERATOR") and self.tokens[self.current].value == doperator
+
+    def _check_ooperator(self, ooperator: str) -> bool:
+        return self._check_type("OOPERATOR") and self.tokens[self.current].value == ooperator
+
+    def _check_ooperator_at(self, offset: int, ooperator: str) -> bool:
+        return self._check_type_at(offset, "OOPERATOR") and self.tokens[self.current + offset].value == ooperator
+
+    def _match_doperators(self, doperators: List[str]) -> bool:
+        for doperator in doperators:
+            if self._check_doperator(doperator):
+                self._advance()
+                return True
+        return False
+
+    def _match_ooperators(self, ooperators: List[str]) -> bool:
+        for ooperator in ooperators:
+            if self._check_ooperator(ooperator):
+                self._advance()
+                return True
+        return False
+
+    def _consume_keyword(self, keyword: str):
+        if self._check_keyword(keyword):
+            self._advance()
+        else:
+            raise QuokkaError(f"Esperado '{keyword}', encontrado '{self._peek().value}'")
+
+    def _consume_symbol(self, symbol: str):
+        if self._check_symbol(symbol):
+            self._advance()
+        else:
+            raise QuokkaError(f"Esperado '{symbol}', encontrado '{self._peek().value}'")
+
+    def _consume_ooperator(self, ooperator: str):
+        if self._check_ooperator(ooperator):
+            self._advance()
+        else:
+            raise QuokkaError(f"Esperado '{ooperator}', encontrado '{self._peek().value}'")
@@ -0,0 +1,104 @@
+"""
+Compara as funções de collections em Quokka (.qk) com as intrínsecas nativas.
+
+Uso: python bench/collections_intrinsics.py [--size N] [--engine MOTOR] [--repeat N]
+
+O array de teste (e um dicionário com o mesmo número de chaves) é definido
+direto no ambiente global, sem loop em Quokka. Cada função roda uma vez por
+medida, com e sem intrínsecas, e os resultados são comparados.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpreter import QuokkaInterpreter, QuokkaArray, QuokkaDict, QuokkaError, quokka_to_string
+
+CALLS = [
+    "len(dados)", "sum(dados)", "max(dados)", "min(dados)", "contains(dados, -1)",
+    "reverse(dados)", "range(1, tamanho)", "merge(dados, dados)", "keys(tabela)", "values(tabela)",
+]
+
+
+def run_call(call: str, size: int, engine: str, native: bool, module: str = "collections"):
+    """
+    Executa 'r = <call>' e retorna (segundos, r como texto) ou (None, mensagem de erro).
+    Se call for um loop each, ele é executado como está (e deve atribuir r).
+    """
+    statement = call if call.startswith("each") else f"r = {call}"
+    interpreter = QuokkaInterpreter(engine=engine, use_intrinsics=native)
+    interpreter.global_env.define("dados", QuokkaArray([(i * 7919) % 100003 for i in range(size)]))
+    interpreter.global_env.define("tabela", QuokkaDict({f"k{i}": i for i in range(size)}))
+    interpreter.global_env.define("tamanho", size)
+    program = interpreter._parse_source(
+        "program", code=f'import {{ "{module}" }}\nmain{{\n    r = null\n    {statement}\n}}\n'
+    )
+    start = time.perf_counter()
+    try:
+        interpreter._run_program(program)
+    except QuokkaError as e:
+        return None, e.message
+    elapsed = time.perf_counter() - start
+    return elapsed, quokka_to_string(interpreter.global_env.get("r"))
+
+
+# Diferença relativa aceita entre os resultados em ponto flutuante (approximate)
+RELATIVE_TOLERANCE = 1e-9
+
+
+def same_result(qk_output: str, native_output: str, approximate: bool) -> bool:
+    """Resultados iguais; com approximate, números comparados com RELATIVE_TOLERANCE"""
+    if qk_output == native_output:
+        return True
+    if not approximate:
+        return False
+    try:
+        return math.isclose(float(qk_output), float(native_output), rel_tol=RELATIVE_TOLERANCE)
+    except ValueError:
+        return False
+
+
+def compare(calls, module: str, description: str, approximate=()):
+    """
+    Lê os argumentos da linha de comando e imprime a tabela .qk x nativa para calls.
+    As chamadas em approximate (séries em ponto flutuante no .qk) são comparadas
+    com tolerância relativa; as demais precisam dar o mesmo resultado.
+    """
+    arg_parser = argparse.ArgumentParser(description=description)
+    arg_parser.add_argument("--size", type=int, default=100_000, help="elementos do array de teste")
+    arg_parser.add_argument("--engine", default="ast",
+                            choices=[engine for engine in QuokkaInterpreter.ENGINES if engine != "tokens"])
+    arg_parser.add_argument("--repeat", type=int, default=3, help="execuções por medida (usa a melhor)")
+    args = arg_parser.parse_args()
+    # Bibliotecas são procuradas a partir do diretório atual
+    os.chdir(ROOT)
+
+    print(f"Array de {args.size} elementos, motor {args.engine}")
+    width = max(len(call) for call in calls)
+    print(f"  {'chamada':{width}} {'.qk':>11} {'nativa':>11} {'speedup':>9}")
+    for call in calls:
+        results = {}
+        for native in (False, True):
+            best, output = None, ""
+            for _ in range(args.repeat):
+                elapsed, output = run_call(call, args.size, args.engine, native, module)
+                if elapsed is None:
+                    break
+                best = elapsed if best is None else min(best, elapsed)
+            results[native] = (best, output)
+
+        (qk_time, qk_output), (native_time, native_output) = results[False], results[True]
+        native_text = f"{native_time * 1000:9.2f}ms"
+        if qk_time is None:
+            print(f"  {call:{width}} {'erro':>11} {native_text}            .qk: {qk_output}")
+            continue
+        status = "ok" if same_result(qk_output, native_output, call in approximate) else "DIFERENTE"
+        print(f"  {call:{width}} {qk_time * 1000:9.1f}ms {native_text} {qk_time / native_time:8.0f}x  {status}")
+
+
+if __name__ == "__main__":
+    compare(CALLS, "collections", "Intrínsecas nativas de collections vs. versões .qk")
@@ -0,0 +1,73 @@
+"""
+Compara o tempo de execução dos motores do QuokkaInterpreter.
+
+Uso: python bench/compare_engines.py [arquivo.qk ...] [--repeat N]
+
+Sem arquivos, roda as cargas com muitos loops de bench/. Cada motor executa o
+mesmo programa; as saídas são comparadas e o speedup é relativo ao motor "tokens".
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpreter import QuokkaInterpreter
+
+DEFAULT_WORKLOADS = ["loops.qk", "each_dicts.qk", "if_chains.qk", "nested_scopes.qk"]
+
+
+def run_once(engine: str, code: str):
+    """Executa o programa uma vez e retorna (segundos, saída)"""
+    output = io.StringIO()
+    interpreter = QuokkaInterpreter(engine=engine)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(code)
+    return time.perf_counter() - start, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compara os motores de execução do Quokka")
+    arg_parser.add_argument("files", nargs="*", help="programas .qk (padrão: cargas de bench/)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="execuções por motor (usa a melhor)")
+    arg_parser.add_argument("--engines", default=",".join(QuokkaInterpreter.ENGINES),
+                            help="motores separados por vírgula")
+    args = arg_parser.parse_args()
+
+    files = args.files or [os.path.join(ROOT, "bench", name) for name in DEFAULT_WORKLOADS]
+    engines = args.engines.split(",")
+    # Bibliotecas são procuradas a partir do diretório atual
+    os.chdir(ROOT)
+
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            code = f.read()
+
+        print(f"== {os.path.relpath(path, ROOT)}")
+        results = {}
+        for engine in engines:
+            best = None
+            for _ in range(args.repeat):
+                elapsed, output = run_once(engine, code)
+                best = elapsed if best is None else min(best, elapsed)
+            results[engine] = (best, output)
+
+        reference_output = results[engines[0]][1]
+        baseline = results["tokens"][0] if "tokens" in results else None
+        for engine in engines:
+            elapsed, output = results[engine]
+            speedup = f"{baseline / elapsed:6.1f}x" if baseline else "   -"
+            if "ERRO" in output:
+                status = output.strip().splitlines()[-1]
+            else:
+                status = "ok" if output == reference_output else "SAÍDA DIFERENTE"
+            print(f"  {engine:8} {elapsed * 1000:9.1f} ms  {speedup}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Mede código com muitas chamadas de função e saídas antecipadas.
+
+Uso: python bench/control_flow.py [--engines a,b,...] [--repeat N]
+
+- fib: fib recursivo, em que cada chamada termina com yield;
+- contains: contains de collections em Quokka (intrínsecas desligadas), que
+  sai do each com yield assim que encontra o item;
+- break: um each de 1000 itens interrompido com break na metade, repetido
+  em um while.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpreter import QuokkaInterpreter
+
+WORKLOADS = {
+    "fib": """
+fun fib(n) {
+    if(n < 2) {
+        yield(n)
+    }
+    yield(fib(n - 1) + fib(n - 2))
+}
+
+main{
+    print(fib(20))
+}
+""",
+    "contains": """
+import { "collections" }
+
+main{
+    dados = range(1, 50)
+    achados = 0
+    i = 0
+    while(i < 2000) {
+        if(contains(dados, i % 60)) {
+            achados++
+        }
+        i++
+    }
+    print(achados)
+}
+""",
+    "break": """
+import { "collections" }
+
+main{
+    dados = range(1, 1000)
+    total = 0
+    i = 0
+    while(i < 300) {
+        each($dados : valor) {
+            if(valor > 500) {
+                break
+            }
+            if(valor % 2 == 0) {
+                continue
+            }
+            total += valor
+        }
+        i++
+    }
+    print(total)
+}
+""",
+}
+
+
+def run_once(engine: str, code: str):
+    """Executa o programa uma vez e retorna (segundos, saída)"""
+    output = io.StringIO()
+    interpreter = QuokkaInterpreter(engine=engine, use_intrinsics=False)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(code)
+    return time.perf_counter() - start, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Chamadas de função, yield, break e continue")
+    arg_parser.add_argument("--engines", default=",".join(QuokkaInterpreter.ENGINES),
+                            help="motores separados por vírgula")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="execuções por medida (usa a melhor)")
+    args = arg_parser.parse_args()
+    # Bibliotecas são procuradas a partir do diretório atual
+    os.chdir(ROOT)
+
+    engines = args.engines.split(",")
+    print(f"  {'carga':9} " + " ".join(f"{engine:>9}" for engine in engines))
+    for name, code in WORKLOADS.items():
+        columns = []
+        outputs = set()
+        for engine in engines:
+            best = None
+            for _ in range(args.repeat):
+                elapsed, output = run_once(engine, code)
+                best = elapsed if best is None else min(best, elapsed)
+            outputs.add(output)
+            columns.append(f"{best * 1000:7.1f}ms")
+        status = "ok" if len(outputs) == 1 else "SAÍDAS DIFERENTES"
+        print(f"  {name:9} " + " ".join(columns) + f"  {status}")
+
+
+if __name__ == "__main__":
+    main()
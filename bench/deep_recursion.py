@@ -0,0 +1,90 @@
+"""
+Mede recursão profunda: chamadas aninhadas que não cabem na pilha do Python.
+
+Uso: python bench/deep_recursion.py [--engines a,b,...] [--depth N] [--repeat N]
+
+- soma: soma(n) = n + soma(n - 1), com N chamadas aninhadas ao mesmo tempo;
+- cauda: conta(n, acc) termina com yield(conta(...)), uma chamada em posição
+  de cauda: no motor "vm" cada chamada ocupa o quadro da anterior.
+
+O motor "vm" guarda os quadros no heap e chega a qualquer profundidade; os
+outros motores usam a pilha do Python e param com erro de recursão.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpreter import QuokkaInterpreter
+
+WORKLOADS = {
+    "soma": """
+fun soma(n) {
+    if(n == 0) {
+        yield(0)
+    }
+    yield(n + soma(n - 1))
+}
+
+main{
+    print(soma(DEPTH))
+}
+""",
+    "cauda": """
+fun conta(n, acc) {
+    if(n == 0) {
+        yield(acc)
+    }
+    yield(conta(n - 1, acc + n))
+}
+
+main{
+    print(conta(DEPTH, 0))
+}
+""",
+}
+
+
+def run_once(engine: str, code: str):
+    """Executa o programa uma vez e retorna (segundos, saída)"""
+    output = io.StringIO()
+    interpreter = QuokkaInterpreter(engine=engine, use_cache=False)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(code)
+    return time.perf_counter() - start, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Recursão profunda (quadros de chamada no heap)")
+    arg_parser.add_argument("--engines", default="vm", help="motores separados por vírgula (padrão: vm)")
+    arg_parser.add_argument("--depth", type=int, default=100_000, help="profundidade da recursão (padrão: 100000)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="execuções por medida (usa a melhor)")
+    args = arg_parser.parse_args()
+    os.chdir(ROOT)
+
+    expected = args.depth * (args.depth + 1) // 2
+    print(f"Profundidade: {args.depth} (resultado esperado: {expected})")
+    print(f"  {'carga':6} {'motor':8} {'tempo':>10} {'chamadas/s':>11}  resultado")
+    for name, template in WORKLOADS.items():
+        code = template.replace("DEPTH", str(args.depth))
+        for engine in args.engines.split(","):
+            best = None
+            for _ in range(args.repeat):
+                elapsed, output = run_once(engine, code)
+                best = elapsed if best is None else min(best, elapsed)
+            result = output.strip().splitlines()[0] if output.strip() else "-"
+            rate = f"{'-':>11}"
+            if result == str(expected):
+                result = "ok"
+                rate = f"{args.depth / best:11.0f}"
+            print(f"  {name:6} {engine:8} {best * 1000:8.1f}ms {rate}  {result[:70]}")
+
+
+if __name__ == "__main__":
+    main()
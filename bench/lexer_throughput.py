@@ -0,0 +1,87 @@
+"""
+Mede a vazão do lexer (tokens por segundo) em um arquivo .qk sintético grande.
+
+Uso: python bench/lexer_throughput.py [--size-mb N] [--repeat N] [--save arquivo.qk]
+
+O arquivo gerado imita os programas com grandes literais de dados no bloco
+global: arrays de números, dicionários com strings e keys, e algumas funções.
+São medidos tokenize() (lista completa) e iter_tokens() (consumo em fluxo).
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import QuokkaLexer
+
+
+def generate_source(size_bytes: int) -> str:
+    """Gera um programa Quokka com aproximadamente size_bytes caracteres"""
+    parts = ["# Arquivo sintético para medir o lexer\n", "global{\n"]
+    size = 0
+    block = 0
+    while size < size_bytes:
+        numbers = " . ".join(str((block * 31 + i) % 1000 - 500) for i in range(40))
+        records = " . ".join(
+            f"{{ 'id' = {block * 10 + i} . 'nome' = \"item {block}-{i}\" . 'preco' = {i}.{block % 100:02d} . 'ativo' = true }}"
+            for i in range(10)
+        )
+        chunk = f"    numeros{block} = {{ {numbers} }}\n    registros{block} = {{ {records} }}\n"
+        parts.append(chunk)
+        size += len(chunk)
+        block += 1
+    parts.append("}\n\n")
+    parts.append(
+        "fun soma(lista) {\n"
+        "    total = 0\n"
+        "    each($lista : n) {\n"
+        "        total += n\n"
+        "    }\n"
+        "    yield(total)\n"
+        "}\n\n"
+        "main{\n"
+        "    print(soma(numeros0))\n"
+        "}\n"
+    )
+    return "".join(parts)
+
+
+def measure(function, repeat: int):
+    """Executa function() repeat vezes e retorna (melhor tempo, resultado)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Mede a vazão do lexer do Quokka")
+    arg_parser.add_argument("--size-mb", type=float, default=4.0, help="tamanho do arquivo sintético (MB)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="execuções por medida (usa a melhor)")
+    arg_parser.add_argument("--save", help="grava o arquivo sintético neste caminho")
+    args = arg_parser.parse_args()
+
+    code = generate_source(int(args.size_mb * 1024 * 1024))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.write(code)
+
+    lexer = QuokkaLexer()
+    list_time, tokens = measure(lambda: lexer.tokenize(code), args.repeat)
+    stream_time, count = measure(lambda: sum(1 for _ in lexer.iter_tokens(code)), args.repeat)
+
+    print(f"Arquivo sintético: {len(code) / (1024 * 1024):.2f} MB, {len(tokens)} tokens")
+    for label, elapsed in (("tokenize()", list_time), ("iter_tokens()", stream_time)):
+        print(f"  {label:14} {elapsed * 1000:9.1f} ms  {count / elapsed / 1e6:6.2f} M tokens/s  "
+              f"{len(code) / elapsed / (1024 * 1024):6.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
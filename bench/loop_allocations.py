@@ -0,0 +1,115 @@
+"""
+Conta os objetos criados por iteração de loop em cada motor.
+
+Uso: python bench/loop_allocations.py [--iterations N] [--engines a,b,...]
+
+Roda um while e um each de N iterações (o corpo cria uma variável local a
+cada volta) e conta quantos escopos (Environment) e visões de tokens
+(TokenView) foram criados durante a execução. Com um escopo reaproveitado
+por loop, as duas contagens por iteração ficam em zero: o custo fixo de
+criar o escopo do loop some na divisão por N.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpreter import QuokkaInterpreter
+from lexer import TokenView
+from runtime import Environment
+
+PROGRAMS = {
+    "while": """
+main{{
+    i = 0
+    total = 0
+    while(i < {n}) {{
+        dobro = i * 2
+        total += dobro
+        i++
+    }}
+    print(total)
+}}
+""",
+    "each": """
+main{{
+    dados = {{ }}
+    i = 0
+    while(i < {n}) {{
+        dados << i
+        i++
+    }}
+    total = 0
+    each($dados : valor) {{
+        dobro = valor * 2
+        total += dobro
+    }}
+    print(total)
+}}
+""",
+}
+
+
+class _Counter:
+    """Substitui temporariamente o __init__ de uma classe para contar instâncias"""
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.count = 0
+
+    def __enter__(self):
+        original = self.original = self.cls.__init__
+
+        def counting_init(instance, *args, **kwargs):
+            self.count += 1
+            original(instance, *args, **kwargs)
+
+        self.cls.__init__ = counting_init
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cls.__init__ = self.original
+
+
+def measure(engine: str, code: str):
+    """Executa code e retorna (escopos criados, visões criadas, segundos)"""
+    interpreter = QuokkaInterpreter(engine=engine, use_cache=False)
+    program = interpreter._parse_source("tokens" if engine == "tokens" else "program", code=code)
+    with _Counter(Environment) as scopes, _Counter(TokenView) as views, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if engine == "tokens":
+            interpreter._load_tokens(program)
+            interpreter._parse_program()
+        else:
+            interpreter._run_program(program)
+        elapsed = time.perf_counter() - start
+    return scopes.count, views.count, elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Objetos criados por iteração de loop")
+    arg_parser.add_argument("--iterations", type=int, default=5000, help="iterações de cada loop (máximo 9999)")
+    arg_parser.add_argument("--engines", default=",".join(QuokkaInterpreter.ENGINES),
+                            help="motores separados por vírgula")
+    args = arg_parser.parse_args()
+    n = args.iterations
+
+    print(f"{n} iterações por loop")
+    print(f"  {'loop':6} {'motor':8} {'escopos/it':>10} {'visões/it':>10} {'µs/it':>8}")
+    for loop, template in PROGRAMS.items():
+        # O each precisa de um while para montar os dados: desconta as iterações dele
+        loops = 2 if loop == "each" else 1
+        for engine in args.engines.split(","):
+            scopes, views, elapsed = measure(engine, template.format(n=n))
+            iterations = n * loops
+            print(f"  {loop:6} {engine:8} {scopes / iterations:10.3f} {views / iterations:10.3f} "
+                  f"{elapsed / iterations * 1e6:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Compara as funções de math em Quokka (.qk) com as intrínsecas nativas.
+
+Uso: python bench/math_intrinsics.py [--size N] [--engine MOTOR] [--repeat N]
+
+As funções de array rodam uma vez sobre o array de teste; as funções de um
+número são chamadas para cada item dele, dentro de um each (como em um
+relatório numérico). cos, sen, tg, exp e log .qk são aproximações por séries
+e podem diferir nas últimas casas: essas linhas são comparadas com tolerância
+relativa (APPROXIMATE), as demais precisam dar exatamente o mesmo resultado.
+As linhas de exp cobrem entradas negativas e grandes.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.collections_intrinsics import compare
+
+CALLS = [
+    "sum_sq(dados)", "dot(dados, dados)", "mean(dados)", "stddev(dados)", "factorial(500)",
+    "each($dados : x) { r = floor(x / 7) }",
+    "each($dados : x) { r = round(x / 7) }",
+    "each($dados : x) { r = gcd(x, 360) }",
+    "each($dados : x) { r = cos(x) }",
+    "each($dados : x) { r = sen(x) }",
+    "each($dados : x) { r = tg(x) }",
+    "each($dados : x) { r = exp(x / 500 - 100) }",
+    "exp(0 - 50)", "exp(200)",
+    "each($dados : x) { r = log(x + 1) }",
+]
+
+# Linhas com séries em ponto flutuante no .qk
+APPROXIMATE = {call for call in CALLS if any(name in call for name in ("cos(", "sen(", "tg(", "exp(", "log("))}
+
+
+if __name__ == "__main__":
+    compare(CALLS, "math", "Intrínsecas nativas de math vs. versões .qk", APPROXIMATE)
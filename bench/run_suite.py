@@ -0,0 +1,161 @@
+"""
+Suíte de desempenho reproduzível: roda as cargas de bench/suite/ e grava os
+resultados em JSON para comparar revisões.
+
+Uso: python bench/run_suite.py [--engines a,b,...] [--repeat N] [--only carga,...]
+                               [--output arquivo.json] [--compare base.json]
+
+Cada execução começa a frio: sem cache em disco e com o registro de módulos
+vazio, de modo que importações e análise entram na medida. Para cada carga e
+motor são registrados, da melhor de N execuções, os tempos de lex, parse,
+otimização e execução (QuokkaInterpreter.stats()); uma execução extra com um
+StatsTracer conta as declarações, que dão as declarações por segundo da
+execução.
+
+Sem --output, os resultados vão para bench/results/<revisão>.json (revisão
+do git, ou "local" fora de um repositório). Com --compare, mostra a razão
+entre o tempo total atual e o do arquivo base (< 1 = mais rápido agora).
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpreter import QuokkaInterpreter
+from module_registry import MODULE_REGISTRY
+from stats import StatsTracer
+
+SUITE = os.path.join(ROOT, "bench", "suite")
+
+
+def workloads():
+    """Cargas da suíte: nome -> caminho, em ordem alfabética"""
+    names = sorted(name for name in os.listdir(SUITE) if name.endswith(".qk"))
+    return {os.path.splitext(name)[0]: os.path.join(SUITE, name) for name in names}
+
+
+def run_once(engine: str, code: str, tracer=None):
+    """Executa o programa a frio e devolve (segundos, saída, stats())"""
+    MODULE_REGISTRY.clear()
+    output = io.StringIO()
+    interpreter = QuokkaInterpreter(engine=engine, use_cache=False)
+    if tracer is not None:
+        interpreter.set_tracer(tracer)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(code)
+    return time.perf_counter() - start, output.getvalue(), interpreter.stats()
+
+
+def measure(engine: str, code: str, repeat: int):
+    """Métricas da melhor de repeat execuções, mais a contagem de declarações"""
+    best = None
+    for _ in range(repeat):
+        elapsed, output, stats = run_once(engine, code)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, output, stats)
+    elapsed, output, stats = best
+
+    counter = StatsTracer()
+    run_once(engine, code, counter)
+    execute = stats["phases"]["execute"]
+    return {
+        "total": elapsed,
+        "lex": stats["phases"]["lex"],
+        "parse": stats["phases"]["parse"],
+        "optimize": stats["phases"]["optimize"],
+        "execute": execute,
+        "statements": counter.statements,
+        "statements_per_second": counter.statements / execute if execute > 0 else None,
+        "steps": stats["steps"],
+        "output_sha1": hashlib.sha1(output.encode("utf-8")).hexdigest(),
+    }
+
+
+def revision() -> str:
+    """Revisão do git da árvore medida ("local" se não for possível descobrir)"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return "local"
+    if result.returncode != 0:
+        return "local"
+    dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                           capture_output=True, text=True, timeout=10).stdout.strip()
+    return result.stdout.strip() + ("-modificado" if dirty else "")
+
+
+def compare(results, base_path: str):
+    """Mostra a razão entre os tempos totais atuais e os do arquivo base"""
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\nComparação com {base_path} (revisão {base['meta']['revision']}): atual / base")
+    for workload, engines in results.items():
+        for engine, current in engines.items():
+            previous = base["results"].get(workload, {}).get(engine)
+            if previous is None:
+                continue
+            ratio = current["total"] / previous["total"] if previous["total"] > 0 else float("nan")
+            note = "" if current["output_sha1"] == previous["output_sha1"] else "  SAÍDA DIFERENTE"
+            print(f"  {workload:18} {engine:8} {ratio:6.2f}x{note}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Suíte de desempenho do interpretador Quokka")
+    arg_parser.add_argument("--engines", default="ast", help="motores separados por vírgula (padrão: ast)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="execuções por medida (usa a melhor)")
+    arg_parser.add_argument("--only", default=None, help="cargas separadas por vírgula (padrão: todas)")
+    arg_parser.add_argument("--output", default=None, help="arquivo JSON (padrão: bench/results/<revisão>.json)")
+    arg_parser.add_argument("--compare", default=None, help="arquivo JSON de outra revisão para comparar")
+    args = arg_parser.parse_args()
+    # Bibliotecas são procuradas a partir do diretório atual
+    os.chdir(ROOT)
+
+    engines = args.engines.split(",")
+    suite = workloads()
+    if args.only:
+        suite = {name: suite[name] for name in args.only.split(",")}
+
+    results = {}
+    print(f"  {'carga':18} {'motor':8} {'lex':>8} {'parse':>8} {'execução':>9} {'total':>9} {'decl/s':>11}")
+    for name, path in suite.items():
+        with open(path, "r", encoding="utf-8") as f:
+            code = f.read()
+        results[name] = {}
+        for engine in engines:
+            row = results[name][engine] = measure(engine, code, args.repeat)
+            rate = f"{row['statements_per_second']:11.0f}" if row["statements_per_second"] else f"{'-':>11}"
+            print(f"  {name:18} {engine:8} {row['lex'] * 1000:6.1f}ms {row['parse'] * 1000:6.1f}ms "
+                  f"{row['execute'] * 1000:7.1f}ms {row['total'] * 1000:7.1f}ms {rate}")
+        if len({row["output_sha1"] for row in results[name].values()}) > 1:
+            print(f"  {name:18} SAÍDAS DIFERENTES entre os motores")
+
+    meta = {
+        "revision": revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+    }
+    output_path = args.output or os.path.join(ROOT, "bench", "results", f"{meta['revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados: {output_path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Mede como o tempo das funções de strings cresce com o tamanho do texto.
+
+Uso: python bench/strings_intrinsics.py [--engine MOTOR] [--qk-size N] [--mb N] [--repeat N]
+
+As versões .qk interpretam o texto caractere a caractere e montam o
+resultado com concatenações (quadrático para textos grandes); por isso são
+medidas em textos de poucos milhares de caracteres. As intrínsecas nativas
+são medidas em textos de vários MB. Em ambos os casos o tamanho dobra entre
+as duas medidas, e a última coluna mostra quanto o tempo cresceu.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from interpreter import QuokkaInterpreter, QuokkaError
+
+CALLS = [
+    'split(texto, " ")', 'join(palavras, " ")', "chars(texto)", "uppercase(texto)", "lowercase(texto)",
+    'find(texto, "zzz")', 'replace(texto, "quokka", "wallaby")', "substring(texto, 1, tamanho)",
+    "trim(texto)", 'starts_with(texto, "quokka")',
+]
+
+
+def generate_text(size: int) -> str:
+    words = ["quokka", "Marsupial", "ilha", "Rottnest", "sorriso", "folhas", "noite"]
+    parts = []
+    length = 0
+    index = 0
+    while length < size:
+        word = words[index % len(words)]
+        parts.append(word)
+        length += len(word) + 1
+        index += 1
+    return " ".join(parts)[:size]
+
+
+def run_call(call: str, text: str, engine: str, native: bool, repeat: int):
+    """Melhor tempo de 'r = <call>' sobre text, ou None se a versão .qk falhar"""
+    interpreter = QuokkaInterpreter(engine=engine, use_intrinsics=native)
+    interpreter.global_env.define("texto", text)
+    interpreter.global_env.define("tamanho", len(text))
+    program = interpreter._parse_source("program", code=f'import {{ "strings" }}\nmain{{\n    r = {call}\n}}\n')
+    # join recebe as palavras já separadas
+    interpreter._run_program(interpreter._parse_source(
+        "program", code='import { "strings" }\nmain{\n    palavras = split(texto, " ")\n}\n'))
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            interpreter._run_program(program)
+        except QuokkaError:
+            return None
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Crescimento do tempo das funções de strings")
+    arg_parser.add_argument("--engine", default="ast",
+                            choices=[engine for engine in QuokkaInterpreter.ENGINES if engine != "tokens"])
+    arg_parser.add_argument("--qk-size", type=int, default=2000, help="menor texto para as versões .qk (caracteres)")
+    arg_parser.add_argument("--mb", type=float, default=2.0, help="menor texto para as intrínsecas (MB)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="execuções por medida (usa a melhor)")
+    args = arg_parser.parse_args()
+    # Bibliotecas são procuradas a partir do diretório atual
+    os.chdir(ROOT)
+
+    qk_sizes = [args.qk_size, args.qk_size * 2]
+    native_sizes = [int(args.mb * 1024 * 1024), int(args.mb * 2 * 1024 * 1024)]
+    print(f"Motor {args.engine}; .qk com {qk_sizes[0]} e {qk_sizes[1]} caracteres, "
+          f"nativa com {args.mb:g} e {args.mb * 2:g} MB")
+    print(f"  {'chamada':38} {'.qk':>21} {'nativa':>21}")
+    for call in CALLS:
+        columns = []
+        for native, sizes in ((False, qk_sizes), (True, native_sizes)):
+            small, large = (run_call(call, generate_text(size), args.engine, native, args.repeat) for size in sizes)
+            if small is None or large is None:
+                columns.append(f"{'erro':>21}")
+            else:
+                columns.append(f"{small * 1000:7.1f} {large * 1000:7.1f}ms {large / small:3.1f}x")
+        print(f"  {call:38} {columns[0]} {columns[1]}")
+
+
+if __name__ == "__main__":
+    main()
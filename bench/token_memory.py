@@ -0,0 +1,75 @@
+"""
+Compara a memória ocupada pelos tokens de um arquivo .qk sintético grande:
+lista de Token (QuokkaLexer.tokenize) contra o armazenamento compacto (TokenStore).
+
+Uso: python bench/token_memory.py [--size-mb N]
+
+Cada forma roda em um processo separado; é medido o RSS (memória residente)
+depois de gerar o código-fonte e depois de montar os tokens, e a diferença
+é o custo dos tokens.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ("list", "store")
+
+
+def current_rss() -> int:
+    """RSS atual do processo, em bytes (Linux: /proc; outros: pico via resource)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def measure_mode(mode: str, size_mb: float):
+    """Executado no processo filho: imprime 'tokens rss_antes rss_depois'"""
+    from bench.lexer_throughput import generate_source
+    from lexer import QuokkaLexer, TokenStore
+
+    code = generate_source(int(size_mb * 1024 * 1024))
+    lexer = QuokkaLexer()
+    before = current_rss()
+    if mode == "list":
+        tokens = lexer.tokenize(code)
+    else:
+        tokens = TokenStore(lexer.iter_tokens(code))
+    after = current_rss()
+    print(len(tokens), before, after)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compara a memória dos tokens do Quokka")
+    arg_parser.add_argument("--size-mb", type=float, default=4.0, help="tamanho do arquivo sintético (MB)")
+    arg_parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        measure_mode(args.mode, args.size_mb)
+        return
+
+    print(f"Arquivo sintético de {args.size_mb:.1f} MB")
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--size-mb", str(args.size_mb)],
+            capture_output=True, text=True, check=True, cwd=ROOT,
+        ).stdout.split()
+        count, before, after = (int(value) for value in output)
+        results[mode] = after - before
+        print(f"  {mode:6} {count} tokens  {(after - before) / (1024 * 1024):8.1f} MB  "
+              f"{(after - before) / count:6.1f} bytes/token")
+    if results["store"] > 0:
+        print(f"  redução: {results['list'] / results['store']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
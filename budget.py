@@ -0,0 +1,111 @@
+"""
+Orçamento de execução de um programa Quokka.
+
+Limita o total de passos (iterações de while e each, chamadas de funções
+Quokka e de intrínsecas nativas), o tempo de parede, o tamanho das coleções
+e a profundidade de chamadas aninhadas. Sem limites, nada é verificado
+durante a execução.
+
+As intrínsecas que criam arrays ou strings (intrinsics.py) recebem o
+orçamento: cada elemento criado consome um passo, e o tamanho do array é
+verificado antes de ele ser montado.
+
+Os motores não consultam o relógio nem o limite a cada passo: cada passo só
+decrementa o contador countdown, e check() é chamado quando ele chega a zero.
+Entre duas verificações rodam no máximo CHECK_INTERVAL passos, de modo que o
+tempo limite é verificado com essa granularidade e o limite de passos é
+exato.
+"""
+import sys
+import time
+from typing import Optional
+
+from runtime import LimitExceeded
+
+
+class ExecutionBudget:
+    """Limites de passos, tempo (segundos), elementos por coleção e chamadas aninhadas; None = sem limite"""
+
+    # Passos entre duas consultas ao relógio quando há tempo limite
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, max_steps: Optional[int] = None, timeout: Optional[float] = None,
+                 max_collection_size: Optional[int] = None, max_depth: Optional[int] = None):
+        if max_steps is not None and max_steps < 0:
+            raise ValueError("max_steps deve ser zero ou positivo")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout deve ser positivo")
+        if max_collection_size is not None and max_collection_size < 0:
+            raise ValueError("max_collection_size deve ser zero ou positivo")
+        if max_depth is not None and max_depth < 1:
+            raise ValueError("max_depth deve ser positivo")
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_collection_size = max_collection_size
+        # Comparado direto pelos motores com len() da coleção que cresceu
+        self.size_limit = sys.maxsize if max_collection_size is None else max_collection_size
+        # Todos os motores verificam este limite; só a máquina virtual guarda as chamadas
+        # no heap, nos outros a profundidade também é limitada pela pilha do Python
+        self.max_depth = max_depth
+        self.depth_limit = sys.maxsize if max_depth is None else max_depth
+        self.start()
+
+    def start(self):
+        """Zera os passos e começa a contar o tempo (início de cada interpret())"""
+        self.deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        self._steps = 0
+        # Passos consumidos pelo trabalho das intrínsecas (charge), incluídos em steps
+        self.native_steps = 0
+        self._arm()
+
+    def _arm(self):
+        """Define quantos passos podem rodar até a próxima verificação"""
+        chunk = sys.maxsize
+        if self.timeout is not None:
+            chunk = self.CHECK_INTERVAL
+        if self.max_steps is not None:
+            # A verificação cai exatamente no primeiro passo além do limite
+            chunk = min(chunk, self.max_steps + 1 - self._steps)
+        self._chunk = chunk
+        self.countdown = chunk
+
+    @property
+    def steps(self) -> int:
+        """Passos executados desde start()"""
+        return self._steps + self._chunk - self.countdown
+
+    def check(self):
+        """Chamado pelos motores quando countdown chega a zero"""
+        self._steps += self._chunk - self.countdown
+        if self.max_steps is not None and self._steps > self.max_steps:
+            self.countdown = self._chunk = 0
+            raise LimitExceeded(f"Limite de {self.max_steps} passos de execução excedido. Possível loop infinito.")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self._arm()
+            raise LimitExceeded(f"Tempo limite de execução excedido ({self.timeout:g}s)")
+        self._arm()
+
+    def charge(self, steps: int):
+        """Consome steps passos de uma vez (trabalho de uma intrínseca nativa)"""
+        self.native_steps += steps
+        self.countdown -= steps
+        if self.countdown <= 0:
+            self.check()
+
+    def allocate(self, size: int, name: str):
+        """Antes de uma intrínseca montar uma coleção de size elementos: verifica o limite e consome os passos"""
+        if size > self.size_limit:
+            raise self.collection_too_large(name)
+        self.charge(size)
+
+    def collection_too_large(self, name: str):
+        """Erro para uma coleção que passou de max_collection_size elementos"""
+        return LimitExceeded(f"'{name}' excede o limite de {self.max_collection_size} elementos por coleção")
+
+    def literal_too_large(self, kind: str):
+        """Erro para um literal (kind = "Array" ou "Dicionário") com mais de max_collection_size elementos"""
+        return LimitExceeded(f"{kind} literal excede o limite de {self.max_collection_size} elementos por coleção")
+
+    def recursion_too_deep(self):
+        """Erro para uma chamada além de max_depth chamadas aninhadas"""
+        return LimitExceeded(f"Limite de recursão excedido: mais de {self.max_depth} chamadas aninhadas")
@@ -0,0 +1,619 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from runtime import QuokkaError
+from ast_nodes import (
+    Node, Literal, Name, ArrayLiteral, DictLiteral, BinaryOp, Logical, Index, KeyAccess,
+    Call, Conversion, Prompt, Block, Print, If, While, Each, Break, Continue, Yield,
+    Assign, IndexAssign, KeyAssign, CompoundAssign, IncDec, Append, AppendPair,
+    ExprStatement, GlobalBlock, FunctionDef, MainBlock, Program,
+)
+
+
+# ---------------------------------------------------------------------------
+# Opcodes
+# Cada instrução ocupa duas posições na lista de código: opcode e argumento.
+# ---------------------------------------------------------------------------
+
+# Variáveis e constantes
+LOAD_CONST = 1          # empilha consts[arg]
+LOAD_NAME = 2           # empilha a variável names[arg]
+STORE_NAME = 3          # desempilha e atribui a names[arg] (Environment.set)
+DEFINE_NAME = 4         # desempilha e define names[arg] no escopo atual (Environment.define)
+POP_TOP = 5
+DUP_TOP = 6             # duplica o topo da pilha
+DUP_TOP_TWO = 7         # duplica os dois itens do topo
+ROT_THREE = 8           # move o topo duas posições para baixo
+
+# Aritmética
+BINARY_ADD = 10
+BINARY_SUB = 11
+BINARY_MUL = 12
+BINARY_DIV = 13
+BINARY_MOD = 14
+BINARY_POW = 15
+
+# Comparações
+COMPARE_EQ = 20
+COMPARE_NE = 21
+COMPARE_GT = 22
+COMPARE_LT = 23
+COMPARE_GE = 24
+COMPARE_LE = 25
+
+# Lógica (os dois operandos já foram avaliados)
+LOGICAL_AND = 30
+LOGICAL_OR = 31
+
+# Saltos (argumento = posição absoluta no código)
+JUMP = 40
+POP_JUMP_IF_FALSE = 41
+
+# Estruturas de dados
+BUILD_ARRAY = 50        # arg = número de elementos
+BUILD_DICT = 51         # arg = consts com a tupla de chaves
+INDEX = 52              # obj[index]
+KEY_ACCESS = 53         # obj{key}
+STORE_INDEX = 54        # names[arg][index] = valor
+STORE_KEY = 55          # names[arg]{key} = valor
+APPEND = 56             # names[arg] << valor
+APPEND_PAIR = 57        # arg = consts com (nome, chave): dict << ('chave' = valor)
+
+# Atribuições compostas (o valor atual da variável já está na pilha)
+INPLACE_ADD = 60
+INPLACE_SUB = 61
+INCREMENT = 62
+DECREMENT = 63
+
+# Chamadas e E/S
+CALL = 70               # arg = consts com (nome da função, número de argumentos)
+CONVERT = 71            # arg = names com to_int/to_float/to_bool/to_str
+PROMPT = 72
+PRINT = 73
+RETURN_VALUE = 74       # yield / fim da função
+TAIL_CALL = 75          # yield(f(...)) fora de loops: como CALL, mas a função chamada ocupa o quadro da atual
+
+# Escopos
+ENTER_SCOPE = 80
+EXIT_SCOPE = 81         # arg = quantos escopos fechar
+RESET_SCOPE = 82        # esvazia o escopo do loop para a próxima iteração; arg = quantas variáveis manter
+
+# Loops
+WHILE_TICK = 91         # consome um passo do orçamento de execução (budget.py)
+EACH_SETUP = 93         # empilha o iterador da coleção names[arg]
+EACH_NEXT = 94          # empilha índice e item, ou desempilha o iterador e salta para arg
+RAISE_BREAK = 95        # break/continue fora de loop
+RAISE_CONTINUE = 96
+RAISE_YIELD = 97        # yield no main: desempilha o valor e lança YieldException
+
+# Rastreamento (só emitido quando o tracer trata on_statement)
+TRACE_LINE = 100        # avisa on_statement; arg = linha da declaração
+
+# Rastreamento de escopos, loops e alterações (só emitido quando o tracer trata
+# algum gancho de tracer.STRUCTURE_HOOKS). Um while rastreado guarda na pilha o
+# número da iteração, abaixo do que o corpo empilha.
+TRACE_SCOPE_ENTER = 101 # avisa on_scope_enter; arg = consts com o contexto
+TRACE_SCOPE_EXIT = 102  # avisa on_scope_exit; arg = consts com o contexto
+TRACE_WHILE_COUNT = 103 # soma 1 ao número da iteração do while (topo da pilha)
+TRACE_WHILE = 104       # avisa on_loop_iteration com o número da iteração e a condição (topo)
+TRACE_EACH = 105        # avisa on_loop_iteration com o índice e o item (topo); arg = names com a variável
+TRACE_LOOP_CONTROL = 106  # avisa on_loop_control; arg = consts com (tipo do loop, "break"/"continue")
+TRACE_UPDATE = 107      # desempilha o operando (se houver) e o valor antigo e avisa on_update;
+                        # arg = consts com (nome, operador, tem operando)
+TRACE_APPEND = 108      # desempilha o valor adicionado e avisa on_append; arg = consts com (nome, chave)
+
+OPNAMES: Dict[int, str] = {
+    value: name for name, value in list(globals().items())
+    if name.isupper() and isinstance(value, int)
+}
+
+JUMP_OPCODES = {JUMP, POP_JUMP_IF_FALSE, EACH_NEXT}
+NAME_OPCODES = {LOAD_NAME, STORE_NAME, DEFINE_NAME, STORE_INDEX, STORE_KEY, APPEND,
+                INPLACE_ADD, INPLACE_SUB, INCREMENT, DECREMENT, CONVERT, EACH_SETUP, TRACE_EACH}
+CONST_OPCODES = {LOAD_CONST, BUILD_DICT, APPEND_PAIR, CALL, TAIL_CALL,
+                 TRACE_SCOPE_ENTER, TRACE_SCOPE_EXIT, TRACE_LOOP_CONTROL, TRACE_UPDATE, TRACE_APPEND}
+
+BINARY_OPCODES = {
+    "+": BINARY_ADD, "-": BINARY_SUB, "*": BINARY_MUL, "/": BINARY_DIV, "%": BINARY_MOD, "**": BINARY_POW,
+    "==": COMPARE_EQ, "!=": COMPARE_NE, ">": COMPARE_GT, "<": COMPARE_LT, ">=": COMPARE_GE, "<=": COMPARE_LE,
+}
+
+
+class CodeObject:
+    """Bytecode de uma unidade executável (main, função ou expressão global)"""
+
+    def __init__(self, name: str, params: Tuple[str, ...] = ()):
+        self.name = name
+        self.params = params
+        self.code: List[int] = []
+        self.consts: List[Any] = []
+        self.names: List[str] = []
+        self.lines: List[int] = []   # linha de origem de cada instrução
+        # Regiões (início, fim, prefixo) cujos erros são reapresentados com o prefixo,
+        # como "Erro ao executar += em 'x': ..."
+        self.error_wrappers: List[Tuple[int, int, str]] = []
+        # Corpos de loop (início, fim, profundidade de escopo, altura da pilha, destino do
+        # break, destino do continue, "while"/"each"), do mais interno para o mais externo:
+        # um break ou continue que sai de uma função chamada no corpo continua no loop de
+        # quem chamou
+        self.loop_handlers: List[Tuple[int, int, int, int, int, int, str]] = []
+        # Com rastreamento de escopos: contexto do escopo local da função (None fora de
+        # funções) e regiões (início, fim, posição do número da iteração na pilha) dos
+        # while, do mais interno para o mais externo, para os avisos quando um erro sai deles
+        self.scope_context: Optional[str] = None
+        self.traced_whiles: List[Tuple[int, int, int]] = []
+        self._const_index: Dict[Tuple[type, Any], int] = {}
+        self._name_index: Dict[str, int] = {}
+
+    def add_const(self, value: Any) -> int:
+        key = (type(value), value)
+        if key not in self._const_index:
+            self._const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return self._const_index[key]
+
+    def add_name(self, name: str) -> int:
+        if name not in self._name_index:
+            self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return self._name_index[name]
+
+    def emit(self, opcode: int, arg: int = 0, line: int = 0) -> int:
+        """Adiciona uma instrução e retorna sua posição"""
+        position = len(self.code)
+        self.code.append(opcode)
+        self.code.append(arg)
+        self.lines.append(line)
+        return position
+
+    def patch(self, position: int, target: int):
+        """Ajusta o destino de um salto já emitido"""
+        self.code[position + 1] = target
+
+    def line_at(self, position: int) -> int:
+        return self.lines[position // 2]
+
+
+class _LoopContext:
+    """Informações de um loop em compilação, usadas por break/continue"""
+
+    def __init__(self, kind: str, continue_target: int, scope_depth: int, holds_iterator: bool):
+        self.kind = kind
+        self.continue_target = continue_target
+        self.scope_depth = scope_depth
+        # each deixa o iterador na pilha enquanto o loop roda; while não deixa nada (ou,
+        # rastreado, o número da iteração)
+        self.holds_iterator = holds_iterator
+        self.break_jumps: List[int] = []
+
+
+class BytecodeCompiler:
+    """Compila a AST do Quokka para bytecode de pilha"""
+
+    def __init__(self, trace_statements: bool = False, trace_structure: bool = False, tail_calls: bool = True):
+        self.code: Optional[CodeObject] = None
+        self.loops: List[_LoopContext] = []
+        self.scope_depth = 0
+        self.in_main = False
+        # Emite TRACE_LINE antes de cada declaração
+        self.trace_statements = trace_statements
+        # Emite os avisos de escopos, loops e alterações (TRACE_SCOPE_ENTER, TRACE_WHILE, ...)
+        self.trace_structure = trace_structure
+        # Emite TAIL_CALL em yield(f(...)); sem ele cada chamada tem seu quadro (memoização, on_call/on_return)
+        self.tail_calls = tail_calls
+
+    # ------------------------------------------------------------------
+    # Unidades de compilação
+    # ------------------------------------------------------------------
+
+    def compile_function(self, function: FunctionDef) -> CodeObject:
+        code = self._begin(CodeObject(function.name, tuple(function.params)))
+        if self.trace_structure:
+            code.scope_context = f"função '{function.name}'"
+            code.emit(TRACE_SCOPE_ENTER, code.add_const(code.scope_context), function.line)
+        self._compile_block(function.body)
+        self._emit_return_null(function.line)
+        return code
+
+    def compile_main(self, main: MainBlock) -> CodeObject:
+        code = self._begin(CodeObject("<main>"))
+        self.in_main = True
+        try:
+            self._compile_block(main.body)
+        finally:
+            self.in_main = False
+        self._emit_return_null(main.line)
+        return code
+
+    def compile_expression_unit(self, expr: Node, name: str) -> CodeObject:
+        """Compila uma expressão isolada (valores do bloco global)"""
+        code = self._begin(CodeObject(name))
+        self._compile_expression(expr)
+        code.emit(RETURN_VALUE, 0, expr.line)
+        return code
+
+    def _begin(self, code: CodeObject) -> CodeObject:
+        self.code = code
+        self.loops = []
+        self.scope_depth = 0
+        return code
+
+    def _emit_return_null(self, line: int):
+        self.code.emit(LOAD_CONST, self.code.add_const(None), line)
+        self._emit_scope_exits(line)
+        self.code.emit(RETURN_VALUE, 0, line)
+
+    def _emit_scope_exits(self, line: int):
+        """Com rastreamento, avisa a saída dos while abertos e da função antes de um yield"""
+        if not self.trace_structure:
+            return
+        code = self.code
+        for loop in reversed(self.loops):
+            if loop.kind == "while":
+                code.emit(TRACE_SCOPE_EXIT, code.add_const("while loop"), line)
+        if code.scope_context is not None:
+            code.emit(TRACE_SCOPE_EXIT, code.add_const(code.scope_context), line)
+
+    # ------------------------------------------------------------------
+    # Declarações
+    # ------------------------------------------------------------------
+
+    def _compile_block(self, block: Block):
+        for statement in block.statements:
+            self._compile_statement(statement)
+
+    def _compile_statement(self, node: Node):
+        code = self.code
+        line = node.line
+        node_type = node.__class__
+        if self.trace_statements:
+            code.emit(TRACE_LINE, line, line)
+
+        if node_type is Print:
+            self._compile_expression(node.value)
+            code.emit(PRINT, 0, line)
+
+        elif node_type is Assign:
+            self._compile_expression(node.value)
+            code.emit(STORE_NAME, code.add_name(node.name), line)
+
+        elif node_type is If:
+            self._compile_if(node)
+
+        elif node_type is While:
+            self._compile_while(node)
+
+        elif node_type is Each:
+            self._compile_each(node)
+
+        elif node_type is Yield:
+            value = node.value
+            if (value.__class__ is Call and not self.in_main and not self.loops
+                    and self.tail_calls and not self.trace_structure):
+                # Chamada em posição de cauda. Dentro de um loop o quadro precisa
+                # continuar existindo: um break vindo da função chamada para nele
+                for arg in value.args:
+                    self._compile_expression(arg)
+                code.emit(TAIL_CALL, code.add_const((value.name, len(value.args))), line)
+            else:
+                self._compile_expression(value)
+                self._emit_scope_exits(line)
+            code.emit(RAISE_YIELD if self.in_main else RETURN_VALUE, 0, line)
+
+        elif node_type is Break:
+            if not self.loops:
+                code.emit(RAISE_BREAK, 0, line)
+            else:
+                loop = self.loops[-1]
+                if self.trace_structure:
+                    code.emit(TRACE_LOOP_CONTROL, code.add_const((loop.kind, "break")), line)
+                self._emit_exit_scopes(loop, line)
+                loop.break_jumps.append(code.emit(JUMP, 0, line))
+
+        elif node_type is Continue:
+            if not self.loops:
+                code.emit(RAISE_CONTINUE, 0, line)
+            else:
+                loop = self.loops[-1]
+                if self.trace_structure:
+                    code.emit(TRACE_LOOP_CONTROL, code.add_const((loop.kind, "continue")), line)
+                self._emit_exit_scopes(loop, line)
+                code.emit(JUMP, loop.continue_target, line)
+
+        elif node_type is IndexAssign:
+            code.emit(LOAD_NAME, code.add_name(node.name), line)
+            self._compile_expression(node.index)
+            self._compile_expression(node.value)
+            code.emit(STORE_INDEX, code.add_name(node.name), line)
+
+        elif node_type is KeyAssign:
+            code.emit(LOAD_NAME, code.add_name(node.name), line)
+            self._compile_expression(node.key)
+            self._compile_expression(node.value)
+            code.emit(STORE_KEY, code.add_name(node.name), line)
+
+        elif node_type is CompoundAssign:
+            start = len(code.code)
+            code.emit(LOAD_NAME, code.add_name(node.name), line)
+            self._compile_expression(node.value)
+            if self.trace_structure:
+                # Valor antigo e operando ficam na pilha para o aviso on_update
+                code.emit(DUP_TOP_TWO, 0, line)
+            code.emit(INPLACE_ADD if node.op == "+=" else INPLACE_SUB, code.add_name(node.name), line)
+            if self.trace_structure:
+                code.emit(TRACE_UPDATE, code.add_const((node.name, node.op, True)), line)
+            code.error_wrappers.append((start, len(code.code), f"Erro ao executar {node.op} em '{node.name}': "))
+
+        elif node_type is IncDec:
+            start = len(code.code)
+            code.emit(LOAD_NAME, code.add_name(node.name), line)
+            if self.trace_structure:
+                code.emit(DUP_TOP, 0, line)
+            code.emit(INCREMENT if node.op == "++" else DECREMENT, code.add_name(node.name), line)
+            if self.trace_structure:
+                code.emit(TRACE_UPDATE, code.add_const((node.name, node.op, False)), line)
+            code.error_wrappers.append((start, len(code.code), f"Erro ao executar {node.op} em '{node.name}': "))
+
+        elif node_type is Append:
+            code.emit(LOAD_NAME, code.add_name(node.name), line)
+            self._compile_expression(node.value)
+            self._emit_keep_appended(line)
+            code.emit(APPEND, code.add_name(node.name), line)
+            if self.trace_structure:
+                code.emit(TRACE_APPEND, code.add_const((node.name, None)), line)
+
+        elif node_type is AppendPair:
+            code.emit(LOAD_NAME, code.add_name(node.name), line)
+            self._compile_expression(node.value)
+            self._emit_keep_appended(line)
+            code.emit(APPEND_PAIR, code.add_const((node.name, node.key)), line)
+            if self.trace_structure:
+                code.emit(TRACE_APPEND, code.add_const((node.name, node.key)), line)
+
+        elif node_type is ExprStatement:
+            self._compile_expression(node.expr)
+            code.emit(POP_TOP, 0, line)
+
+        else:
+            raise QuokkaError(f"Declaração não suportada pelo compilador: {node_type.__name__}")
+
+    def _emit_keep_appended(self, line: int):
+        """Com rastreamento, guarda abaixo da coleção uma cópia do valor a adicionar (para TRACE_APPEND)"""
+        if self.trace_structure:
+            self.code.emit(DUP_TOP, 0, line)
+            self.code.emit(ROT_THREE, 0, line)
+
+    def _emit_exit_scopes(self, loop: _LoopContext, line: int):
+        """Fecha os escopos abertos desde o início do loop"""
+        count = self.scope_depth - loop.scope_depth
+        if count:
+            self.code.emit(EXIT_SCOPE, count, line)
+
+    def _compile_if(self, node: If):
+        code = self.code
+        end_jumps = []
+        current = node
+        while True:
+            self._compile_expression(current.condition)
+            skip = code.emit(POP_JUMP_IF_FALSE, 0, current.line)
+            self._compile_block(current.body)
+
+            orelse = current.orelse
+            if orelse is None:
+                code.patch(skip, len(code.code))
+                break
+
+            end_jumps.append(code.emit(JUMP, 0, current.line))
+            code.patch(skip, len(code.code))
+            if isinstance(orelse, If):
+                current = orelse
+            else:
+                self._compile_block(orelse)
+                break
+
+        for jump in end_jumps:
+            code.patch(jump, len(code.code))
+
+    def _compile_while(self, node: While):
+        code = self.code
+        line = node.line
+
+        traced = self.trace_structure
+
+        # Um único escopo para o loop inteiro, esvaziado no início de cada iteração
+        code.emit(ENTER_SCOPE, 0, line)
+        self.scope_depth += 1
+        if traced:
+            code.emit(TRACE_SCOPE_ENTER, code.add_const("while loop"), line)
+            code.emit(LOAD_CONST, code.add_const(0), line)
+        head = code.emit(RESET_SCOPE, 0, line)
+        code.emit(WHILE_TICK, 0, line)
+        if traced:
+            code.emit(TRACE_WHILE_COUNT, 0, line)
+        self._compile_expression(node.condition)
+        if traced:
+            code.emit(TRACE_WHILE, 0, line)
+        exit_jump = code.emit(POP_JUMP_IF_FALSE, 0, line)
+
+        loop = _LoopContext("while", head, self.scope_depth, traced)
+        self.loops.append(loop)
+        body_start = len(code.code)
+        self._compile_block(node.body)
+        body_end = code.emit(JUMP, head, line)
+        self.loops.pop()
+        self.scope_depth -= 1
+
+        if traced:
+            # O número da iteração sai da pilha antes de o escopo ser fechado
+            end = code.emit(POP_TOP, 0, line)
+            code.emit(EXIT_SCOPE, 1, line)
+            code.emit(TRACE_SCOPE_EXIT, code.add_const("while loop"), line)
+        else:
+            end = code.emit(EXIT_SCOPE, 1, line)
+        code.patch(exit_jump, end)
+        for jump in loop.break_jumps:
+            code.patch(jump, end)
+        stack_height = self._add_loop_handler(loop, body_start, body_end, end)
+        if traced:
+            code.traced_whiles.append((head, end, stack_height - 1))
+
+    def _compile_each(self, node: Each):
+        code = self.code
+        line = node.line
+
+        # Um único escopo para o loop; a cada iteração ficam só o item e __index__
+        code.emit(EACH_SETUP, code.add_name(node.collection), line)
+        code.emit(ENTER_SCOPE, 0, line)
+        self.scope_depth += 1
+        head = code.emit(EACH_NEXT, 0, line)
+        code.emit(RESET_SCOPE, len({node.item, "__index__"}), line)
+        if self.trace_structure:
+            code.emit(TRACE_EACH, code.add_name(node.item), line)
+
+        loop = _LoopContext("each", head, self.scope_depth, True)
+        self.loops.append(loop)
+        code.emit(DEFINE_NAME, code.add_name(node.item), line)
+        code.emit(DEFINE_NAME, code.add_name("__index__"), line)
+        body_start = len(code.code)
+        self._compile_block(node.body)
+        body_end = code.emit(JUMP, head, line)
+        self.loops.pop()
+        self.scope_depth -= 1
+
+        # break sai do loop com o iterador ainda na pilha
+        break_target = code.emit(POP_TOP, 0, line)
+        for jump in loop.break_jumps:
+            code.patch(jump, break_target)
+        code.patch(head, code.emit(EXIT_SCOPE, 1, line))
+        self._add_loop_handler(loop, body_start, body_end, break_target)
+
+    def _add_loop_handler(self, loop: _LoopContext, body_start: int, body_end: int, break_target: int) -> int:
+        """Registra o corpo do loop para break/continue vindos de chamadas de função; devolve a altura da pilha no corpo"""
+        # Cada each envolvente (e o próprio loop, se for each) deixa o iterador na pilha
+        stack_height = sum(1 for outer in self.loops if outer.holds_iterator) + loop.holds_iterator
+        self.code.loop_handlers.append(
+            (body_start, body_end, loop.scope_depth, stack_height, break_target, loop.continue_target, loop.kind)
+        )
+        return stack_height
+
+    # ------------------------------------------------------------------
+    # Expressões
+    # ------------------------------------------------------------------
+
+    def _compile_expression(self, node: Node):
+        code = self.code
+        line = node.line
+        node_type = node.__class__
+
+        if node_type is Literal:
+            code.emit(LOAD_CONST, code.add_const(node.value), line)
+
+        elif node_type is Name:
+            code.emit(LOAD_NAME, code.add_name(node.name), line)
+
+        elif node_type is BinaryOp:
+            self._compile_expression(node.left)
+            self._compile_expression(node.right)
+            code.emit(BINARY_OPCODES[node.op], 0, line)
+
+        elif node_type is Logical:
+            self._compile_expression(node.left)
+            self._compile_expression(node.right)
+            code.emit(LOGICAL_AND if node.op == "&&" else LOGICAL_OR, 0, line)
+
+        elif node_type is Call:
+            for arg in node.args:
+                self._compile_expression(arg)
+            code.emit(CALL, code.add_const((node.name, len(node.args))), line)
+
+        elif node_type is Index:
+            self._compile_expression(node.obj)
+            self._compile_expression(node.index)
+            code.emit(INDEX, 0, line)
+
+        elif node_type is KeyAccess:
+            self._compile_expression(node.obj)
+            self._compile_expression(node.key)
+            code.emit(KEY_ACCESS, 0, line)
+
+        elif node_type is ArrayLiteral:
+            for element in node.elements:
+                self._compile_expression(element)
+            code.emit(BUILD_ARRAY, len(node.elements), line)
+
+        elif node_type is DictLiteral:
+            for _, value in node.pairs:
+                self._compile_expression(value)
+            code.emit(BUILD_DICT, code.add_const(tuple(str(key) for key, _ in node.pairs)), line)
+
+        elif node_type is Conversion:
+            self._compile_expression(node.arg)
+            code.emit(CONVERT, code.add_name(node.name), line)
+
+        elif node_type is Prompt:
+            self._compile_expression(node.message)
+            code.emit(PROMPT, 0, line)
+
+        else:
+            raise QuokkaError(f"Expressão não suportada pelo compilador: {node_type.__name__}")
+
+
+# ---------------------------------------------------------------------------
+# Disassembler
+# ---------------------------------------------------------------------------
+
+def _describe_argument(code: CodeObject, opcode: int, arg: int) -> str:
+    if opcode in JUMP_OPCODES:
+        return f"(para {arg})"
+    if opcode in NAME_OPCODES:
+        return f"({code.names[arg]})"
+    if opcode == CALL or opcode == TAIL_CALL:
+        func_name, argc = code.consts[arg]
+        return f"({func_name}/{argc})"
+    if opcode == APPEND_PAIR:
+        var_name, key = code.consts[arg]
+        return f"({var_name} << '{key}')"
+    if opcode in CONST_OPCODES:
+        return f"({code.consts[arg]!r})"
+    return ""
+
+
+def disassemble(code: CodeObject) -> str:
+    """Formata o bytecode de uma unidade em texto legível"""
+    header = f"Disassembly de {code.name}"
+    if code.params:
+        header += f"({', '.join(code.params)})"
+    lines = [header + ":"]
+
+    jump_targets = {code.code[position + 1] for position in range(0, len(code.code), 2)
+                    if code.code[position] in JUMP_OPCODES}
+    last_line = None
+    for position in range(0, len(code.code), 2):
+        opcode, arg = code.code[position], code.code[position + 1]
+        source_line = code.line_at(position)
+        line_column = f"{source_line:>4}" if source_line != last_line else "    "
+        last_line = source_line
+        marker = ">>" if position in jump_targets else "  "
+        description = _describe_argument(code, opcode, arg)
+        lines.append(f"{line_column} {marker} {position:5} {OPNAMES[opcode]:<18} {arg:>4} {description}".rstrip())
+
+    for start, end, prefix in code.error_wrappers:
+        lines.append(f"     erros em [{start}, {end}) -> \"{prefix}...\"")
+    for start, end, _, _, break_target, continue_target, _ in code.loop_handlers:
+        lines.append(f"     loop em [{start}, {end}) -> break {break_target}, continue {continue_target}")
+    return "\n".join(lines)
+
+
+def disassemble_program(program: Program) -> str:
+    """Compila e formata todo o programa: globais, funções e main (imports não são expandidos)"""
+    compiler = BytecodeCompiler()
+    sections = []
+    for item in program.body:
+        if isinstance(item, GlobalBlock):
+            for var_name, expr in item.declarations:
+                if expr is not None:
+                    sections.append(disassemble(compiler.compile_expression_unit(expr, f"<global {var_name}>")))
+        elif isinstance(item, FunctionDef):
+            sections.append(disassemble(compiler.compile_function(item)))
+        elif isinstance(item, MainBlock):
+            sections.append(disassemble(compiler.compile_main(item)))
+    return "\n\n".join(sections)
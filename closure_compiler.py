@@ -0,0 +1,832 @@
+import operator
+from typing import Callable, Dict, List, Tuple
+
+from runtime import (
+    QuokkaArray, QuokkaDict, QuokkaValue, QuokkaError,
+    BreakException, ContinueException, BREAK, CONTINUE, RETURN,
+    is_truthy, raise_signal, quokka_to_string, convert_value, call_intrinsic, each_items,
+)
+from ast_nodes import (
+    Node, Literal, Name, ArrayLiteral, DictLiteral, BinaryOp, Logical, Index, KeyAccess,
+    Call, Conversion, Prompt, Block, Print, If, While, Each, Break, Continue, Yield,
+    Assign, IndexAssign, KeyAssign, CompoundAssign, IncDec, Append, AppendPair,
+    ExprStatement, GlobalBlock, MainBlock, FunctionDef,
+)
+from evaluator import BINARY_OPERATORS
+from tracer import statement_hook, traced_calls, traces_structure
+from resolver import UNSET, FrameLayout, created_in
+
+# Frame de uma chamada: uma posição por variável local (ver resolver.py)
+Frame = List[QuokkaValue]
+
+# Uma expressão compilada recebe o frame e devolve um valor; uma declaração
+# compilada recebe o frame e devolve None ou um sinal (BREAK, CONTINUE, RETURN).
+Compiled = Callable[[Frame], QuokkaValue]
+
+# Operadores que podem ser aplicados diretamente pelo Python
+_DIRECT_OPERATORS = {
+    "-": operator.sub,
+    "*": operator.mul,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
+
+def _noop(frame):
+    pass
+
+
+class ClosureEngine:
+    """
+    Motor de execução por closures (QuokkaInterpreter com engine="closure").
+
+    Cada nó da AST é compilado uma única vez em uma função Python aninhada que
+    já sabe quais funções filhas chamar: um nó `a + b` vira uma closure que chama
+    as closures de `a` e de `b`. Durante a execução não há mais comparações de
+    tipo de token nem despacho por classe de nó.
+
+    As variáveis locais são resolvidas durante a compilação (resolver.py):
+    cada nome vira uma posição fixa no frame da função, e uma leitura em um
+    loop é um acesso por índice a uma lista, sem cadeia de Environment.
+
+    break, continue e yield não lançam exceções: a declaração devolve um
+    sinal que sobe pelos blocos até o loop ou a chamada que o trata.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.functions = interpreter.functions
+        self.intrinsics = interpreter.intrinsics
+        self.global_env = interpreter.global_env
+        self.global_variables = interpreter.global_env.variables
+        self.budget = interpreter.budget
+        # Chamadas de funções Quokka em andamento, comparadas com max_depth (budget.py)
+        self._call_depth = 0
+        # Função -> (corpo compilado, layout do frame), compilado na primeira chamada
+        self._compiled_functions: Dict[FunctionDef, Tuple[Compiled, FrameLayout]] = {}
+        # Estado da compilação em andamento: layout do frame e profundidade de loops
+        self._layout = FrameLayout("global")
+        self._loop_depth = 0
+        # Valor do último yield (acompanha o sinal RETURN)
+        self.return_value: QuokkaValue = None
+
+        self._statement_compilers = {
+            Print: self._compile_print,
+            If: self._compile_if,
+            While: self._compile_while,
+            Each: self._compile_each,
+            Break: self._compile_break,
+            Continue: self._compile_continue,
+            Yield: self._compile_yield,
+            Assign: self._compile_assign,
+            IndexAssign: self._compile_index_assign,
+            KeyAssign: self._compile_key_assign,
+            CompoundAssign: self._compile_compound_assign,
+            IncDec: self._compile_inc_dec,
+            Append: self._compile_append,
+            AppendPair: self._compile_append_pair,
+            ExprStatement: self._compile_expr_statement,
+        }
+        self._expression_compilers = {
+            Literal: self._compile_literal,
+            Name: self._compile_name,
+            ArrayLiteral: self._compile_array,
+            DictLiteral: self._compile_dict,
+            BinaryOp: self._compile_binary,
+            Logical: self._compile_logical,
+            Index: self._compile_index,
+            KeyAccess: self._compile_key_access,
+            Call: self._compile_call,
+            Conversion: self._compile_conversion,
+            Prompt: self._compile_prompt,
+        }
+
+        # Memoização e rastreamento: chamadas envolvidas e avisos por declaração compilados só com tracer
+        if interpreter.memo is not None:
+            self.call_function = interpreter.memo.wrap(self.call_function)
+        if interpreter.tracer is not None:
+            self.call_function = traced_calls(self.call_function, interpreter.tracer)
+        self._on_statement = statement_hook(interpreter.tracer)
+        # Ganchos de escopos, loops e alterações: variantes rastreadas compiladas só quando tratados
+        self.tracer = interpreter.tracer if traces_structure(interpreter.tracer) else None
+
+    # ------------------------------------------------------------------
+    # Itens de topo
+    # ------------------------------------------------------------------
+
+    def run_global(self, node: GlobalBlock):
+        """Define as variáveis do bloco global"""
+        for var_name, expr in node.declarations:
+            if expr is None:
+                value = None
+            else:
+                expression, layout = self._compile_unit(FrameLayout("global"), self.compile_expression, expr)
+                value = expression(layout.new_frame())
+            self.global_env.define(var_name, value)
+
+    def run_main(self, node: MainBlock):
+        """Compila e executa o bloco main no escopo global"""
+        body, layout = self._compile_unit(FrameLayout("main"), self.compile_block, node.body)
+        signal = body(layout.new_frame())
+        if signal is not None:
+            raise_signal(signal, self.return_value)
+
+    def call_function(self, func_name: str, args: List[QuokkaValue]) -> QuokkaValue:
+        """Executa uma chamada de função"""
+        function = self.functions.get(func_name)
+        if function is None:
+            raise QuokkaError(f"Função '{func_name}' não definida")
+
+        params = function.params
+        if len(args) != len(params):
+            raise QuokkaError(f"Função '{func_name}' espera {len(params)} argumentos, recebeu {len(args)}")
+
+        # Cada chamada consome um passo do orçamento, inclusive as respondidas pela intrínseca
+        budget = self.budget
+        budget.countdown -= 1
+        if budget.countdown <= 0:
+            budget.check()
+
+        # Implementação nativa da biblioteca, se houver
+        native = self.intrinsics.get(func_name)
+        if native is not None:
+            result = call_intrinsic(native, args)
+            if result is not NotImplemented:
+                return result
+
+        compiled = self._compiled_functions.get(function)
+        if compiled is None:
+            compiled = self._compile_unit(FrameLayout("function", params), self.compile_block, function.body)
+            if self.tracer is not None:
+                compiled = (self._traced_scope(compiled[0], f"função '{func_name}'"), compiled[1])
+            self._compiled_functions[function] = compiled
+        body, layout = compiled
+
+        # Funções só veem globais + parâmetros: o frame começa só com os parâmetros
+        frame = layout.new_frame()
+        for slot, value in zip(layout.param_slots, args):
+            frame[slot] = value
+        if self._call_depth >= budget.depth_limit:
+            raise budget.recursion_too_deep()
+        self._call_depth += 1
+        try:
+            signal = body(frame)
+        finally:
+            self._call_depth -= 1
+        if signal is RETURN:
+            return self.return_value
+        if signal is not None:
+            # break/continue fora de loop: interrompe o loop de quem chamou
+            raise_signal(signal)
+        return None
+
+    def _traced_scope(self, body: Compiled, context: str) -> Compiled:
+        """body com os avisos on_scope_enter e on_scope_exit do escopo local context"""
+        tracer = self.tracer
+
+        def run_scoped(frame):
+            tracer.on_scope_enter(context)
+            try:
+                return body(frame)
+            finally:
+                tracer.on_scope_exit(context)
+        return run_scoped
+
+    def _compile_unit(self, layout: FrameLayout, compile_node, node):
+        """Compila node (corpo de função, main ou expressão global) com seu próprio frame"""
+        previous = self._layout, self._loop_depth
+        self._layout, self._loop_depth = layout, 0
+        try:
+            return compile_node(node), layout
+        finally:
+            self._layout, self._loop_depth = previous
+
+    # ------------------------------------------------------------------
+    # Variáveis
+    # ------------------------------------------------------------------
+
+    @property
+    def _at_global_scope(self) -> bool:
+        """No main fora de loops (e no bloco global) o escopo atual é o global"""
+        return self._layout.kind != "function" and self._loop_depth == 0
+
+    def _compile_load(self, var_name: str) -> Compiled:
+        """Leitura de var_name: posição do frame, senão variável global"""
+        global_variables = self.global_variables
+
+        if self._at_global_scope:
+            def load_global(frame):
+                if var_name in global_variables:
+                    return global_variables[var_name]
+                raise QuokkaError(f"Variável '{var_name}' não definida")
+            return load_global
+
+        slot = self._layout.slot(var_name)
+        def load(frame):
+            value = frame[slot]
+            if value is UNSET:
+                if var_name in global_variables:
+                    return global_variables[var_name]
+                raise QuokkaError(f"Variável '{var_name}' não definida")
+            return value
+        return load
+
+    def _compile_store(self, var_name: str) -> Callable[[Frame, QuokkaValue], None]:
+        """Escrita em var_name com as regras de '=' (escopo mais próximo que já tem o nome)"""
+        global_variables = self.global_variables
+
+        if self._at_global_scope:
+            def store_global(frame, value):
+                global_variables[var_name] = value
+            return store_global
+
+        slot = self._layout.slot(var_name)
+        def store(frame, value):
+            if frame[slot] is UNSET and var_name in global_variables:
+                global_variables[var_name] = value
+            else:
+                frame[slot] = value
+        return store
+
+    def _compile_loop_body(self, body: Block, scoped_names=()):
+        """
+        Compila o corpo de um loop e devolve (corpo, nomes criados nele).
+
+        Os nomes criados são as posições (e nomes) que o corpo pode criar com
+        '='; no início do loop, os que ainda não existem são os que devem
+        voltar a UNSET no fim de cada iteração.
+        """
+        self._loop_depth += 1
+        try:
+            compiled = self.compile_block(body)
+        finally:
+            self._loop_depth -= 1
+        layout = self._layout
+        created = [(layout.slot(name), name) for name in sorted(created_in(body) - set(scoped_names))]
+        return compiled, created
+
+    # ------------------------------------------------------------------
+    # Declarações
+    # ------------------------------------------------------------------
+
+    def compile_block(self, block: Block) -> Compiled:
+        statements = [self._compile_statement(statement) for statement in block.statements]
+
+        if not statements:
+            return _noop
+        if len(statements) == 1:
+            return statements[0]
+        if len(statements) == 2:
+            first, second = statements
+            def run_pair(frame):
+                signal = first(frame)
+                if signal is not None:
+                    return signal
+                return second(frame)
+            return run_pair
+
+        def run_block(frame):
+            for statement in statements:
+                signal = statement(frame)
+                if signal is not None:
+                    return signal
+            return None
+        return run_block
+
+    def _compile_statement(self, node: Node) -> Compiled:
+        compiled = self._statement_compilers[node.__class__](node)
+        on_statement = self._on_statement
+        if on_statement is None:
+            return compiled
+
+        line = node.line
+        def run_traced(frame):
+            on_statement(line)
+            return compiled(frame)
+        return run_traced
+
+    def _compile_print(self, node: Print) -> Compiled:
+        value = self.compile_expression(node.value)
+        def run_print(frame):
+            print(quokka_to_string(value(frame)))
+        return run_print
+
+    def _compile_if(self, node: If) -> Compiled:
+        # Achata a cadeia if / else if / else em uma lista de ramos
+        branches = []
+        orelse = None
+        current = node
+        while current is not None:
+            branches.append((self.compile_expression(current.condition), self.compile_block(current.body)))
+            if isinstance(current.orelse, If):
+                current = current.orelse
+            else:
+                if current.orelse is not None:
+                    orelse = self.compile_block(current.orelse)
+                current = None
+
+        if len(branches) == 1:
+            condition, body = branches[0]
+            if orelse is None:
+                def run_if(frame):
+                    if is_truthy(condition(frame)):
+                        return body(frame)
+            else:
+                def run_if(frame):
+                    if is_truthy(condition(frame)):
+                        return body(frame)
+                    return orelse(frame)
+            return run_if
+
+        def run_if_chain(frame):
+            for condition, body in branches:
+                if is_truthy(condition(frame)):
+                    return body(frame)
+            if orelse is not None:
+                return orelse(frame)
+        return run_if_chain
+
+    def _compile_while(self, node: While) -> Compiled:
+        condition = self.compile_expression(node.condition)
+        body, created = self._compile_loop_body(node.body)
+        global_variables = self.global_variables
+        budget = self.budget
+        tracer = self.tracer
+
+        if tracer is not None:
+            def run_while_traced(frame):
+                fresh = [slot for slot, name in created if frame[slot] is UNSET and name not in global_variables]
+                tracer.on_scope_enter("while loop")
+                loop_count = 0
+                try:
+                    while True:
+                        loop_count += 1
+                        budget.countdown -= 1
+                        if budget.countdown <= 0:
+                            budget.check()
+                        value = condition(frame)
+                        tracer.on_loop_iteration("while", loop_count, value)
+                        if not is_truthy(value):
+                            break
+                        try:
+                            signal = body(frame)
+                        except BreakException:
+                            signal = BREAK
+                        except ContinueException:
+                            signal = CONTINUE
+                        for slot in fresh:
+                            frame[slot] = UNSET
+                        if signal is not None:
+                            if signal is RETURN:
+                                return RETURN
+                            if signal is BREAK:
+                                tracer.on_loop_control("while", "break", loop_count)
+                                break
+                            tracer.on_loop_control("while", "continue", loop_count)
+                except Exception as e:
+                    tracer.on_loop_error("while", loop_count, e)
+                    raise
+                finally:
+                    tracer.on_scope_exit("while loop")
+            return run_while_traced
+
+        def run_while(frame):
+            # Cada iteração roda em um escopo local novo: o que ela criar é apagado no fim
+            fresh = [slot for slot, name in created if frame[slot] is UNSET and name not in global_variables]
+            while True:
+                budget.countdown -= 1
+                if budget.countdown <= 0:
+                    budget.check()
+                if not is_truthy(condition(frame)):
+                    break
+                try:
+                    signal = body(frame)
+                except BreakException:
+                    # break fora de loop dentro de uma função chamada no corpo
+                    signal = BREAK
+                except ContinueException:
+                    signal = CONTINUE
+                for slot in fresh:
+                    frame[slot] = UNSET
+                if signal is not None and signal is not CONTINUE:
+                    if signal is RETURN:
+                        return RETURN
+                    break
+        return run_while
+
+    def _compile_each(self, node: Each) -> Compiled:
+        collection_name = node.collection
+        load_collection = self._compile_load(collection_name)
+        item_slot = self._layout.slot(node.item)
+        index_slot = self._layout.slot("__index__")
+        body, created = self._compile_loop_body(node.body, (node.item, "__index__"))
+        global_variables = self.global_variables
+        budget = self.budget
+        tracer = self.tracer
+
+        if tracer is not None:
+            item_name = node.item
+
+            def run_each_traced(frame):
+                items = each_items(load_collection(frame), collection_name)
+                fresh = [slot for slot, name in created if frame[slot] is UNSET and name not in global_variables]
+                saved_item, saved_index = frame[item_slot], frame[index_slot]
+                try:
+                    for iteration_index, item in enumerate(items):
+                        budget.countdown -= 1
+                        if budget.countdown <= 0:
+                            budget.check()
+                        frame[item_slot] = item
+                        frame[index_slot] = iteration_index
+                        tracer.on_loop_iteration("each", iteration_index, item, item_name)
+                        try:
+                            signal = body(frame)
+                        except BreakException:
+                            signal = BREAK
+                        except ContinueException:
+                            signal = CONTINUE
+                        for slot in fresh:
+                            frame[slot] = UNSET
+                        if signal is not None:
+                            if signal is RETURN:
+                                return RETURN
+                            if signal is BREAK:
+                                tracer.on_loop_control("each", "break", iteration_index)
+                                break
+                            tracer.on_loop_control("each", "continue", iteration_index)
+                finally:
+                    frame[item_slot], frame[index_slot] = saved_item, saved_index
+            return run_each_traced
+
+        def run_each(frame):
+            items = each_items(load_collection(frame), collection_name)
+            fresh = [slot for slot, name in created if frame[slot] is UNSET and name not in global_variables]
+            # A variável do item e __index__ escondem as de fora até o fim do loop
+            saved_item, saved_index = frame[item_slot], frame[index_slot]
+            try:
+                for iteration_index, item in enumerate(items):
+                    budget.countdown -= 1
+                    if budget.countdown <= 0:
+                        budget.check()
+                    frame[item_slot] = item
+                    frame[index_slot] = iteration_index
+                    try:
+                        signal = body(frame)
+                    except BreakException:
+                        signal = BREAK
+                    except ContinueException:
+                        signal = CONTINUE
+                    for slot in fresh:
+                        frame[slot] = UNSET
+                    if signal is not None and signal is not CONTINUE:
+                        if signal is RETURN:
+                            return RETURN
+                        break
+            finally:
+                frame[item_slot], frame[index_slot] = saved_item, saved_index
+        return run_each
+
+    def _compile_break(self, node: Break) -> Compiled:
+        return lambda frame: BREAK
+
+    def _compile_continue(self, node: Continue) -> Compiled:
+        return lambda frame: CONTINUE
+
+    def _compile_yield(self, node: Yield) -> Compiled:
+        value = self.compile_expression(node.value)
+        def run_yield(frame):
+            self.return_value = value(frame)
+            return RETURN
+        return run_yield
+
+    def _compile_assign(self, node: Assign) -> Compiled:
+        var_name = node.name
+        value = self.compile_expression(node.value)
+        global_variables = self.global_variables
+
+        if self._at_global_scope:
+            def run_assign_global(frame):
+                global_variables[var_name] = value(frame)
+            return run_assign_global
+
+        slot = self._layout.slot(var_name)
+        def run_assign(frame):
+            result = value(frame)
+            if frame[slot] is UNSET and var_name in global_variables:
+                global_variables[var_name] = result
+            else:
+                frame[slot] = result
+        return run_assign
+
+    def _compile_index_assign(self, node: IndexAssign) -> Compiled:
+        var_name = node.name
+        load = self._compile_load(var_name)
+        index_of = self.compile_expression(node.index)
+        value_of = self.compile_expression(node.value)
+        budget = self.budget
+
+        def run_index_assign(frame):
+            obj = load(frame)
+            index = index_of(frame)
+            value = value_of(frame)
+            if isinstance(obj, QuokkaArray):
+                if isinstance(index, int):
+                    # Verificado antes de o array ser expandido até o índice
+                    if index >= budget.size_limit:
+                        raise budget.collection_too_large(var_name)
+                    obj[index] = value
+                else:
+                    raise QuokkaError("Índice de array deve ser um número")
+            else:
+                raise QuokkaError(f"'{var_name}' não é um array")
+        return run_index_assign
+
+    def _compile_key_assign(self, node: KeyAssign) -> Compiled:
+        var_name = node.name
+        load = self._compile_load(var_name)
+        key_of = self.compile_expression(node.key)
+        value_of = self.compile_expression(node.value)
+        budget = self.budget
+
+        def run_key_assign(frame):
+            obj = load(frame)
+            key = key_of(frame)
+            if not isinstance(key, str):
+                key = str(key)
+            value = value_of(frame)
+            if isinstance(obj, QuokkaDict):
+                obj[key] = value
+                if len(obj.items) > budget.size_limit:
+                    raise budget.collection_too_large(var_name)
+            else:
+                raise QuokkaError(f"'{var_name}' não é um dicionário")
+        return run_key_assign
+
+    def _compile_compound_assign(self, node: CompoundAssign) -> Compiled:
+        var_name = node.name
+        load = self._compile_load(var_name)
+        store = self._compile_store(var_name)
+        operator_name = node.op
+        apply = operator.add if operator_name == "+=" else operator.sub
+        value_of = self.compile_expression(node.value)
+        tracer = self.tracer
+
+        if tracer is not None:
+            def run_compound_assign_traced(frame):
+                try:
+                    current_value = load(frame)
+                    expression_value = value_of(frame)
+                    if not isinstance(current_value, (int, float)):
+                        raise QuokkaError(f"Operador {operator_name} requer um número à esquerda")
+                    if not isinstance(expression_value, (int, float)):
+                        raise QuokkaError(f"Operador {operator_name} requer um número à direita")
+                    new_value = apply(current_value, expression_value)
+                    store(frame, new_value)
+                    tracer.on_update(var_name, operator_name, expression_value, current_value, new_value)
+                except Exception as e:
+                    raise QuokkaError(f"Erro ao executar {operator_name} em '{var_name}': {str(e)}")
+            return run_compound_assign_traced
+
+        def run_compound_assign(frame):
+            try:
+                current_value = load(frame)
+                expression_value = value_of(frame)
+                if not isinstance(current_value, (int, float)):
+                    raise QuokkaError(f"Operador {operator_name} requer um número à esquerda")
+                if not isinstance(expression_value, (int, float)):
+                    raise QuokkaError(f"Operador {operator_name} requer um número à direita")
+                store(frame, apply(current_value, expression_value))
+            except Exception as e:
+                raise QuokkaError(f"Erro ao executar {operator_name} em '{var_name}': {str(e)}")
+        return run_compound_assign
+
+    def _compile_inc_dec(self, node: IncDec) -> Compiled:
+        var_name = node.name
+        load = self._compile_load(var_name)
+        store = self._compile_store(var_name)
+        operator_name = node.op
+        step = 1 if operator_name == "++" else -1
+        tracer = self.tracer
+
+        if tracer is not None:
+            def run_inc_dec_traced(frame):
+                try:
+                    current_value = load(frame)
+                    if not isinstance(current_value, (int, float)):
+                        raise QuokkaError(f"Operador {operator_name} só pode ser usado com números")
+                    new_value = current_value + step
+                    store(frame, new_value)
+                    tracer.on_update(var_name, operator_name, None, current_value, new_value)
+                except Exception as e:
+                    raise QuokkaError(f"Erro ao executar {operator_name} em '{var_name}': {str(e)}")
+            return run_inc_dec_traced
+
+        def run_inc_dec(frame):
+            try:
+                current_value = load(frame)
+                if not isinstance(current_value, (int, float)):
+                    raise QuokkaError(f"Operador {operator_name} só pode ser usado com números")
+                store(frame, current_value + step)
+            except Exception as e:
+                raise QuokkaError(f"Erro ao executar {operator_name} em '{var_name}': {str(e)}")
+        return run_inc_dec
+
+    def _compile_append(self, node: Append) -> Compiled:
+        var_name = node.name
+        load = self._compile_load(var_name)
+        value_of = self.compile_expression(node.value)
+        budget = self.budget
+        tracer = self.tracer
+        if tracer is not None:
+            # Guarda o valor adicionado para o aviso on_append depois do '<<'
+            evaluate = value_of
+            appended = [None]
+
+            def value_of(frame):
+                appended[0] = value = evaluate(frame)
+                return value
+
+        def run_append(frame):
+            collection = load(frame)
+            if isinstance(collection, QuokkaArray):
+                value = value_of(frame)
+                if isinstance(value, QuokkaArray):
+                    collection.items.extend(value.items)
+                else:
+                    collection.items.append(value)
+            elif isinstance(collection, QuokkaDict):
+                value = value_of(frame)
+                if not isinstance(value, QuokkaDict):
+                    raise QuokkaError("Sintaxe inválida para append em dicionário. Use: dict << ('chave' = valor) ou dict << { 'chave' = valor }")
+                for key, item in value.items.items():
+                    collection[key] = item
+            else:
+                raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{var_name}' é {type(collection).__name__}")
+            if len(collection.items) > budget.size_limit:
+                raise budget.collection_too_large(var_name)
+
+        if tracer is not None:
+            def run_append_traced(frame):
+                run_append(frame)
+                tracer.on_append(var_name, appended[0])
+            return run_append_traced
+        return run_append
+
+    def _compile_append_pair(self, node: AppendPair) -> Compiled:
+        var_name = node.name
+        load = self._compile_load(var_name)
+        key = node.key
+        value_of = self.compile_expression(node.value)
+        budget = self.budget
+        tracer = self.tracer
+        if tracer is not None:
+            evaluate = value_of
+            appended = [None]
+
+            def value_of(frame):
+                appended[0] = value = evaluate(frame)
+                return value
+
+        def run_append_pair(frame):
+            collection = load(frame)
+            if isinstance(collection, QuokkaDict):
+                collection[key] = value_of(frame)
+                if len(collection.items) > budget.size_limit:
+                    raise budget.collection_too_large(var_name)
+            elif isinstance(collection, QuokkaArray):
+                raise QuokkaError("Esperado ')', encontrado '='")
+            else:
+                raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{var_name}' é {type(collection).__name__}")
+
+        if tracer is not None:
+            def run_append_pair_traced(frame):
+                run_append_pair(frame)
+                tracer.on_append(var_name, appended[0], key)
+            return run_append_pair_traced
+        return run_append_pair
+
+    def _compile_expr_statement(self, node: ExprStatement) -> Compiled:
+        expression = self.compile_expression(node.expr)
+        def run_expr_statement(frame):
+            expression(frame)
+        return run_expr_statement
+
+    # ------------------------------------------------------------------
+    # Expressões
+    # ------------------------------------------------------------------
+
+    def compile_expression(self, node: Node) -> Compiled:
+        return self._expression_compilers[node.__class__](node)
+
+    def _compile_literal(self, node: Literal) -> Compiled:
+        value = node.value
+        return lambda frame: value
+
+    def _compile_name(self, node: Name) -> Compiled:
+        return self._compile_load(node.name)
+
+    def _compile_array(self, node: ArrayLiteral) -> Compiled:
+        elements = [self.compile_expression(element) for element in node.elements]
+        if len(elements) > self.budget.size_limit:
+            # O tamanho do literal é fixo: só o literal grande demais paga a verificação
+            budget = self.budget
+
+            def run_array_too_large(frame):
+                for element in elements:
+                    element(frame)
+                raise budget.literal_too_large("Array")
+            return run_array_too_large
+        return lambda frame: QuokkaArray([element(frame) for element in elements])
+
+    def _compile_dict(self, node: DictLiteral) -> Compiled:
+        pairs = [(str(key), self.compile_expression(expr)) for key, expr in node.pairs]
+        if len({key for key, _ in pairs}) > self.budget.size_limit:
+            budget = self.budget
+
+            def run_dict_too_large(frame):
+                for _, value in pairs:
+                    value(frame)
+                raise budget.literal_too_large("Dicionário")
+            return run_dict_too_large
+        return lambda frame: QuokkaDict({key: value(frame) for key, value in pairs})
+
+    def _compile_binary(self, node: BinaryOp) -> Compiled:
+        left = self.compile_expression(node.left)
+        op = node.op
+
+        if op in _DIRECT_OPERATORS:
+            apply = _DIRECT_OPERATORS[op]
+            # Especialização comum: lado direito constante (i < 10, n - 1, ...)
+            if isinstance(node.right, Literal):
+                constant = node.right.value
+                return lambda frame: apply(left(frame), constant)
+            right = self.compile_expression(node.right)
+            return lambda frame: apply(left(frame), right(frame))
+
+        apply = BINARY_OPERATORS[op]
+        right = self.compile_expression(node.right)
+        return lambda frame: apply(left(frame), right(frame))
+
+    def _compile_logical(self, node: Logical) -> Compiled:
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        # Os dois lados são sempre avaliados (sem curto-circuito)
+        if node.op == "&&":
+            def run_and(frame):
+                left_value = is_truthy(left(frame))
+                right_value = is_truthy(right(frame))
+                return left_value and right_value
+            return run_and
+
+        def run_or(frame):
+            left_value = is_truthy(left(frame))
+            right_value = is_truthy(right(frame))
+            return left_value or right_value
+        return run_or
+
+    def _compile_index(self, node: Index) -> Compiled:
+        obj_of = self.compile_expression(node.obj)
+        index_of = self.compile_expression(node.index)
+
+        def run_index(frame):
+            obj = obj_of(frame)
+            index = index_of(frame)
+            if isinstance(obj, QuokkaArray):
+                if isinstance(index, int):
+                    return obj[index]
+                raise QuokkaError("Índice de array deve ser um número")
+            raise QuokkaError("Tentativa de acessar índice em não-array")
+        return run_index
+
+    def _compile_key_access(self, node: KeyAccess) -> Compiled:
+        obj_of = self.compile_expression(node.obj)
+        key_of = self.compile_expression(node.key)
+
+        def run_key_access(frame):
+            obj = obj_of(frame)
+            key = key_of(frame)
+            if not isinstance(key, str):
+                key = str(key)
+            if isinstance(obj, QuokkaDict):
+                return obj[key]
+            raise QuokkaError("Tentativa de acessar chave em não-dicionário")
+        return run_key_access
+
+    def _compile_call(self, node: Call) -> Compiled:
+        func_name = node.name
+        args_of = [self.compile_expression(arg) for arg in node.args]
+        call_function = self.call_function
+        return lambda frame: call_function(func_name, [arg(frame) for arg in args_of])
+
+    def _compile_conversion(self, node: Conversion) -> Compiled:
+        func_name = node.name
+        arg_of = self.compile_expression(node.arg)
+        return lambda frame: convert_value(func_name, arg_of(frame))
+
+    def _compile_prompt(self, node: Prompt) -> Compiled:
+        message_of = self.compile_expression(node.message)
+        return lambda frame: input(quokka_to_string(message_of(frame)))
@@ -0,0 +1,533 @@
+from itertools import count
+from typing import List
+
+from runtime import (
+    QuokkaArray, QuokkaDict, QuokkaValue, QuokkaError,
+    BreakException, ContinueException, Environment, BREAK, CONTINUE, RETURN,
+    is_truthy, raise_signal, quokka_to_string, convert_value, call_intrinsic,
+    quokka_add, quokka_power, each_items,
+)
+from tracer import statement_hook, traced_calls
+from ast_nodes import (
+    Literal, Name, ArrayLiteral, DictLiteral, BinaryOp, Logical, Index, KeyAccess,
+    Call, Conversion, Prompt, Block, Print, If, While, Each, Break, Continue, Yield,
+    Assign, IndexAssign, KeyAssign, CompoundAssign, IncDec, Append, AppendPair,
+    ExprStatement, GlobalBlock, MainBlock,
+)
+
+
+def _divide(left, right):
+    if right == 0:
+        raise QuokkaError("Divisão por zero")
+    return left / right
+
+def _modulo(left, right):
+    if not isinstance(left, int) or not isinstance(right, int):
+        raise QuokkaError("Módulo só funciona com números inteiros")
+    if right == 0:
+        raise QuokkaError("Divisão por zero no operador módulo")
+    return left % right
+
+# Implementação de cada operador binário (compartilhada pelos motores baseados em AST)
+BINARY_OPERATORS = {
+    "+": quokka_add,
+    "-": lambda left, right: left - right,
+    "*": lambda left, right: left * right,
+    "/": _divide,
+    "%": _modulo,
+    "**": quokka_power,
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    ">": lambda left, right: left > right,
+    "<": lambda left, right: left < right,
+    ">=": lambda left, right: left >= right,
+    "<=": lambda left, right: left <= right,
+}
+
+class QuokkaEvaluator:
+    """
+    Executa a AST produzida pelo QuokkaParser percorrendo a árvore.
+
+    Usa os mesmos ambientes (Environment) e regras de escopo do interpretador
+    por tokens; a diferença é que nenhum token é re-analisado durante a execução.
+
+    Cada declaração devolve None ou um sinal (BREAK, CONTINUE, RETURN) que
+    sobe pelos blocos até o loop ou a chamada que o trata; o valor do yield
+    fica em return_value.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.functions = interpreter.functions
+        self.intrinsics = interpreter.intrinsics
+        self.global_env = interpreter.global_env
+        self.env = interpreter.global_env
+        # Rastreamento (tracer.py); None = sem verificações durante a execução
+        self.tracer = interpreter.tracer
+        self.budget = interpreter.budget
+        # Chamadas de funções Quokka em andamento, comparadas com max_depth (budget.py)
+        self._call_depth = 0
+        # Valor do último yield (acompanha o sinal RETURN)
+        self.return_value: QuokkaValue = None
+
+        # Tabelas de despacho: classe do nó -> método
+        self._statements = {
+            Print: self._exec_print,
+            If: self._exec_if,
+            While: self._exec_while,
+            Each: self._exec_each,
+            Break: self._exec_break,
+            Continue: self._exec_continue,
+            Yield: self._exec_yield,
+            Assign: self._exec_assign,
+            IndexAssign: self._exec_index_assign,
+            KeyAssign: self._exec_key_assign,
+            CompoundAssign: self._exec_compound_assign,
+            IncDec: self._exec_inc_dec,
+            Append: self._exec_append,
+            AppendPair: self._exec_append_pair,
+            ExprStatement: self._exec_expr_statement,
+        }
+        self._expressions = {
+            Literal: self._eval_literal,
+            Name: self._eval_name,
+            ArrayLiteral: self._eval_array,
+            DictLiteral: self._eval_dict,
+            BinaryOp: self._eval_binary,
+            Logical: self._eval_logical,
+            Index: self._eval_index,
+            KeyAccess: self._eval_key_access,
+            Call: self._eval_call,
+            Conversion: self._eval_conversion,
+            Prompt: self._eval_prompt,
+        }
+
+        # Os ganchos de chamada e de declaração são ligados aqui, uma única vez
+        if interpreter.memo is not None:
+            self.call_function = interpreter.memo.wrap(self.call_function)
+        if self.tracer is not None:
+            self.call_function = traced_calls(self.call_function, self.tracer)
+        self._on_statement = statement_hook(self.tracer)
+        if self._on_statement is not None:
+            self.execute_block = self._execute_block_traced
+
+    # ------------------------------------------------------------------
+    # Itens de topo
+    # ------------------------------------------------------------------
+
+    def run_global(self, node: GlobalBlock):
+        """Define as variáveis do bloco global"""
+        for var_name, expr in node.declarations:
+            value = self.evaluate(expr) if expr is not None else None
+            self.global_env.define(var_name, value)
+
+    def run_main(self, node: MainBlock):
+        """Executa o bloco main no escopo global"""
+        signal = self.execute_block(node.body)
+        if signal is not None:
+            raise_signal(signal, self.return_value)
+
+    # ------------------------------------------------------------------
+    # Declarações
+    # ------------------------------------------------------------------
+
+    def execute_block(self, block: Block):
+        """Executa as declarações do bloco; para no primeiro sinal e o devolve"""
+        statements = self._statements
+        for statement in block.statements:
+            signal = statements[statement.__class__](statement)
+            if signal is not None:
+                return signal
+        return None
+
+    def _execute_block_traced(self, block: Block):
+        """execute_block com o aviso on_statement antes de cada declaração"""
+        statements = self._statements
+        on_statement = self._on_statement
+        for statement in block.statements:
+            on_statement(statement.line)
+            signal = statements[statement.__class__](statement)
+            if signal is not None:
+                return signal
+        return None
+
+    def _execute_in_local_scope(self, block: Block, context: str):
+        """Executa um bloco em um escopo local temporário, restaurando o anterior ao final"""
+        old_env = self.env
+        tracer = self.tracer
+        try:
+            self.env = Environment(old_env)
+            if tracer is not None:
+                tracer.on_scope_enter(context)
+            return self.execute_block(block)
+        finally:
+            self.env = old_env
+            if tracer is not None:
+                tracer.on_scope_exit(context)
+
+    def _exec_print(self, node: Print):
+        print(quokka_to_string(self.evaluate(node.value)))
+
+    def _exec_if(self, node: If):
+        while True:
+            if is_truthy(self.evaluate(node.condition)):
+                return self.execute_block(node.body)
+            orelse = node.orelse
+            if orelse is None:
+                return None
+            if orelse.__class__ is not If:
+                return self.execute_block(orelse)
+            node = orelse
+
+    def _exec_while(self, node: While):
+        condition = node.condition
+        body = node.body
+        tracer = self.tracer
+        budget = self.budget
+
+        # Um único escopo local serve a todas as iterações: é esvaziado no início de cada uma
+        old_env = self.env
+        loop_env = self.env = Environment(old_env)
+        if tracer is not None:
+            tracer.on_scope_enter("while loop")
+
+        loop_count = 0
+        try:
+            for loop_count in count(1):
+                budget.countdown -= 1
+                if budget.countdown <= 0:
+                    budget.check()
+                loop_env.reset()
+
+                value = self.evaluate(condition)
+                if tracer is not None:
+                    tracer.on_loop_iteration("while", loop_count, value)
+
+                if not is_truthy(value):
+                    break
+
+                try:
+                    signal = self.execute_block(body)
+                except BreakException:
+                    # break fora de loop dentro de uma função chamada no corpo
+                    signal = BREAK
+                except ContinueException:
+                    signal = CONTINUE
+
+                if signal is not None:
+                    if signal is RETURN:
+                        return RETURN
+                    if signal is BREAK:
+                        if tracer is not None:
+                            tracer.on_loop_control("while", "break", loop_count)
+                        break
+                    if tracer is not None:
+                        tracer.on_loop_control("while", "continue", loop_count)
+
+        except Exception as e:
+            if tracer is not None:
+                tracer.on_loop_error("while", loop_count, e)
+            raise
+        finally:
+            self.env = old_env
+            if tracer is not None:
+                tracer.on_scope_exit("while loop")
+        return None
+
+    def _exec_each(self, node: Each):
+        items = each_items(self.env.get(node.collection), node.collection)
+        item_var_name = node.item
+        body = node.body
+        tracer = self.tracer
+        budget = self.budget
+
+        # Um único escopo para o loop; a cada iteração ficam só o item e __index__
+        old_env = self.env
+        loop_env = self.env = Environment(old_env)
+        variables = loop_env.variables
+        keep = len({item_var_name, "__index__"})
+
+        try:
+            for iteration_index, item in enumerate(items):
+                budget.countdown -= 1
+                if budget.countdown <= 0:
+                    budget.check()
+                loop_env.reset(keep)
+                variables[item_var_name] = item
+                variables["__index__"] = iteration_index
+
+                if tracer is not None:
+                    tracer.on_loop_iteration("each", iteration_index, item, item_var_name)
+
+                try:
+                    signal = self.execute_block(body)
+                except BreakException:
+                    signal = BREAK
+                except ContinueException:
+                    signal = CONTINUE
+
+                if signal is not None:
+                    if signal is RETURN:
+                        return RETURN
+                    if signal is BREAK:
+                        if tracer is not None:
+                            tracer.on_loop_control("each", "break", iteration_index)
+                        break
+                    if tracer is not None:
+                        tracer.on_loop_control("each", "continue", iteration_index)
+        finally:
+            self.env = old_env
+        return None
+
+    def _exec_break(self, node: Break):
+        return BREAK
+
+    def _exec_continue(self, node: Continue):
+        return CONTINUE
+
+    def _exec_yield(self, node: Yield):
+        self.return_value = self.evaluate(node.value)
+        return RETURN
+
+    def _exec_assign(self, node: Assign):
+        self.env.set(node.name, self.evaluate(node.value))
+
+    def _exec_index_assign(self, node: IndexAssign):
+        obj = self.env.get(node.name)
+        index = self.evaluate(node.index)
+        value = self.evaluate(node.value)
+
+        if isinstance(obj, QuokkaArray):
+            if isinstance(index, int):
+                # Verificado antes de o array ser expandido até o índice
+                if index >= self.budget.size_limit:
+                    raise self.budget.collection_too_large(node.name)
+                obj[index] = value
+            else:
+                raise QuokkaError("Índice de array deve ser um número")
+        else:
+            raise QuokkaError(f"'{node.name}' não é um array")
+
+    def _exec_key_assign(self, node: KeyAssign):
+        obj = self.env.get(node.name)
+        key = self.evaluate(node.key)
+        if not isinstance(key, str):
+            key = str(key)
+        value = self.evaluate(node.value)
+
+        if isinstance(obj, QuokkaDict):
+            obj[key] = value
+            if len(obj.items) > self.budget.size_limit:
+                raise self.budget.collection_too_large(node.name)
+        else:
+            raise QuokkaError(f"'{node.name}' não é um dicionário")
+
+    def _exec_compound_assign(self, node: CompoundAssign):
+        var_name = node.name
+        operator = node.op
+        try:
+            current_value = self.env.get(var_name)
+            expression_value = self.evaluate(node.value)
+
+            if not isinstance(current_value, (int, float)):
+                raise QuokkaError(f"Operador {operator} requer um número à esquerda")
+            if not isinstance(expression_value, (int, float)):
+                raise QuokkaError(f"Operador {operator} requer um número à direita")
+
+            if operator == "+=":
+                new_value = current_value + expression_value
+            else:
+                new_value = current_value - expression_value
+
+            self.env.set(var_name, new_value)
+
+            if self.tracer is not None:
+                self.tracer.on_update(var_name, operator, expression_value, current_value, new_value)
+
+        except Exception as e:
+            raise QuokkaError(f"Erro ao executar {operator} em '{var_name}': {str(e)}")
+
+    def _exec_inc_dec(self, node: IncDec):
+        var_name = node.name
+        operator = node.op
+        try:
+            current_value = self.env.get(var_name)
+
+            if not isinstance(current_value, (int, float)):
+                raise QuokkaError(f"Operador {operator} só pode ser usado com números")
+
+            new_value = current_value + 1 if operator == "++" else current_value - 1
+            self.env.set(var_name, new_value)
+
+            if self.tracer is not None:
+                self.tracer.on_update(var_name, operator, None, current_value, new_value)
+
+        except Exception as e:
+            raise QuokkaError(f"Erro ao executar {operator} em '{var_name}': {str(e)}")
+
+    def _exec_append(self, node: Append):
+        collection = self.env.get(node.name)
+
+        if isinstance(collection, QuokkaArray):
+            value = self.evaluate(node.value)
+            if isinstance(value, QuokkaArray):
+                # Se o valor é um array, adiciona todos os elementos
+                collection.items.extend(value.items)
+            else:
+                collection.append(value)
+
+        elif isinstance(collection, QuokkaDict):
+            value = self.evaluate(node.value)
+            if not isinstance(value, QuokkaDict):
+                raise QuokkaError("Sintaxe inválida para append em dicionário. Use: dict << ('chave' = valor) ou dict << { 'chave' = valor }")
+            for key, item in value.items.items():
+                collection[key] = item
+
+        else:
+            raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{node.name}' é {type(collection).__name__}")
+
+        if len(collection.items) > self.budget.size_limit:
+            raise self.budget.collection_too_large(node.name)
+        if self.tracer is not None:
+            self.tracer.on_append(node.name, value)
+
+    def _exec_append_pair(self, node: AppendPair):
+        collection = self.env.get(node.name)
+
+        if isinstance(collection, QuokkaDict):
+            value = self.evaluate(node.value)
+            collection[node.key] = value
+            if len(collection.items) > self.budget.size_limit:
+                raise self.budget.collection_too_large(node.name)
+            if self.tracer is not None:
+                self.tracer.on_append(node.name, value, node.key)
+        elif isinstance(collection, QuokkaArray):
+            # ('chave' = valor) não é uma expressão válida para arrays
+            raise QuokkaError("Esperado ')', encontrado '='")
+        else:
+            raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{node.name}' é {type(collection).__name__}")
+
+    def _exec_expr_statement(self, node: ExprStatement):
+        self.evaluate(node.expr)
+
+    # ------------------------------------------------------------------
+    # Expressões
+    # ------------------------------------------------------------------
+
+    def evaluate(self, node) -> QuokkaValue:
+        return self._expressions[node.__class__](node)
+
+    def _eval_literal(self, node: Literal) -> QuokkaValue:
+        return node.value
+
+    def _eval_name(self, node: Name) -> QuokkaValue:
+        return self.env.get(node.name)
+
+    def _eval_array(self, node: ArrayLiteral) -> QuokkaArray:
+        evaluate = self.evaluate
+        array = QuokkaArray([evaluate(element) for element in node.elements])
+        if len(array.items) > self.budget.size_limit:
+            raise self.budget.literal_too_large("Array")
+        return array
+
+    def _eval_dict(self, node: DictLiteral) -> QuokkaDict:
+        dictionary = QuokkaDict()
+        for key, expr in node.pairs:
+            dictionary[key] = self.evaluate(expr)
+        if len(dictionary.items) > self.budget.size_limit:
+            raise self.budget.literal_too_large("Dicionário")
+        return dictionary
+
+    def _eval_binary(self, node: BinaryOp) -> QuokkaValue:
+        left = self.evaluate(node.left)
+        right = self.evaluate(node.right)
+        return BINARY_OPERATORS[node.op](left, right)
+
+    def _eval_logical(self, node: Logical) -> bool:
+        # Os dois lados são sempre avaliados (sem curto-circuito), como no interpretador por tokens
+        left = is_truthy(self.evaluate(node.left))
+        right = is_truthy(self.evaluate(node.right))
+        if node.op == "&&":
+            return left and right
+        return left or right
+
+    def _eval_index(self, node: Index) -> QuokkaValue:
+        obj = self.evaluate(node.obj)
+        index = self.evaluate(node.index)
+
+        if isinstance(obj, QuokkaArray):
+            if isinstance(index, int):
+                return obj[index]
+            raise QuokkaError("Índice de array deve ser um número")
+        raise QuokkaError("Tentativa de acessar índice em não-array")
+
+    def _eval_key_access(self, node: KeyAccess) -> QuokkaValue:
+        obj = self.evaluate(node.obj)
+        key = self.evaluate(node.key)
+        if not isinstance(key, str):
+            key = str(key)
+
+        if isinstance(obj, QuokkaDict):
+            return obj[key]
+        raise QuokkaError("Tentativa de acessar chave em não-dicionário")
+
+    def _eval_call(self, node: Call) -> QuokkaValue:
+        evaluate = self.evaluate
+        args = [evaluate(arg) for arg in node.args]
+        return self.call_function(node.name, args)
+
+    def _eval_conversion(self, node: Conversion) -> QuokkaValue:
+        return convert_value(node.name, self.evaluate(node.arg))
+
+    def _eval_prompt(self, node: Prompt) -> str:
+        message = quokka_to_string(self.evaluate(node.message))
+        return input(message)
+
+    # ------------------------------------------------------------------
+    # Funções
+    # ------------------------------------------------------------------
+
+    def call_function(self, func_name: str, args: List[QuokkaValue]) -> QuokkaValue:
+        """Executa uma chamada de função"""
+        function = self.functions.get(func_name)
+        if function is None:
+            raise QuokkaError(f"Função '{func_name}' não definida")
+
+        if len(args) != len(function.params):
+            raise QuokkaError(f"Função '{func_name}' espera {len(function.params)} argumentos, recebeu {len(args)}")
+
+        # Cada chamada consome um passo do orçamento, inclusive as respondidas pela intrínseca
+        budget = self.budget
+        budget.countdown -= 1
+        if budget.countdown <= 0:
+            budget.check()
+
+        # Implementação nativa da biblioteca, se houver
+        native = self.intrinsics.get(func_name)
+        if native is not None:
+            result = call_intrinsic(native, args)
+            if result is not NotImplemented:
+                return result
+
+        # Funções só veem globais + parâmetros
+        func_env = Environment(self.global_env)
+        for param_name, arg_value in zip(function.params, args):
+            func_env.define(param_name, arg_value)
+
+        if self._call_depth >= budget.depth_limit:
+            raise budget.recursion_too_deep()
+        old_env = self.env
+        self.env = func_env
+        self._call_depth += 1
+        try:
+            signal = self._execute_in_local_scope(function.body, f"função '{func_name}'")
+        finally:
+            self.env = old_env
+            self._call_depth -= 1
+
+        if signal is RETURN:
+            return self.return_value
+        if signal is not None:
+            # break/continue fora de loop: interrompe o loop de quem chamou
+            raise_signal(signal)
+        return None
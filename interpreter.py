@@ -1,193 +1,134 @@
-from typing import Any, Dict, List, Optional, Union
-from dataclasses import dataclass
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import os
 import sys
-
-from lexer import QuokkaLexer, Token
-
-class QuokkaArray:
-    """Representa um array do Quokka (lista com sintaxe especial)"""
-    def __init__(self, items: List[Any] = None):
-        self.items = items or []
-    
-    def __str__(self):
-        return "{ " + " . ".join(str(item) for item in self.items) + " }"
-    
-    def __repr__(self):
-        return f"QuokkaArray({self.items})"
-    
-    def __len__(self):
-        return len(self.items)
-    
-    def __getitem__(self, index):
-        if isinstance(index, int) and 0 <= index < len(self.items):
-            return self.items[index]
-        return None
-    
-    def __setitem__(self, index, value):
-        if isinstance(index, int):
-            # Expande o array se necessário
-            while len(self.items) <= index:
-                self.items.append(None)
-            self.items[index] = value
-    
-    def append(self, value):
-        self.items.append(value)
-    
-    def to_list(self):
-        return self.items.copy()
-
-    def extend(self, other_array):
-        """Adiciona todos os elementos de outro array"""
-        if isinstance(other_array, QuokkaArray):
-            self.items.extend(other_array.items)
-        elif isinstance(other_array, list):
-            self.items.extend(other_array)
-        else:
-            raise ValueError("extend() requer um QuokkaArray ou lista")
-
-    def size(self):
-        """Retorna o tamanho do array"""
-        return len(self.items)
-
-class QuokkaDict:
-    """Representa um dicionário do Quokka"""
-    def __init__(self, items: Dict[str, Any] = None):
-        self.items = items or {}
-    
-    def __str__(self):
-        pairs = []
-        for key, value in self.items.items():
-            if isinstance(value, str):
-                value_str = f'"{value}"'
-            else:
-                value_str = str(value)
-            pairs.append(f"'{key}' = {value_str}")
-        return "{ " + " . ".join(pairs) + " }"
-    
-    def __repr__(self):
-        return f"QuokkaDict({self.items})"
-    
-    def __getitem__(self, key):
-        return self.items.get(str(key))
-    
-    def __setitem__(self, key, value):
-        self.items[str(key)] = value
-    
-    def __contains__(self, key):
-        return str(key) in self.items
-    
-    def keys(self):
-        return list(self.items.keys())
-    
-    def values(self):
-        return list(self.items.values())
-
-    def update(self, other_dict):
-        """Atualiza o dicionário com chaves de outro dicionário"""
-        if isinstance(other_dict, QuokkaDict):
-            self.items.update(other_dict.items)
-        elif isinstance(other_dict, dict):
-            self.items.update(other_dict)
-        else:
-            raise ValueError("update() requer um QuokkaDict ou dict")
-
-    def size(self):
-        """Retorna o número de chaves no dicionário"""
-        return len(self.items)
-# Tipos de dados que o Quokka pode ter
-QuokkaValue = Union[None, bool, int, float, str, QuokkaArray, QuokkaDict]
-
-@dataclass
-class QuokkaError(Exception):
-    """Erro customizado para o interpretador Quokka"""
-    message: str
-    line: int = 0
-    column: int = 0
-
-class BreakException(Exception):
-    """Exceção especial para implementar break (controle de fluxo)"""
-    pass
-
-class ContinueException(Exception):
-    """Exceção especial para implementar continue (controle de fluxo)"""
-    pass
-
-class Environment:
-    """Ambiente de execução - armazena variáveis e seus valores"""
-    
-    def __init__(self, parent: Optional['Environment'] = None):
-        self.variables: Dict[str, QuokkaValue] = {}
-        self.parent = parent
-    
-    def define(self, name: str, value: QuokkaValue):
-        """Define uma nova variável"""
-        self.variables[name] = value
-    
-    def get(self, name: str) -> QuokkaValue:
-        """Busca o valor de uma variável"""
-        if name in self.variables:
-            return self.variables[name]
-        elif self.parent:
-            return self.parent.get(name)
-        else:
-            raise QuokkaError(f"Variável '{name}' não definida")
-    
-    def set(self, name: str, value: QuokkaValue):
-        """Atualiza o valor de uma variável existente"""
-        if name in self.variables:
-            self.variables[name] = value
-        elif self.parent and self.parent.has(name):
-            self.parent.set(name, value)
-        else:
-            # Se não existe, cria nova
-            self.variables[name] = value
-    
-    def has(self, name: str) -> bool:
-        """Verifica se uma variável existe"""
-        return name in self.variables or (self.parent and self.parent.has(name))
-    def create_local_scope(self) -> 'Environment':
-        """Cria um novo escopo local baseado no atual"""
-        return Environment(parent=self)
-
-    def get_all_variables(self) -> Dict[str, QuokkaValue]:
-        """Retorna todas as variáveis visíveis (incluindo do parent)"""
-        all_vars = {}
-        if self.parent:
-            all_vars.update(self.parent.get_all_variables())
-        all_vars.update(self.variables)
-        return all_vars
+import time
+
+from lexer import QuokkaLexer, Token, TokenStore, TokenView, TYPE_CODES
+from ast_parser import QuokkaParser, LazyFunctionDef
+from ast_nodes import Import, GlobalBlock, FunctionDef, MainBlock, Program
+from evaluator import QuokkaEvaluator
+from closure_compiler import ClosureEngine
+from vm import QuokkaVM
+from bytecode import disassemble_program
+from transpiler import PythonBackend, transpile_program
+import module_cache
+from module_registry import MODULE_REGISTRY, LoadedModule
+from intrinsics import INTRINSICS, bind_budget
+from budget import ExecutionBudget
+from tracer import Tracer, DebugTracer, statement_hook, traced_calls
+from stats import RuntimeStats
+from memo import MemoTable
+from optimizer import optimize_program
+from runtime import (
+    QuokkaArray, QuokkaDict, QuokkaValue, QuokkaError,
+    BreakException, ContinueException, Environment, BREAK, CONTINUE, RETURN,
+    raise_signal, CONVERSION_FUNCTIONS, is_truthy, quokka_to_string, convert_value, call_intrinsic,
+)
+
+# Códigos de tipo usados nas verificações de token do motor "tokens"
+_KEYWORD = TYPE_CODES["KEYWORD"]
+_SYMBOL = TYPE_CODES["SYMBOL"]
+_DOPERATOR = TYPE_CODES["DOPERATOR"]
+_OOPERATOR = TYPE_CODES["OOPERATOR"]
 
 class QuokkaFunction:
     """Representa uma função definida pelo usuário"""
-    def __init__(self, name: str, params: List[str], body: List[Token], start_token: int, end_token: int):
+    def __init__(self, name: str, params: List[str], body: TokenView, start_token: int, end_token: int):
         self.name = name
         self.params = params
         self.body = body  
         self.start_token = start_token  
         self.end_token = end_token      
 
-class YieldException(Exception):
-    """Exceção especial para implementar yield (controle de fluxo)"""
-    def __init__(self, value):
-        self.value = value
+class CallSite:
+    """
+    Nome lido a partir de um identificador do motor "tokens" (calcular.imc
+    já montado) e, se ele for chamado, a função resolvida para esse ponto.
+    """
+    __slots__ = ("name", "length", "conversion", "version", "function", "native")
+
+    def __init__(self, name: str, length: int):
+        self.name = name
+        # Tokens ocupados pelo nome (identificadores e pontos)
+        self.length = length
+        self.conversion = length == 1 and name in CONVERSION_FUNCTIONS
+        # Versão das funções em que function/native foram resolvidas (-1 = nunca)
+        self.version = -1
+        self.function: Optional[QuokkaFunction] = None
+        self.native: Optional[Callable] = None
 
 class QuokkaInterpreter:
     """Interpretador principal do Quokka"""
 
-
-
-
-    def __init__(self, auto_load_libs=True):
+    # Motores de execução disponíveis:
+    #   "ast"     - analisa o programa uma vez e executa a árvore sintática (padrão)
+    #   "closure" - compila cada nó da árvore em closures Python antes de executar
+    #   "vm"      - compila para bytecode de pilha e executa na máquina virtual
+    #   "python"  - traduz o programa para código Python e o executa com compile()/exec()
+    #   "tokens"  - interpreta diretamente a lista de tokens (implementação original)
+    ENGINES = ("ast", "closure", "vm", "python", "tokens")
+
+    def __init__(self, auto_load_libs=True, engine: str = "ast", use_cache: bool = True,
+                 use_intrinsics: bool = True, max_steps: Optional[int] = None,
+                 timeout: Optional[float] = None, max_collection_size: Optional[int] = None,
+                 max_depth: Optional[int] = None, memoize: Union[bool, List[str]] = False, memo_size: int = 1024,
+                 optimize: bool = True):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Motor de execução desconhecido: '{engine}'. Use um de: {', '.join(self.ENGINES)}")
+        self.engine = engine
+        # Cache em disco da forma analisada dos arquivos (__qkcache__/<nome>.qkc)
+        self.use_cache = use_cache
         self.lexer = QuokkaLexer()
-        self.tokens: List[Token] = []
+        # Tokens em análise pelo motor "tokens": visão de um TokenStore (corpos de
+        # função e de loop são visões do mesmo armazenamento, sem cópia)
+        self.tokens: TokenView = TokenStore(()).view()
         self.current = 0
         
         # Ambientes de execução
         self.global_env = Environment()
         self.current_env = self.global_env
+        # Valor do último yield no motor "tokens" (acompanha o sinal RETURN)
+        self.return_value: QuokkaValue = None
         
         # Armazena funções definidas pelo usuário
-        self.functions: Dict[str, 'FunctionDef'] = {}
+        # (FunctionDef no motor "ast", QuokkaFunction no motor "tokens")
+        self.functions: Dict[str, Union[FunctionDef, QuokkaFunction]] = {}
+        # Pontos de chamada do motor "tokens": armazenamento -> posição -> CallSite.
+        # A resolução vale enquanto _functions_version não muda (definir função
+        # ou importar módulo); o nome montado vale até o fim da execução: interpret()
+        # recomeça a tabela, para não reter os armazenamentos de programas anteriores
+        self._call_sites: Dict[TokenStore, Dict[int, CallSite]] = {}
+        self._functions_version = 0
+        # Chamadas de funções Quokka em andamento no motor "tokens", comparadas com max_depth (budget.py)
+        self._call_depth = 0
+
+        # Implementações nativas das funções de biblioteca importadas (nome -> função
+        # Python). Redefinir a função em Quokka remove a intrínseca.
+        self.use_intrinsics = use_intrinsics
+        self.intrinsics: Dict[str, Callable] = {}
+
+        # Dobra de constantes e remoção de ramos mortos antes da execução (optimizer.py)
+        self.optimize = optimize
+
+        # Limites de execução (passos, segundos, elementos por coleção, chamadas
+        # aninhadas no motor "vm"); None = sem limite
+        self.budget = ExecutionBudget(max_steps, timeout, max_collection_size, max_depth)
+
+        # Rastreamento da execução (tracer.py); instalado com set_tracer()
+        self.tracer: Optional[Tracer] = None
+
+        # Memoização (memo.py): True = funções puras pela análise; lista = só as funções listadas
+        self.memo: Optional[MemoTable] = None
+        if memoize:
+            self.memo = MemoTable(self, memo_size, None if memoize is True else memoize)
+            self._bind_call_hooks()
+
+        # Métricas da última execução (stats.py), lidas com stats()
+        self.metrics = RuntimeStats()
+
+        # Executor da AST do programa em andamento
+        self._executor: Optional[Union[QuokkaEvaluator, ClosureEngine, QuokkaVM, PythonBackend]] = None
         
         # Configuração de módulos e bibliotecas
         self.module_paths = [
@@ -195,6 +136,10 @@ class QuokkaInterpreter:
             "modules",   # Módulos do usuário
             "."          # Diretório atual
         ]
+        # Caminhos dos módulos já importados por este interpretador (reimportar não faz nada)
+        self.imported_modules: set = set()
+        # Pilha de módulos em importação, para detectar importações circulares
+        self._import_stack: List[str] = []
 
     def _find_module(self, module_name: str) -> str:
         """
@@ -226,53 +171,113 @@ class QuokkaInterpreter:
         raise QuokkaError(f"Módulo '{module_name}' não encontrado")
 
     def _load_library(self, lib_name: str):
-        """Carrega uma biblioteca ou módulo"""
+        """
+        Carrega uma biblioteca ou módulo.
+
+        O módulo é analisado uma única vez por processo (MODULE_REGISTRY); os
+        módulos que ele importa são carregados antes das suas funções.
+        Importar de novo um módulo já carregado neste interpretador não faz nada.
+        """
     
         # Encontra o arquivo
         lib_path = self._find_module(lib_name)
-    
+        if lib_path in self.imported_modules:
+            return
+        if lib_path in self._import_stack:
+            cycle = self._import_stack[self._import_stack.index(lib_path):] + [lib_path]
+            names = " -> ".join(os.path.splitext(os.path.basename(path))[0] for path in cycle)
+            raise QuokkaError(f"Importação circular: {names}")
+    
+        self._import_stack.append(lib_path)
         try:
-            with open(lib_path, 'r', encoding='utf-8') as f:
-                lib_code = f.read()
-        
-            # Salva estado
-            old_tokens = self.tokens
-            old_current = self.current
-        
-            # Tokeniza e processa
-            self.tokens = self.lexer.tokenize(lib_code)
-            self.current = 0
-        
-            # Processa funções
+            started = time.perf_counter()
+            module = self._get_module(lib_name, lib_path)
+            self.metrics.modules[lib_name] = time.perf_counter() - started
+            for dependency in module.imports:
+                self._load_library(dependency)
+            for function in module.functions.values():
+                self._define_function(function)
+            if self.use_intrinsics:
+                for func_name, native in INTRINSICS.get(lib_name, {}).items():
+                    if func_name in module.functions:
+                        self.intrinsics[func_name] = bind_budget(native, self.budget)
+        except Exception as e:
+            raise QuokkaError(f"Erro ao carregar '{lib_name}': {str(e)}")
+        finally:
+            self._import_stack.pop()
+            # Intrínsecas novas invalidam os pontos de chamada resolvidos
+            self._functions_version += 1
+
+        self.imported_modules.add(lib_path)
+        if self.tracer is not None:
+            self.tracer.on_import(lib_name)
+
+    def library_function_counts(self) -> Tuple[int, int]:
+        """
+        (funções de biblioteca disponíveis, funções cujo corpo já foi analisado).
+
+        Nos motores da AST as funções de biblioteca são LazyFunctionDef e o
+        corpo só é analisado na primeira chamada. Como os módulos são
+        compartilhados pelo processo, conta também o que outros
+        interpretadores já materializaram.
+        """
+        lazy = [function for function in self.functions.values() if isinstance(function, LazyFunctionDef)]
+        return len(lazy), sum(1 for function in lazy if function.materialized)
+
+    def _get_module(self, lib_name: str, lib_path: str) -> LoadedModule:
+        """Módulo do registro do processo; analisa o arquivo (ou lê o cache em disco) se ainda não estiver lá"""
+        form = "tokens" if self.engine == "tokens" else "ast"
+        module = MODULE_REGISTRY.get(lib_path, form)
+        if module is not None:
+            return module
+
+        if self.engine != "tokens":
+            library = self._parse_source("library", lib_path)
+            imports = [name for item in library.body if isinstance(item, Import) for name in item.modules]
+            functions = {item.name: item for item in library.body if isinstance(item, FunctionDef)}
+            return MODULE_REGISTRY.register(lib_name, lib_path, form, imports, functions)
+    
+        # Salva estado
+        old_tokens = self.tokens
+        old_current = self.current
+        try:
+            # Tokeniza (ou lê os tokens do cache) e processa imports e funções
+            self._load_tokens(self._parse_source("tokens", lib_path))
+            imports = []
+            functions = {}
             while not self._is_at_end():
-                if self._check_keyword("fun"):
-                    self._parse_function()
+                if self._check_keyword("import"):
+                    imports.extend(self._parse_import_names())
+                elif self._check_keyword("fun"):
+                    function = self._parse_function_definition()
+                    functions[function.name] = function
                 else:
                     self._advance()
-        
+        finally:
             # Restaura
             self.tokens = old_tokens
             self.current = old_current
-        
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"✅ Módulo carregado: {lib_name}")
-        
-        except Exception as e:
-            raise QuokkaError(f"Erro ao carregar '{lib_name}': {str(e)}")
+        return MODULE_REGISTRY.register(lib_name, lib_path, form, imports, functions)
 
     def _parse_import(self):
         """Parse: imports { "core" . "utils" }"""
+        for lib_name in self._parse_import_names():
+            self._load_library(lib_name)
+
+    def _parse_import_names(self) -> List[str]:
+        """Consome 'import { "a" . "b" }' e devolve os nomes dos módulos"""
         self._consume_keyword("import")
         self._consume_symbol("{")
         
+        names = []
         while not self._check_symbol("}") and not self._is_at_end():
             if self._check_type("STRING"):
-                lib_name = self._advance().value
-                self._load_library(lib_name)
+                names.append(self._advance().value)
             else:
                 self._advance()
         
         self._consume_symbol("}")
+        return names
 
     def _execute_with_local_scope(self, execution_func, context="local"):
         """
@@ -281,14 +286,15 @@ class QuokkaInterpreter:
     """
     # Salva escopo atual
         old_env = self.current_env
+        tracer = self.tracer
     
         try:
         # Cria novo escopo local
             local_env = old_env.create_local_scope()
             self.current_env = local_env
         
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] Criando escopo local para: {context}")
+            if tracer is not None:
+                tracer.on_scope_enter(context)
         
         # Executa a função passada
             return execution_func()
@@ -296,19 +302,59 @@ class QuokkaInterpreter:
         finally:
         # Sempre restaura o escopo original
             self.current_env = old_env
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] Escopo local restaurado: {context}")
+            if tracer is not None:
+                tracer.on_scope_exit(context)
+
+    def set_tracer(self, tracer: Optional[Tracer]):
+        """
+        Instala um tracer (ou remove, com None) para as próximas execuções.
+
+        No motor "tokens" os ganchos de chamada e de declaração são ligados
+        aqui; os motores da AST os ligam ao serem criados, no início de cada
+        programa.
+        """
+        self.tracer = tracer
+        self._bind_call_hooks()
+
+    def _bind_call_hooks(self):
+        """Liga memoização e tracer às chamadas e declarações do motor "tokens" """
+        tracer = self.tracer
+        for name in ("_execute_function_call", "_execute_site_call", "_execute_statement"):
+            self.__dict__.pop(name, None)
+        if self.memo is not None:
+            self._execute_function_call = self.memo.wrap(self._execute_function_call)
+        if tracer is not None:
+            self._execute_function_call = traced_calls(self._execute_function_call, tracer)
+        if "_execute_function_call" in self.__dict__:
+            # Memoização e tracer trabalham com o nome: os pontos de chamada passam por eles
+            call_function = self._execute_function_call
+            self._execute_site_call = lambda site, args: call_function(site.name, args)
+
+        on_statement = statement_hook(tracer)
+        if on_statement is not None:
+            execute_statement = self._execute_statement
+
+            def execute_statement_traced():
+                on_statement(self._peek().line)
+                return execute_statement()
+            self._execute_statement = execute_statement_traced
+
+    @property
+    def debug_mode(self) -> bool:
+        """Indica se o modo debug (DebugTracer) está ativo"""
+        return isinstance(self.tracer, DebugTracer)
+
     def enable_debug_mode(self):
         """Ativa modo debug para visualizar escopos"""
-        self.debug_mode = True
+        self.set_tracer(DebugTracer(self))
 
     def disable_debug_mode(self):
         """Desativa modo debug"""
-        self.debug_mode = False
+        self.set_tracer(None)
 
     def _print_current_scope(self, context: str = ""):
         """Imprime o escopo atual (apenas se debug ativo)"""
-        if hasattr(self, 'debug_mode') and self.debug_mode:
+        if self.debug_mode:
             print(f"[SCOPE {context}] Variáveis visíveis:")
             vars_dict = self.current_env.get_all_variables()
             for name, value in vars_dict.items():
@@ -316,25 +362,159 @@ class QuokkaInterpreter:
             print()
 
     
-    def interpret(self, code: str):
-        """Interpreta um código Quokka completo"""
+    def interpret(self, code: str, path: Optional[str] = None):
+        """
+        Interpreta um código Quokka completo.
+
+        path é o arquivo de onde code foi lido; quando informado, a forma
+        analisada do programa é guardada no cache em disco e reaproveitada
+        nas próximas execuções enquanto o arquivo não mudar.
+        """
+        metrics = self.metrics
+        metrics.start()
+        started = None
         try:
-            # Fase 1: Tokenização
-            self.tokens = self.lexer.tokenize(code)
-            self.current = 0
-            
-            # Fase 2: Análise e execução
-            self._parse_program()
+            self.budget.start()
+            if self.engine == "tokens":
+                self._call_sites.clear()
+                # Fase 1: Tokenização (armazenamento compacto)
+                self._load_tokens(self._parse_source("tokens", path, code, metrics))
+                # Fase 2: Análise e execução intercaladas
+                started = time.perf_counter()
+                self._parse_program()
+            else:
+                # Fases 1 e 2: Tokenização e análise completa (AST)
+                program = self._parse_source("program", path, code, metrics)
+                if self.optimize:
+                    started = time.perf_counter()
+                    optimize_program(program)
+                    metrics.add_phase("optimize", started)
+                # Fase 3: Execução
+                started = time.perf_counter()
+                self._run_program(program)
+                if self.tracer is not None:
+                    self.tracer.on_finish(self)
             
         except QuokkaError as e:
             print(f"ERRO: {e.message}")
             if e.line > 0:
                 print(f"Linha: {e.line}, Coluna: {e.column}")
+        except RecursionError:
+            print(f"ERRO: Recursão profunda demais para a pilha do Python no motor '{self.engine}'. "
+                  f"O motor 'vm' guarda as chamadas no heap e aceita recursões mais profundas (--max-depth)")
         except Exception as e:
             print(f"ERRO INTERNO: {e}")
+        finally:
+            if started is not None:
+                metrics.add_phase("execute", started)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas da última chamada a interpret() (ver stats.py): tempos das
+        fases e dos módulos, passos, objetos de runtime criados e funções
+        definidas; com um StatsTracer instalado, também declarações
+        executadas, chamadas por função e iterações de loop.
+        """
+        return self.metrics.as_dict(self)
     
+    def _parse_source(self, kind: str, path: Optional[str] = None, code: Optional[str] = None,
+                      metrics: Optional[RuntimeStats] = None):
+        """
+        Devolve a forma analisada de um código Quokka:
+          "program" - Program (AST do programa completo)
+          "library" - Program com os imports e as LazyFunctionDef de um módulo
+          "tokens"  - TokenStore (motor "tokens")
+
+        Com path (e o cache ativo), tenta primeiro o cache em disco e grava
+        nele o resultado de uma nova análise. code é lido de path se omitido.
+        Com metrics, o tempo gasto é somado às fases "lex" e "parse".
+        """
+        use_cache = self.use_cache and path is not None
+        if use_cache:
+            cached = module_cache.load(path, kind)
+            if cached is not None:
+                return cached
+        if code is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                code = f.read()
+
+        started = time.perf_counter()
+        if kind == "tokens":
+            result = TokenStore(self.lexer.iter_tokens(code))
+            if metrics is not None:
+                metrics.add_phase("lex", started)
+        elif kind == "library":
+            # Só os cabeçalhos são analisados; os corpos continuam como visões dos tokens
+            result = QuokkaParser(TokenStore(self.lexer.iter_tokens(code)).view()).index_library()
+        else:
+            # Os tokens são descartados logo após a análise
+            tokens = self.lexer.tokenize(code)
+            if metrics is not None:
+                started = metrics.add_phase("lex", started)
+            result = QuokkaParser(tokens).parse_program()
+            if metrics is not None:
+                metrics.add_phase("parse", started)
+
+        if use_cache:
+            module_cache.store(path, kind, result, code)
+        return result
+
+    def analyze(self, code: str) -> Program:
+        """Analisa o código e devolve a AST que seria executada (otimizada, se optimize)"""
+        program = QuokkaParser(self.lexer.tokenize(code)).parse_program()
+        return optimize_program(program) if self.optimize else program
+
+    def disassemble(self, code: str) -> str:
+        """Analisa o código e devolve o bytecode formatado, sem executar nada"""
+        return disassemble_program(self.analyze(code))
+
+    def transpile(self, code: str) -> str:
+        """Analisa o código e devolve o módulo Python gerado pelo backend "python", sem executar nada"""
+        return transpile_program(self.analyze(code))
+
+    def _run_program(self, program: Program):
+        """Executa os itens de topo de um programa já analisado, na ordem do arquivo"""
+        self._executor = self._create_executor()
+        if isinstance(self._executor, PythonBackend):
+            # O backend Python traduz e compila o programa inteiro de uma vez
+            self._executor.prepare(program)
+        for item in program.body:
+            if isinstance(item, Import):
+                for lib_name in item.modules:
+                    self._load_library(lib_name)
+            elif isinstance(item, GlobalBlock):
+                self._executor.run_global(item)
+            elif isinstance(item, FunctionDef):
+                self._define_function(item)
+            elif isinstance(item, MainBlock):
+                self._executor.run_main(item)
+
+    def _create_executor(self) -> Union[QuokkaEvaluator, ClosureEngine, QuokkaVM, PythonBackend]:
+        """Cria o executor da AST correspondente ao motor escolhido"""
+        if self.engine == "closure":
+            return ClosureEngine(self)
+        if self.engine == "vm":
+            return QuokkaVM(self)
+        if self.engine == "python":
+            return PythonBackend(self)
+        return QuokkaEvaluator(self)
+
+    def _define_function(self, function: Union[FunctionDef, QuokkaFunction]):
+        """Registra uma função já analisada"""
+        self.functions[function.name] = function
+        self.intrinsics.pop(function.name, None)
+        self._functions_version += 1
+        if self.memo is not None:
+            self.memo.reset()
+        if self.tracer is not None:
+            self.tracer.on_define(function.name, function.params)
+
     def _parse_function(self):
-        """Analisa definição de função"""
+        """Analisa definição de função e a registra"""
+        self._define_function(self._parse_function_definition())
+
+    def _parse_function_definition(self) -> QuokkaFunction:
+        """Analisa definição de função (o corpo é guardado como visão dos tokens)"""
         self._consume_keyword("fun")
     
     # Nome da função (pode ter pontos: calcular.imc)
@@ -377,59 +557,87 @@ class QuokkaInterpreter:
         start_token = self.current
     
     # Pula o corpo da função para analisar depois
-        brace_count = 1
-        while brace_count > 0 and not self._is_at_end():
-            if self._check_symbol("{"):
-                brace_count += 1
-            elif self._check_symbol("}"):
-                brace_count -= 1
-        
-            if brace_count > 0:  # Não avança no último }
-                self._advance()
+        self.current = self._matching_delimiter(start_token - 1)
     
         end_token = self.current
         self._consume_symbol("}")
     
-    # Cria e armazena a função
-        function = QuokkaFunction(
+    # Cria a função
+        return QuokkaFunction(
             name=func_name,
             params=params,
             body=self.tokens[start_token:end_token],
             start_token=start_token,
             end_token=end_token
         )
-    
-        self.functions[func_name] = function
-        if hasattr(self, 'debug_mode') and self.debug_mode:
-            print(f"Função '{func_name}' definida com {len(params)} parâmetros")
+
+    def _resolve_function(self, func_name: str, arg_count: int) -> QuokkaFunction:
+        """Função chamada por func_name com arg_count argumentos (erro se não existe ou a aridade não bate)"""
+        function = self.functions.get(func_name)
+        if function is None:
+            raise QuokkaError(f"Função '{func_name}' não definida")
+        if arg_count != len(function.params):
+            raise QuokkaError(f"Função '{func_name}' espera {len(function.params)} argumentos, recebeu {arg_count}")
+        return function
 
     def _execute_function_call(self, func_name: str, args: List[QuokkaValue]) -> QuokkaValue:
         """Executa uma chamada de função"""
-        if func_name not in self.functions:
-            raise QuokkaError(f"Função '{func_name}' não definida")
-    
-        function = self.functions[func_name]
-    
-    # Verifica número de argumentos
-        if len(args) != len(function.params):
-            raise QuokkaError(f"Função '{func_name}' espera {len(function.params)} argumentos, recebeu {len(args)}")
-    
+        function = self._resolve_function(func_name, len(args))
+
+    # Cada chamada consome um passo do orçamento, inclusive as respondidas pela intrínseca
+        budget = self.budget
+        budget.countdown -= 1
+        if budget.countdown <= 0:
+            budget.check()
+
+    # Implementação nativa da biblioteca, se houver
+        native = self.intrinsics.get(func_name)
+        if native is not None:
+            result = call_intrinsic(native, args)
+            if result is not NotImplemented:
+                return result
+        return self._invoke_function(function, args)
+
+    def _execute_site_call(self, site: CallSite, args: List[QuokkaValue]) -> QuokkaValue:
+        """
+        Executa a chamada de um ponto do código. Função, intrínseca e aridade
+        são verificadas só na primeira chamada depois de cada definição de
+        função ou importação (o número de argumentos de um ponto é fixo).
+        """
+        if site.version != self._functions_version:
+            site.function = self._resolve_function(site.name, len(args))
+            site.native = self.intrinsics.get(site.name)
+            site.version = self._functions_version
+
+        budget = self.budget
+        budget.countdown -= 1
+        if budget.countdown <= 0:
+            budget.check()
+        native = site.native
+        if native is not None:
+            result = call_intrinsic(native, args)
+            if result is not NotImplemented:
+                return result
+        return self._invoke_function(site.function, args)
+
+    def _invoke_function(self, function: QuokkaFunction, args: List[QuokkaValue]) -> QuokkaValue:
+        """Executa o corpo de uma função já resolvida"""
     # Cria novo ambiente para a função
         func_env = Environment(self.global_env)  # Funcões só veem globais + parâmetros
 
 # Define parâmetros no ambiente da função
         for param_name, arg_value in zip(function.params, args):
             func_env.define(param_name, arg_value)
-
-# Debug: mostra escopo da função
-        if hasattr(self, 'debug_mode') and self.debug_mode:
-            print(f"[DEBUG] Executando função '{func_name}' com escopo local")
-            print(f"[DEBUG] Parâmetros: {dict(zip(function.params, args))}")
     
+        budget = self.budget
+        if self._call_depth >= budget.depth_limit:
+            raise budget.recursion_too_deep()
+
     # Salva estado atual
         old_env = self.current_env
         old_tokens = self.tokens
         old_current = self.current
+        self._call_depth += 1
     
         try:
     # Configura ambiente da função
@@ -438,30 +646,33 @@ class QuokkaInterpreter:
             self.current = 0
     
     # Executa corpo da função com controle de escopo
-            def execute_function():
-                self._execute_function_body()
-                return None
-    
-            result = self._execute_with_local_scope(
-                execute_function, 
-                f"função '{func_name}'"
+            signal = self._execute_with_local_scope(
+                self._execute_function_body, 
+                f"função '{function.name}'"
             )
-            return result
         
-        except YieldException as yield_result:
-        # Função executou yield - retorna o valor
-            return yield_result.value
-    
         finally:
         # Restaura estado anterior
             self.current_env = old_env
             self.tokens = old_tokens
             self.current = old_current
+            self._call_depth -= 1
+
+    # Função executou yield - retorna o valor
+        if signal is RETURN:
+            return self.return_value
+        if signal is not None:
+        # break/continue fora de loop: interrompe o loop de quem chamou
+            raise_signal(signal)
+        return None
 
     def _execute_function_body(self):
-        """Executa o corpo de uma função"""
+        """Executa o corpo de uma função; devolve o sinal que o interrompeu (ou None)"""
         while not self._is_at_end():
-            self._execute_statement()
+            signal = self._execute_statement()
+            if signal is not None:
+                return signal
+        return None
 
     def _execute_yield(self):
         """Executa comando yield"""
@@ -473,10 +684,11 @@ class QuokkaInterpreter:
     
         self._consume_symbol(")")
     
-    # Lança exceção especial para implementar o yield
-        raise YieldException(value)
+    # O valor fica guardado; o sinal RETURN sobe até a chamada da função
+        self.return_value = value
+        return RETURN
 
-    def _parse_function_call(self, func_name: str) -> QuokkaValue:
+    def _parse_function_call(self, site: CallSite) -> QuokkaValue:
         """Analisa chamada de função"""
         self._consume_symbol("(")
     
@@ -499,7 +711,7 @@ class QuokkaInterpreter:
         self._consume_symbol(")")
     
     # Executa a função
-        return self._execute_function_call(func_name, args)
+        return self._execute_site_call(site, args)
 
     def _execute_each(self):
         """
@@ -537,15 +749,7 @@ class QuokkaInterpreter:
         each_start_token = self.current
         
         # Pula o corpo do each para encontrar o final
-        brace_count = 1
-        while brace_count > 0 and not self._is_at_end():
-            if self._check_symbol("{"):
-                brace_count += 1
-            elif self._check_symbol("}"):
-                brace_count -= 1
-            
-            if brace_count > 0:  # Não avança no último }
-                self._advance()
+        self.current = self._matching_delimiter(each_start_token - 1)
         
         each_end_token = self.current
         self._consume_symbol("}")
@@ -556,7 +760,7 @@ class QuokkaInterpreter:
         # Verifica o tipo da coleção
         if isinstance(collection, QuokkaArray):
         # Comportamento normal para arrays
-            self._execute_each_iteration(
+            return self._execute_each_iteration(
                 collection,
                 item_var_name,
                 each_start_token,
@@ -565,7 +769,7 @@ class QuokkaInterpreter:
         elif isinstance(collection, QuokkaDict):
             # 🆕 Itera sobre os valores do dicionário
             keys_array = QuokkaDict(list(collection.items.keys()))
-            self._execute_each_iteration(
+            return self._execute_each_iteration(
                 keys_array,
                 item_var_name,
                 each_start_token,
@@ -574,7 +778,7 @@ class QuokkaInterpreter:
         elif isinstance(collection, str):
             # 🆕 Converte string em array de caracteres
             char_array = QuokkaArray([char for char in collection])
-            self._execute_each_iteration(
+            return self._execute_each_iteration(
                 char_array,
                 item_var_name,
                 each_start_token,
@@ -590,64 +794,73 @@ class QuokkaInterpreter:
         # Salva estado atual
         old_tokens = self.tokens
         old_current = self.current
+        old_env = self.current_env
     
-    # Extrai o corpo do each
+    # Visão do corpo do each (sem cópia dos tokens)
         each_body = self.tokens[start_token:end_token]
+
+    # Um único escopo (herda do ambiente atual) para todas as iterações;
+    # no início de cada uma ficam só a variável de iteração e __index__
+        loop_env = old_env.create_local_scope()
+        variables = loop_env.variables
+        keep = len({item_var_name, "__index__"})
+        budget = self.budget
+        tracer = self.tracer
+        iteration_index = 0
     
         try:
+            self.current_env = loop_env
         # Para cada item na coleção
             for iteration_index, item in enumerate(collection.items):
-                try:
-                # Cria novo ambiente para a iteração (herda do ambiente atual)
-                    iteration_env = self.current_env.create_local_scope()
+                budget.countdown -= 1
+                if budget.countdown <= 0:
+                    budget.check()
+                loop_env.reset(keep)
 
-                # Define a variável de iteração com o valor atual
-                    iteration_env.define(item_var_name, item)
+            # Define a variável de iteração com o valor atual
+                variables[item_var_name] = item
 
-                # Adiciona variável especial com índice da iteração (opcional)
-                    iteration_env.define("__index__", iteration_index)
+            # Adiciona variável especial com índice da iteração (opcional)
+                variables["__index__"] = iteration_index
 
-                # Debug: mostra escopo da iteração
-                    if hasattr(self, 'debug_mode') and self.debug_mode:
-                        print(f"[DEBUG] Iteração {iteration_index}: {item_var_name} = {item}")
-                
-                # Salva ambiente atual
-                    old_env = self.current_env
-                
-                    try:
-                    # Configura ambiente da iteração
-                        self.current_env = iteration_env
-                        self.tokens = each_body
-                        self.current = 0
-                    
-                    # Executa o corpo do each
-                        while not self._is_at_end():
-                            self._execute_statement()
+            # Rastreamento opcional da iteração
+                if tracer is not None:
+                    tracer.on_loop_iteration("each", iteration_index, item, item_var_name)
                 
-                    finally:
-                        # Restaura ambiente anterior
-                        self.current_env = old_env
-                    
+                try:
+                # Executa o corpo do each
+                    self.tokens = each_body
+                    self.current = 0
+                    signal = self._execute_function_body()
                 except BreakException:
+                # break fora de loop dentro de uma função chamada no corpo
+                    signal = BREAK
+                except ContinueException:
+                    signal = CONTINUE
+
+                if signal is RETURN:
+                    return RETURN
+                if signal is BREAK:
                     # Break no each - sai do loop completamente
-                    if hasattr(self, 'debug_mode') and self.debug_mode:
-                        print(f"[DEBUG] Break executado no each, iteração {iteration_index}")
+                    if tracer is not None:
+                        tracer.on_loop_control("each", "break", iteration_index)
                     break  # Sai do for loop, terminando o each
-                except ContinueException:
+                if signal is CONTINUE:
                 # Continue no each - pula para próxima iteração
-                    if hasattr(self, 'debug_mode') and self.debug_mode:
-                        print(f"[DEBUG] Continue executado no each, iteração {iteration_index}")
-                    continue  # Continua o for loop para próxima iteração
+                    if tracer is not None:
+                        tracer.on_loop_control("each", "continue", iteration_index)
         
         except Exception as e:
             # Se houve erro na iteração, limpa o escopo
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] Erro na iteração: {e}")
+            if tracer is not None:
+                tracer.on_loop_error("each", iteration_index, e)
             raise
         finally:
             # Restaura estado anterior
+            self.current_env = old_env
             self.tokens = old_tokens
             self.current = old_current
+        return None
 
 
     
@@ -693,36 +906,42 @@ class QuokkaInterpreter:
         self._consume_symbol("{")
         
         # Executa o bloco main
-        self._execute_block()
+        signal = self._execute_block()
+        if signal is not None:
+            raise_signal(signal, self.return_value)
         
         self._consume_symbol("}")
 
     
     def _execute_block(self):
-        """Executa um bloco de comandos"""
+        """Executa um bloco de comandos; para no primeiro sinal (break, continue, yield) e o devolve"""
         while not self._check_symbol("}") and not self._is_at_end():
-            self._execute_statement()
+            signal = self._execute_statement()
+            if signal is not None:
+                return signal
+        return None
     
     def _execute_statement(self):
-        """Executa uma declaração"""
+        """Executa uma declaração; devolve None ou o sinal BREAK, CONTINUE ou RETURN"""
         if self._check_keyword("print"):
             self._execute_print()
         elif self._check_keyword("if"):
-            self._execute_if()
+            return self._execute_if()
         elif self._check_keyword("while"):          
-            self._execute_while()
+            return self._execute_while()
         elif self._check_keyword("yield"):         
-            self._execute_yield()
+            return self._execute_yield()
         elif self._check_keyword("each"):
-            self._execute_each()
+            return self._execute_each()
         elif self._check_keyword("break"):         
-            self._execute_break()
+            return self._execute_break()
         elif self._check_keyword("continue"): 
-            self._execute_continue()     
+            return self._execute_continue()     
         elif self._check_type("IDENTIFIER"):
             self._execute_assignment_or_function_call()
         else:
             self._advance() 
+        return None
     
     def _execute_print(self):
         """Executa comando print"""
@@ -737,25 +956,19 @@ class QuokkaInterpreter:
     def _execute_break(self):
         """Executa comando break"""
         self._consume_keyword("break")
-        # Lança exceção especial para sair do loop
-        raise BreakException()
+        # Sinal para o loop mais próximo
+        return BREAK
 
     def _execute_continue(self):
         """Executa comando continue"""
         self._consume_keyword("continue")
-        # Lança exceção especial para pular para próxima iteração
-        raise ContinueException()
+        # Sinal para o loop mais próximo
+        return CONTINUE
     
     def _execute_assignment_or_function_call(self):
         """Executa atribuição de variável ou chamada de função"""
-        var_name = self._advance().value
-    
-    # Verifica se é nome composto (função com pontos)
-        while self._check_ooperator("."):
-            self._advance()  # consome '.'
-            if not self._check_type("IDENTIFIER"):
-                raise QuokkaError("Esperado nome após '.' em função")
-            var_name += "." + self._advance().value
+        site = self._read_name()
+        var_name = site.name
     
     # Verifica o que vem depois
         if self._check_ooperator("="):
@@ -798,6 +1011,9 @@ class QuokkaInterpreter:
             
                 if isinstance(obj, QuokkaArray):
                     if isinstance(index, int):
+                        # Verificado antes de o array ser expandido até o índice
+                        if index >= self.budget.size_limit:
+                            raise self.budget.collection_too_large(var_name)
                         obj[index] = value
                     else:
                         raise QuokkaError("Índice de array deve ser um número")
@@ -819,12 +1035,13 @@ class QuokkaInterpreter:
             
                 if isinstance(obj, QuokkaDict):
                     obj[key] = value
+                    self._check_collection_size(obj, var_name)
                 else:
                     raise QuokkaError(f"'{var_name}' não é um dicionário")
     
         elif self._check_symbol("("):
         # É chamada de função sem atribuição: minha_funcao()
-            self._parse_function_call(var_name)
+            self._parse_function_call(site)
     
         else:
         # Apenas referência à variável (não faz nada)
@@ -857,8 +1074,8 @@ class QuokkaInterpreter:
             # Atualiza a variável
             self.current_env.set(var_name, new_value)
             
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] {var_name} {operator} {expression_value}: {current_value} -> {new_value}")
+            if self.tracer is not None:
+                self.tracer.on_update(var_name, operator, expression_value, current_value, new_value)
                 
         except Exception as e:
             raise QuokkaError(f"Erro ao executar {operator} em '{var_name}': {str(e)}")
@@ -877,9 +1094,6 @@ class QuokkaInterpreter:
     
     # Atualiza a variável
         self.current_env.set(var_name, new_value)
-    
-        if hasattr(self, 'debug_mode') and self.debug_mode:
-            print(f"[DEBUG] {var_name} {operator} {expression_value} = {new_value}")
 
     def _execute_increment_decrement(self, var_name: str, operator: str):
         """Executa operadores de incremento ++ e decremento --"""
@@ -902,8 +1116,8 @@ class QuokkaInterpreter:
             # Atualiza a variável
             self.current_env.set(var_name, new_value)
             
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] {var_name} {operator}: {current_value} -> {new_value}")
+            if self.tracer is not None:
+                self.tracer.on_update(var_name, operator, None, current_value, new_value)
                 
         except Exception as e:
             raise QuokkaError(f"Erro ao executar {operator} em '{var_name}': {str(e)}")
@@ -919,9 +1133,6 @@ class QuokkaInterpreter:
     
     # Atualiza a variável
         self.current_env.set(var_name, new_value)
-    
-        if hasattr(self, 'debug_mode') and self.debug_mode:
-            print(f"[DEBUG] {var_name}{operator} = {new_value}")
 
     def _execute_append_operator(self, var_name: str):
         """Executa operador de append << para arrays e dicionários"""
@@ -937,6 +1148,12 @@ class QuokkaInterpreter:
             self._execute_dict_append(collection, var_name)
         else:
             raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{var_name}' é {type(collection).__name__}")
+        self._check_collection_size(collection, var_name)
+
+    def _check_collection_size(self, collection: Union[QuokkaArray, QuokkaDict], var_name: str):
+        """Erro se a coleção passou do limite de elementos do orçamento"""
+        if len(collection.items) > self.budget.size_limit:
+            raise self.budget.collection_too_large(var_name)
 
     def _execute_array_append(self, array: QuokkaArray, var_name: str):
         """Executa append em array usando operador <<"""
@@ -947,15 +1164,12 @@ class QuokkaInterpreter:
             # Se o valor é um array, adiciona todos os elementos
             for item in value.items:
                 array.append(item)
-        
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] {var_name} << {value} (múltiplos elementos)")
         else:
             # Adiciona valor único
             array.append(value)
-        
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] {var_name} << {value}")
+
+        if self.tracer is not None:
+            self.tracer.on_append(var_name, value)
 
     def _execute_dict_append(self, dictionary: QuokkaDict, var_name: str):
         """Executa append em dicionário usando operador <<"""
@@ -975,8 +1189,8 @@ class QuokkaInterpreter:
             # Adiciona/atualiza a chave
             dictionary[key] = value
         
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] {var_name} << ('{key}' = {value})")
+            if self.tracer is not None:
+                self.tracer.on_append(var_name, value, key)
     
         elif self._check_symbol("{"):
             # Sintaxe: dict << { 'chave1' = valor1 . 'chave2' = valor2 }
@@ -986,8 +1200,8 @@ class QuokkaInterpreter:
             for key, value in dict_to_append.items.items():
                 dictionary[key] = value
         
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] {var_name} << {dict_to_append} (múltiplas chaves)")
+            if self.tracer is not None:
+                self.tracer.on_append(var_name, dict_to_append)
     
         else:
             raise QuokkaError("Sintaxe inválida para append em dicionário. Use: dict << ('chave' = valor) ou dict << { 'chave' = valor }")
@@ -1004,7 +1218,9 @@ class QuokkaInterpreter:
         self._consume_symbol("{")
     
         if self._is_truthy(condition):
-            self._execute_block()
+            signal = self._execute_block()
+            if signal is not None:
+                return signal
             self._consume_symbol("}")
         
         # Se a condição foi verdadeira, pula todos os else/else if
@@ -1014,7 +1230,8 @@ class QuokkaInterpreter:
             self._skip_block()
         
         # Processa else/else if
-            self._handle_else_chain()
+            return self._handle_else_chain()
+        return None
 
     def _handle_else_chain(self):
         """Processa cadeia de else/else if"""
@@ -1024,14 +1241,16 @@ class QuokkaInterpreter:
         # Verifica se é else if
             if self._check_keyword("if"):
             # É um else if - processa recursivamente
-                self._execute_if()
-                return  # A recursão vai lidar com o resto da cadeia
+                return self._execute_if()  # A recursão vai lidar com o resto da cadeia
             else:
             # É um else simples
                 self._consume_symbol("{")
-                self._execute_block()
+                signal = self._execute_block()
+                if signal is not None:
+                    return signal
                 self._consume_symbol("}")
-                return  # Fim da cadeia
+                return None  # Fim da cadeia
+        return None
     def _skip_else_chain(self):
             """Pula toda a cadeia de else/else if quando uma condição já foi verdadeira"""
             while self._check_keyword("else"):
@@ -1072,40 +1291,49 @@ class QuokkaInterpreter:
         body_start = self.current
     
     # Pula o corpo do while para encontrar o final
-        brace_count = 1
-        while brace_count > 0 and not self._is_at_end():
-            if self._check_symbol("{"):
-                brace_count += 1
-            elif self._check_symbol("}"):
-                brace_count -= 1
-        
-            if brace_count > 0:  # Não avança no último }
-                self._advance()
+        self.current = self._matching_delimiter(body_start - 1)
     
         body_end = self.current
         self._consume_symbol("}")
     
     # Executa o loop while
-        self._execute_while_loop(condition_start, body_start, body_end)
+        return self._execute_while_loop(condition_start, body_start, body_end)
 
     def _execute_while_loop(self, condition_start: int, body_start: int, body_end: int):
         
         old_current = self.current
+        old_tokens = self.tokens
+        old_env = self.current_env
 
         loop_count = 0
-        max_loops = 10000  # Proteção contra loop infinito
+        budget = self.budget
+
+        # Visão do corpo do while (sem cópia dos tokens), a mesma em todas as iterações
+        while_body = self.tokens[body_start:body_end]
+
+        # Um único escopo local para o loop, esvaziado no início de cada iteração
+        loop_env = old_env.create_local_scope()
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.on_scope_enter("while loop")
 
         try:
-            while loop_count < max_loops:
-                loop_count += 1
+            self.current_env = loop_env
+            for loop_count in count(1):
+            # Cada iteração consome um passo do orçamento (substitui o antigo limite fixo)
+                budget.countdown -= 1
+                if budget.countdown <= 0:
+                    budget.check()
+                loop_env.reset()
             
             # Re-avalia a condição
+                self.tokens = old_tokens
                 self.current = condition_start
                 condition = self._parse_expression()
             
-            # Debug opcional
-                if hasattr(self, 'debug_mode') and self.debug_mode:
-                    print(f"[DEBUG] While loop {loop_count}: condição = {condition}")
+            # Rastreamento opcional
+                if tracer is not None:
+                    tracer.on_loop_iteration("while", loop_count, condition)
             
             # Se condição é falsa, sai do loop
                 if not self._is_truthy(condition):
@@ -1113,79 +1341,51 @@ class QuokkaInterpreter:
             
             # Executa o corpo do while com controle de break/continue
                 try:
-                    def execute_while_body():
-                    # Extrai o corpo do while
-                        while_body = self.tokens[body_start:body_end]
-                
-                    # Salva tokens atuais
-                        old_tokens = self.tokens
-                        old_current_inner = self.current
-                
-                        try:
-                        # Configura para executar o corpo
-                            self.tokens = while_body
-                            self.current = 0
-                    
-                        # Executa cada instrução do corpo
-                            while not self._is_at_end():
-                                self._execute_statement()
-                
-                        finally:
-                        # Restaura tokens originais
-                            self.tokens = old_tokens
-                            self.current = old_current_inner
-            
-                # Executa o corpo com escopo local
-                    self._execute_with_local_scope(
-                        execute_while_body, 
-                        f"while loop iteração {loop_count}"
-                    )
-            
+                    self.tokens = while_body
+                    self.current = 0
+                    signal = self._execute_function_body()
                 except BreakException:
+                # break fora de loop dentro de uma função chamada no corpo
+                    signal = BREAK
+                except ContinueException:
+                    signal = CONTINUE
+
+                if signal is RETURN:
+                    return RETURN
+                if signal is BREAK:
                 # Break foi chamado - sai do loop
-                    if hasattr(self, 'debug_mode') and self.debug_mode:
-                        print(f"[DEBUG] Break executado na iteração {loop_count}")
+                    if tracer is not None:
+                        tracer.on_loop_control("while", "break", loop_count)
                     break
-            
-                except ContinueException:
+                if signal is CONTINUE:
                 # Continue foi chamado - pula para próxima iteração
-                    if hasattr(self, 'debug_mode') and self.debug_mode:
-                        print(f"[DEBUG] Continue executado na iteração {loop_count}")
-                    continue
+                    if tracer is not None:
+                        tracer.on_loop_control("while", "continue", loop_count)
 
         except Exception as e:
-            if hasattr(self, 'debug_mode') and self.debug_mode:
-                print(f"[DEBUG] Erro no while loop na iteração {loop_count}: {e}")
+            if tracer is not None:
+                tracer.on_loop_error("while", loop_count, e)
             raise
 
         finally:
-        # Sempre restaura posição original
+        # Sempre restaura escopo, tokens e posição originais
+            self.current_env = old_env
+            self.tokens = old_tokens
             self.current = old_current
-
-    # Proteção contra loop infinito
-        if loop_count >= max_loops:
-            raise QuokkaError(f"Loop while executou {max_loops} iterações. Possível loop infinito.")
+            if tracer is not None:
+                tracer.on_scope_exit("while loop")
+        return None
 
     
     def _skip_expression(self):
         """Pula uma expressão sem avaliá-la"""
-    # Implementação simples: pula tokens até encontrar ')' ou '}' no nível correto
-        paren_count = 0
-        brace_count = 0
-    
+    # Pula tokens até encontrar ')' ou '}' no nível correto; grupos ( ) e { } internos são saltados pela tabela
         while not self._is_at_end():
-            if self._check_symbol("("):
-                paren_count += 1
-            elif self._check_symbol(")"):
-                if paren_count == 0:
-                    break
-                paren_count -= 1
-            elif self._check_symbol("{"):
-                brace_count += 1
-            elif self._check_symbol("}"):
-                if brace_count == 0:
-                    break
-                brace_count -= 1
+            if self._check_symbol("(") or self._check_symbol("{"):
+                self.current = min(self._matching_delimiter(self.current) + 1, len(self.tokens))
+                continue
+            elif self._check_symbol(")") or self._check_symbol("}"):
+                break
         
             self._advance()
     
@@ -1361,6 +1561,8 @@ class QuokkaInterpreter:
                 raise QuokkaError("Esperado '.' ou '}' em array")
         
         self._consume_symbol("}")
+        if len(array.items) > self.budget.size_limit:
+            raise self.budget.literal_too_large("Array")
         return array
     
     def _parse_dictionary(self) -> QuokkaDict:
@@ -1387,6 +1589,8 @@ class QuokkaInterpreter:
                 raise QuokkaError("Esperado '.' ou '}' em dicionário")
         
         self._consume_symbol("}")
+        if len(dictionary.items) > self.budget.size_limit:
+            raise self.budget.literal_too_large("Dicionário")
         return dictionary
     
     def _parse_access_expression(self, obj: QuokkaValue) -> QuokkaValue:
@@ -1458,26 +1662,16 @@ class QuokkaInterpreter:
             return self._parse_data_structure()
     
         if self._check_type("IDENTIFIER"):
-            var_name = self._advance().value
-        
-        # Verificar se é função de conversão
-            if var_name in ["to_int", "to_float", "to_bool", "to_str"] and self._check_symbol("("):
-                return self._execute_conversion_function(var_name)
-        
-        # Verifica se é nome composto (função com pontos)
-            while self._check_ooperator("."):
-                self._advance()  # consome '.'
-                if not self._check_type("IDENTIFIER"):
-                    raise QuokkaError("Esperado nome após '.' em função")
-                var_name += "." + self._advance().value
+            site = self._read_name()
         
-        # Verifica se é chamada de função
+        # Verifica se é chamada de função (ou de conversão)
             if self._check_symbol("("):
-            # É chamada de função
-                return self._parse_function_call(var_name)
+                if site.conversion:
+                    return self._execute_conversion_function(site.name)
+                return self._parse_function_call(site)
             else:
             # É variável
-                obj = self.current_env.get(var_name)
+                obj = self.current_env.get(site.name)
             
             # Verifica se há acesso a array/dicionário
                 while self._check_symbol("[") or self._check_symbol("{"):
@@ -1493,37 +1687,50 @@ class QuokkaInterpreter:
     
         raise QuokkaError(f"Expressão inválida: {self._peek().value}")
 
+    def _read_name(self) -> CallSite:
+        """Consome o nome que começa no token atual (com pontos: calcular.imc), montado uma vez por posição"""
+        tokens = self.tokens
+        sites = self._call_sites.get(tokens.store)
+        if sites is None:
+            sites = self._call_sites[tokens.store] = {}
+        position = tokens.start + self.current
+        site = sites.get(position)
+        if site is not None:
+            self.current += site.length
+            return site
+
+        start = self.current
+        name = self._advance().value
+        while self._check_ooperator("."):
+            self._advance()  # consome '.'
+            if not self._check_type("IDENTIFIER"):
+                raise QuokkaError("Esperado nome após '.' em função")
+            name += "." + self._advance().value
+        site = sites[position] = CallSite(name, self.current - start)
+        return site
+
     # Métodos auxiliares
     def _skip_block(self):
-        """Pula um bloco de código sem executar"""
-        brace_count = 1
-        while brace_count > 0 and not self._is_at_end():
-            if self._check_symbol("{"):
-                brace_count += 1
-            elif self._check_symbol("}"):
-                brace_count -= 1
-            self._advance()
+        """Pula um bloco de código sem executar (chamado logo após o '{' de abertura)"""
+        self.current = min(self._matching_delimiter(self.current - 1) + 1, len(self.tokens))
+
+    def _matching_delimiter(self, position: int) -> int:
+        """Posição do delimitador que fecha o aberto em `position` (fim dos tokens se não houver par)"""
+        match = self.tokens.matching_delimiter(position)
+        return match if match >= 0 else len(self.tokens)
+
+    def _load_tokens(self, store: TokenStore):
+        """Passa a analisar os tokens de store a partir do início"""
+        self.tokens = store.view()
+        self.current = 0
     
     def _is_truthy(self, value: QuokkaValue) -> bool:
         """Determina se um valor é considerado verdadeiro"""
-        if value is None or value is False:
-            return False
-        if value == 0 or value == "":
-            return False
-        return True
+        return is_truthy(value)
     
     def _quokka_to_string(self, value: QuokkaValue) -> str:
         """Converte um valor Quokka para string"""
-        if value is None:
-            return "null"
-        elif isinstance(value, bool):
-            return "true" if value else "false"
-        elif isinstance(value, QuokkaArray):
-            return str(value)
-        elif isinstance(value, QuokkaDict):
-            return str(value)
-        else:
-            return str(value)
+        return quokka_to_string(value)
 
     def _execute_prompt(self) -> str:
         """
@@ -1557,61 +1764,11 @@ class QuokkaInterpreter:
         self._consume_symbol(")")
     
     # Converte baseado no tipo
-        try:
-            if func_name == "to_int":
-                if isinstance(arg, str):
-                    return int(arg)
-                elif isinstance(arg, float):
-                    return int(arg)
-                elif isinstance(arg, int):
-                    return arg
-                else:
-                    raise ValueError(f"Não é possível converter {type(arg)} para int")
-                
-            elif func_name == "to_float":
-                if isinstance(arg, str):
-                    return float(arg)
-                elif isinstance(arg, int):
-                    return float(arg)
-                elif isinstance(arg, float):
-                    return arg
-                else:
-                    raise ValueError(f"Não é possível converter {type(arg)} para float")
-
-            elif func_name == "to_bool":
-                if isinstance(arg, str):
-                    arg_lower = arg.lower().strip()
-                    if arg_lower in ["true", "yes", "sim", "s", "1", "verdadeiro","y"]:
-                        return True
-                    elif arg_lower in ["false", "no", "não", "n", "0", "falso"]:
-                        return False
-                    else:
-                        raise ValueError(f"'{arg}' não é um valor booleano válido")
-                elif isinstance(arg, bool):
-                    return arg
-                elif isinstance(arg, int):
-                    return arg != 0
-                elif isinstance(arg, float):
-                    return arg != 0.0
-                else:
-                    raise ValueError(f"Não é possível converter {type(arg)} para bool")
-                    
-            elif func_name == "to_str":
-                if isinstance(arg, str):
-                    return arg
-                elif isinstance(arg, int):
-                    return str(arg)
-                elif isinstance(arg, float):
-                    return str(arg)
-                else:
-                    raise ValueError(f"Não é possível converter {type(arg)} para float")
-                
-        except ValueError as e:
-            raise QuokkaError(f"Erro na conversão {func_name}: {e}")
+        return convert_value(func_name, arg)
     
     # Métodos de controle de tokens
     def _advance(self) -> Token:
-        if not self._is_at_end():
+        if self.current < self.tokens.length:
             self.current += 1
             return self.tokens[self.current - 1]
         else:
@@ -1619,7 +1776,7 @@ class QuokkaInterpreter:
             return self.tokens[-1]
 
     def _peek(self) -> Token:
-        if self.current < len(self.tokens):
+        if self.current < self.tokens.length:
             return self.tokens[self.current]
         else:
             # Retorna o último token se já estiver no fim
@@ -1632,23 +1789,23 @@ class QuokkaInterpreter:
             return self.tokens[0]
     
     def _is_at_end(self) -> bool:
-        return self.current >= len(self.tokens)
+        return self.current >= self.tokens.length
     
     def _check_type(self, token_type: str) -> bool:
-        if self._is_at_end():
+        if self.current >= self.tokens.length:
             return False
-        return self._peek().type == token_type
+        return self.tokens.type_at(self.current) == token_type
     
     def _check_keyword(self, keyword: str) -> bool:
-        return self._check_type("KEYWORD") and self._peek().value == keyword
+        return self.current < self.tokens.length and self.tokens.is_token(self.current, _KEYWORD, keyword)
     
     def _check_symbol(self, symbol: str) -> bool:
-        return self._check_type("SYMBOL") and self._peek().value == symbol
+        return self.current < self.tokens.length and self.tokens.is_token(self.current, _SYMBOL, symbol)
     
     def _check_doperator(self, doperator: str) -> bool:
-        return self._check_type("DOPERATOR") and self._peek().value == doperator
+        return self.current < self.tokens.length and self.tokens.is_token(self.current, _DOPERATOR, doperator)
     def _check_ooperator(self, ooperator: str) -> bool:
-        return self._check_type("OOPERATOR") and self._peek().value == ooperator
+        return self.current < self.tokens.length and self.tokens.is_token(self.current, _OOPERATOR, ooperator)
     
     def _match_symbols(self, symbols: List[str]) -> bool:
         for symbol in symbols:
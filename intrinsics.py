@@ -0,0 +1,388 @@
+"""
+Implementações nativas (intrínsecas) de funções das bibliotecas padrão.
+
+Quando um módulo da biblioteca é importado, as funções listadas em
+INTRINSICS[nome do módulo] passam a rodar direto em Python sobre
+QuokkaArray.items / QuokkaDict.items, em vez de interpretar o .qk. O código
+.qk continua sendo a referência: uma intrínseca devolve NotImplemented (ou
+lança qualquer exceção) quando não trata o caso, e a chamada segue para a
+versão em Quokka, que produz o resultado ou o erro de sempre.
+
+Os resultados são os mesmos do .qk, incluindo as peculiaridades da
+linguagem: '<<' com um array à direita adiciona os elementos dele (por
+isso reverse, merge, keys e values "achatam" arrays internos) e each
+percorre as chaves de um dicionário e os caracteres de uma string. As
+diferenças: cada chamada nativa consome um passo do orçamento de execução
+(budget.py), e as que criam arrays ou strings longas recebem o orçamento
+(parâmetro budget, ligado por bind_budget) e consomem um passo por elemento
+criado (em join, por item juntado; em replace, por caractere do resultado),
+com o limite de tamanho verificado antes de o array ser montado quando o
+tamanho é conhecido; uppercase/lowercase nativas convertem qualquer letra
+Unicode (as versões .qk só conhecem as letras ASCII); e cos, sen, tg, exp e
+log nativas usam o módulo math do Python, enquanto as versões .qk são
+aproximações por séries.
+"""
+import math
+import operator
+import inspect
+from functools import partial, reduce
+from typing import Callable, Dict
+
+from runtime import QuokkaArray, QuokkaDict, quokka_to_string, quokka_add, quokka_power, each_items
+
+
+def _appended(values) -> QuokkaArray:
+    """Array resultante de 'resultado << v' para cada v (arrays são expandidos)"""
+    result = []
+    for value in values:
+        if isinstance(value, QuokkaArray):
+            result.extend(value.items)
+        else:
+            result.append(value)
+    return QuokkaArray(result)
+
+
+# ---------------------------------------------------------------------------
+# collections
+# ---------------------------------------------------------------------------
+
+def _len(colecao):
+    if isinstance(colecao, (QuokkaArray, QuokkaDict)):
+        return len(colecao.items)
+    if isinstance(colecao, str):
+        return len(colecao)
+    return NotImplemented
+
+
+def _sum(array):
+    items = each_items(array, "array")
+    try:
+        return reduce(operator.add, items, 0)
+    except TypeError:
+        # Há strings: + vira concatenação (mesma regra do operador em Quokka)
+        return reduce(quokka_add, items, 0)
+
+
+def _comparable(value) -> bool:
+    """Valores que aceitam '<' e '>' (números e strings); os demais ficam com a versão .qk"""
+    return isinstance(value, (int, float, str))
+
+
+def _max(array):
+    if not isinstance(array, QuokkaArray) or not array.items:
+        return NotImplemented
+    items = array.items
+    # O .qk compara o primeiro item com ele mesmo: para tipos sem '>' o erro vem dele
+    if not _comparable(items[0]):
+        return NotImplemented
+    return max(items)
+
+
+def _min(array):
+    if not isinstance(array, QuokkaArray) or not array.items:
+        return NotImplemented
+    items = array.items
+    if not _comparable(items[0]):
+        return NotImplemented
+    return min(items)
+
+
+def _reverse(array, *, budget):
+    if not isinstance(array, QuokkaArray):
+        return NotImplemented
+    result = _appended(reversed(array.items))
+    budget.allocate(len(result.items), "reverse")
+    return result
+
+
+def _contains(colecao, busca):
+    for item in each_items(colecao, "colecao"):
+        if item == busca:
+            return True
+    return False
+
+
+def _range(inicio, fim, *, budget):
+    if type(inicio) is not int or type(fim) is not int:
+        return NotImplemented
+    budget.allocate(max(fim - inicio + 1, 0), "range")
+    return QuokkaArray(list(range(inicio, fim + 1)))
+
+
+def _merge(array1, array2, *, budget):
+    result = _appended(each_items(array1, "array1") + each_items(array2, "array2"))
+    budget.allocate(len(result.items), "merge")
+    return result
+
+
+def _keys(dicionario, *, budget):
+    result = _appended(each_items(dicionario, "dict"))
+    budget.allocate(len(result.items), "keys")
+    return result
+
+
+def _values(dicionario, *, budget):
+    if not isinstance(dicionario, QuokkaDict):
+        return NotImplemented
+    result = _appended(list(dicionario.items.values()))
+    budget.allocate(len(result.items), "values")
+    return result
+
+
+# ---------------------------------------------------------------------------
+# strings
+# ---------------------------------------------------------------------------
+
+# Caracteres removidos por trim (os mesmos comparados em strings.qk)
+_TRIM_CHARACTERS = " \t\n"
+
+
+def _split(texto, sep, *, budget):
+    if not isinstance(texto, str):
+        return NotImplemented
+    if isinstance(sep, str) and len(sep) == 1:
+        # Partes vazias (separadores seguidos, nas pontas) são descartadas
+        parts = [part for part in texto.split(sep) if part]
+    else:
+        # O .qk compara caractere a caractere: outro separador nunca é encontrado
+        parts = [texto] if texto else []
+    budget.allocate(len(parts), "split")
+    return QuokkaArray(parts)
+
+
+def _join(texto, sep, *, budget):
+    items = each_items(texto, "texto")
+    budget.charge(len(items))
+    return quokka_to_string(sep).join([quokka_to_string(item) for item in items])
+
+
+def _chars(texto, *, budget):
+    if not isinstance(texto, str):
+        return NotImplemented
+    budget.allocate(len(texto), "chars")
+    return QuokkaArray(list(texto))
+
+
+def _uppercase(texto):
+    if not isinstance(texto, str):
+        return NotImplemented
+    return texto.upper()
+
+
+def _lowercase(texto):
+    if not isinstance(texto, str):
+        return NotImplemented
+    return texto.lower()
+
+
+def _find(texto, busca):
+    if not isinstance(texto, str) or not isinstance(busca, str):
+        return NotImplemented
+    return texto.find(busca)
+
+
+def _replace(texto, antigo, novo, *, budget):
+    if not isinstance(texto, str) or not isinstance(antigo, str):
+        return NotImplemented
+    if antigo == "":
+        return texto
+    novo = quokka_to_string(novo)
+    # Tamanho do resultado, cobrado antes de montá-lo
+    budget.charge(len(texto) + texto.count(antigo) * (len(novo) - len(antigo)))
+    return texto.replace(antigo, novo)
+
+
+def _substring(texto, inicio, fim):
+    if not isinstance(texto, str) or type(inicio) is not int or type(fim) is not int:
+        return NotImplemented
+    return texto[max(inicio, 0):max(fim, 0)]
+
+
+def _trim(texto):
+    if not isinstance(texto, str):
+        return NotImplemented
+    return texto.strip(_TRIM_CHARACTERS)
+
+
+def _starts_with(texto, prefixo):
+    if not isinstance(texto, str) or not isinstance(prefixo, str):
+        return NotImplemented
+    return texto.startswith(prefixo)
+
+
+# ---------------------------------------------------------------------------
+# math
+# ---------------------------------------------------------------------------
+
+def _is_number(value) -> bool:
+    """int ou float (bool fica com a versão .qk)"""
+    return type(value) is int or type(value) is float
+
+
+def _numbers(array) -> list:
+    """Itens de um array não vazio de números; ValueError nos demais casos (vai para o .qk)"""
+    if not isinstance(array, QuokkaArray) or not array.items:
+        raise ValueError("array vazio ou inválido")
+    return array.items
+
+
+def _abs(num):
+    if not isinstance(num, (int, float)):
+        return NotImplemented
+    return num * -1 if num < 0 else num
+
+
+def _floor(num):
+    if not _is_number(num):
+        return NotImplemented
+    return math.floor(num)
+
+
+def _ceil(num):
+    if not _is_number(num):
+        return NotImplemented
+    return math.ceil(num)
+
+
+def _round(num):
+    # Metade arredonda para longe do zero, como no .qk (round() do Python arredonda para o par)
+    if not _is_number(num):
+        return NotImplemented
+    return int(num + 0.5) if num > 0 else int(num - 0.5)
+
+
+def _sqrt(num):
+    return quokka_power(num, 0.5)
+
+
+def _pow(base, exp):
+    return quokka_power(base, exp)
+
+
+def _factorial(n):
+    if type(n) is not int:
+        return NotImplemented
+    return 1 if n <= 1 else math.factorial(n)
+
+
+def _avg(array):
+    items = _numbers(array)
+    return reduce(operator.add, items, 0) / len(items)
+
+
+def _cos(x):
+    if not _is_number(x):
+        return NotImplemented
+    return math.cos(x)
+
+
+def _sen(x):
+    if not _is_number(x):
+        return NotImplemented
+    return math.sin(x)
+
+
+def _tg(x):
+    if not _is_number(x):
+        return NotImplemented
+    return math.tan(x)
+
+
+def _exp(x):
+    if not _is_number(x):
+        return NotImplemented
+    try:
+        return math.exp(x)
+    except OverflowError:
+        return math.inf
+
+
+def _log(x):
+    if not _is_number(x):
+        return NotImplemented
+    return math.log(x) if x > 0 else None
+
+
+def _gcd(a, b):
+    if type(a) is not int or type(b) is not int:
+        return NotImplemented
+    return math.gcd(a, b)
+
+
+def _sum_sq(array):
+    if not isinstance(array, QuokkaArray):
+        return NotImplemented
+    return reduce(operator.add, [num * num for num in array.items], 0)
+
+
+def _dot(array1, array2):
+    if not isinstance(array1, QuokkaArray) or not isinstance(array2, QuokkaArray):
+        return NotImplemented
+    if len(array2.items) < len(array1.items):
+        return NotImplemented
+    # O .qk percorre array1; itens extras de array2 são ignorados
+    return reduce(operator.add, map(operator.mul, array1.items, array2.items), 0)
+
+
+def _stddev(array):
+    # Desvio padrão populacional, com as mesmas operações (e arredondamentos) do .qk
+    items = _numbers(array)
+    media = _avg(array)
+    total = reduce(operator.add, [(num - media) * (num - media) for num in items], 0)
+    return quokka_power(total / len(items), 0.5)
+
+
+def bind_budget(native: Callable, budget) -> Callable:
+    """Intrínseca pronta para ser chamada: as que têm o parâmetro budget ficam ligadas ao orçamento"""
+    if "budget" in inspect.signature(native).parameters:
+        return partial(native, budget=budget)
+    return native
+
+
+# Intrínsecas por módulo: nome do módulo -> nome da função -> implementação
+INTRINSICS: Dict[str, Dict[str, Callable]] = {
+    "collections": {
+        "len": _len,
+        "sum": _sum,
+        "max": _max,
+        "min": _min,
+        "reverse": _reverse,
+        "contains": _contains,
+        "range": _range,
+        "merge": _merge,
+        "keys": _keys,
+        "values": _values,
+    },
+    "strings": {
+        "split": _split,
+        "join": _join,
+        "chars": _chars,
+        "uppercase": _uppercase,
+        "lowercase": _lowercase,
+        "find": _find,
+        "replace": _replace,
+        "substring": _substring,
+        "trim": _trim,
+        "starts_with": _starts_with,
+    },
+    "math": {
+        "abs": _abs,
+        "floor": _floor,
+        "round": _round,
+        "ceil": _ceil,
+        "sqrt": _sqrt,
+        "pow": _pow,
+        "factorial": _factorial,
+        "avg": _avg,
+        "cos": _cos,
+        "sen": _sen,
+        "tg": _tg,
+        "exp": _exp,
+        "log": _log,
+        "gcd": _gcd,
+        "sum_sq": _sum_sq,
+        "dot": _dot,
+        "mean": _avg,
+        "stddev": _stddev,
+    },
+}
@@ -1,5 +1,7 @@
+import gc
 import re
-from typing import List, NamedTuple, Optional
+from array import array
+from typing import Iterable, Iterator, List, NamedTuple, Optional
 
 
 class Token(NamedTuple):
@@ -52,79 +54,197 @@ TOKEN_PATTERNS = [
     (r'.', 'UNKNOWN')                       # Qualquer outro caractere
 ]
 
+# Regex compilada uma única vez, com um grupo nomeado por tipo (match.lastgroup diz
+# diretamente qual padrão casou). Os espaços em branco são consumidos como prefixo
+# de cada token em vez de virarem matches próprios; por isso UNKNOWN passa a ser
+# \S (nenhum padrão pode começar com espaço).
+_FAST_PATTERNS = [
+    (r'\S' if token_type == 'UNKNOWN' else pattern, token_type)
+    for pattern, token_type in TOKEN_PATTERNS if token_type != 'WHITESPACE'
+]
+TOKEN_REGEX = re.compile(r'\s*(?:' + '|'.join(f'(?P<{token_type}>{pattern})' for pattern, token_type in _FAST_PATTERNS) + ')')
+
 
 class QuokkaLexer:
     def __init__(self):
-        # Compila todos os padrões em uma única regex
-        self.token_regex = '|'.join(f'({pattern})' for pattern, _ in TOKEN_PATTERNS)
+        # Todos os padrões em uma única regex, já compilada (TOKEN_REGEX)
+        self.token_regex = TOKEN_REGEX
         self.pattern_types = [token_type for _, token_type in TOKEN_PATTERNS]
    
     def tokenize(self, code: str) -> List[Token]:
-        tokens = []
+        # Milhões de tokens recém-criados disparariam coletas do gc sem nada a liberar
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return list(self.iter_tokens(code))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def iter_tokens(self, code: str) -> Iterator[Token]:
+        """Gera os tokens um a um, sem montar a lista inteira (útil para arquivos grandes)"""
         line = 1
         column = 1
+        previous_end = 0
+        keywords = KEYWORDS
+        process_string = self._process_string
+        new_token = tuple.__new__
        
-        for match in re.finditer(self.token_regex, code):
-            token_value = match.group()
+        for match in self.token_regex.finditer(code):
+            token_type = match.lastgroup
+            start, end = match.span(token_type)
            
-            # Descobre qual padrão foi encontrado
-            token_type = None
-            for i, group in enumerate(match.groups()):
-                if group is not None:
-                    token_type = self.pattern_types[i]
-                    break
-           
-            # Pula espaços em branco e comentários
-            if token_type in ['WHITESPACE', 'COMMENT']:
-                if '\n' in token_value:
-                    line += token_value.count('\n')
-                    column = len(token_value) - token_value.rfind('\n')
+            # Espaços em branco antes do token: atualiza linha e coluna
+            if start != previous_end:
+                last_newline = code.rfind('\n', previous_end, start)
+                if last_newline >= 0:
+                    line += code.count('\n', previous_end, start)
+                    column = start - last_newline
                 else:
-                    column += len(token_value)
-                continue
+                    column += start - previous_end
+            previous_end = end
+            token_value = code[start:end]
            
-            # Classifica o token mais especificamente
-            final_type = self._classify_token(token_type, token_value)
-           
-            # Remove aspas das strings e keys
-            if final_type == 'STRING':
-                token_value = self._process_string(token_value)
-            elif final_type == 'KEY':
-                token_value = self._process_key(token_value)
+            # Classifica o token mais especificamente e remove aspas das strings e keys
+            if token_type == 'WORD':
+                token_type = 'KEYWORD' if token_value in keywords else 'IDENTIFIER'
+            elif token_type == 'STRING':
+                token_value = process_string(token_value)
+            elif token_type == 'KEY':
+                token_value = token_value[1:-1]
+            elif token_type == 'COMMENT':
+                # Comentários são pulados
+                column += end - start
+                continue
            
-            tokens.append(Token(final_type, token_value, line, column))
-            column += len(match.group())
-       
-        return tokens
-   
-    def _classify_token(self, token_type: str, value: str) -> str:
-        """Classifica o token mais especificamente"""
-        if token_type == 'WORD':
-            if value in KEYWORDS:
-                return 'KEYWORD'
-            else:
-                return 'IDENTIFIER'
-        elif token_type == 'SYMBOL':
-            if value in SYMBOLS:
-                return 'SYMBOL'
-            else:
-                return 'UNKNOWN'
-        else:
-            return token_type
+            yield new_token(Token, (token_type, token_value, line, column))
+            column += end - start
    
     def _process_string(self, value: str) -> str:
         """Remove aspas e processa escapes em strings"""
         content = value[1:-1]  # Remove aspas
+        if '\\' not in content:
+            return content
         # Processa escapes básicos
         content = content.replace('\\"', '"')
         content = content.replace('\\\\', '\\')
         content = content.replace('\\n', '\n')
         content = content.replace('\\t', '\t')
         return content
-   
-    def _process_key(self, value: str) -> str:
-        """Remove aspas de keys"""
-        return value[1:-1]  # Remove aspas simples
+
+
+# Tipos de token produzidos pelo lexer e seus códigos no armazenamento compacto
+TOKEN_TYPES = ('STRING', 'KEY', 'FLOAT', 'INT', 'DOPERATOR', 'SYMBOL', 'OOPERATOR', 'KEYWORD', 'IDENTIFIER', 'UNKNOWN')
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+# Pares de delimitadores: abertura -> fechamento
+DELIMITERS = {"{": "}", "(": ")", "[": "]"}
+
+
+class TokenStore:
+    """
+    Armazenamento compacto de uma lista de tokens (struct-of-arrays).
+
+    Em vez de um Token por elemento, guarda um array de códigos de tipo, a
+    lista de valores (strings repetidas compartilham o mesmo objeto) e arrays
+    de linha e coluna. Também guarda a tabela de pares de delimitadores: para
+    cada '{', '(' ou '[' a posição do fechamento correspondente (e vice-versa),
+    -1 para os demais tokens e para delimitadores sem par. Cada tipo de
+    delimitador é casado separadamente, como na contagem de chaves/parênteses
+    feita pelo interpretador.
+    """
+
+    __slots__ = ('types', 'values', 'lines', 'columns', 'delimiters')
+
+    def __init__(self, tokens: Iterable[Token]):
+        self.types = array('B')
+        self.values: List[str] = []
+        self.lines = array('I')
+        self.columns = array('I')
+        self.delimiters = array('i')
+
+        interned = {}
+        open_positions = {opening: [] for opening in DELIMITERS}
+        closing_to_opening = {closing: opening for opening, closing in DELIMITERS.items()}
+        symbol_code = TYPE_CODES['SYMBOL']
+
+        for position, (token_type, value, line, column) in enumerate(tokens):
+            type_code = TYPE_CODES[token_type]
+            self.types.append(type_code)
+            self.values.append(interned.setdefault(value, value))
+            self.lines.append(line)
+            self.columns.append(column)
+            self.delimiters.append(-1)
+
+            if type_code == symbol_code:
+                if value in open_positions:
+                    open_positions[value].append(position)
+                elif value in closing_to_opening:
+                    stack = open_positions[closing_to_opening[value]]
+                    if stack:
+                        opening = stack.pop()
+                        self.delimiters[opening] = position
+                        self.delimiters[position] = opening
+
+    def __len__(self):
+        return len(self.types)
+
+    def view(self) -> 'TokenView':
+        """Visão de todos os tokens"""
+        return TokenView(self, 0, len(self.types))
+
+
+class TokenView:
+    """
+    Faixa [start, end) de um TokenStore, usada como lista de tokens.
+
+    Fatiar uma visão cria outra visão sobre o mesmo armazenamento, sem copiar
+    tokens: corpos de função e de loop são visões do programa. Indexar devolve
+    um Token montado na hora.
+    """
+
+    __slots__ = ('store', 'start', 'end', 'length', 'types', 'values')
+
+    def __init__(self, store: TokenStore, start: int, end: int):
+        self.store = store
+        self.start = start
+        self.end = end
+        self.length = end - start
+        self.types = store.types
+        self.values = store.values
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, end, _ = index.indices(self.end - self.start)
+            return TokenView(self.store, self.start + start, self.start + max(start, end))
+        position = self.start + index if index >= 0 else self.end + index
+        if not self.start <= position < self.end:
+            raise IndexError("índice de token fora da faixa")
+        store = self.store
+        return tuple.__new__(Token, (TOKEN_TYPES[store.types[position]], store.values[position],
+                                     store.lines[position], store.columns[position]))
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(self.end - self.start):
+            yield self[index]
+
+    def is_token(self, index: int, type_code: int, value: str) -> bool:
+        """Indica se o token na posição index tem o tipo (código de TYPE_CODES) e o valor dados"""
+        position = self.start + index
+        return self.types[position] == type_code and self.values[position] == value
+
+    def type_at(self, index: int) -> str:
+        return TOKEN_TYPES[self.types[self.start + index]]
+
+    def matching_delimiter(self, index: int) -> int:
+        """Posição (relativa à visão) do par do delimitador em index, ou -1 se não houver par dentro da visão"""
+        match = self.store.delimiters[self.start + index]
+        if self.start <= match < self.end:
+            return match - self.start
+        return -1
 
 
 # Função auxiliar para debug
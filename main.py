@@ -1,14 +1,57 @@
+import os
 import sys
+import json
+import argparse
 from lexer import QuokkaLexer
-from interpreter import QuokkaInterpreter
+from interpreter import QuokkaInterpreter, QuokkaError
+from profiler import Profiler, SamplingProfiler
+from stats import StatsTracer
+from optimizer import format_program
 
 if __name__ == "__main__":
-    # Verifica se o usuário passou um argumento 
-    if len(sys.argv) < 2:
-        print("Uso: python main.py arquivo.qk")
-        sys.exit(1)
+    arg_parser = argparse.ArgumentParser(description="Interpretador Quokka")
+    arg_parser.add_argument("arquivo", help="arquivo .qk a executar")
+    arg_parser.add_argument("--engine", "--backend", dest="engine", choices=QuokkaInterpreter.ENGINES,
+                            default="ast", help="motor de execução (padrão: ast)")
+    arg_parser.add_argument("--dis", action="store_true",
+                            help="mostra o bytecode do programa em vez de executá-lo")
+    arg_parser.add_argument("--dump-python", action="store_true",
+                            help="mostra o módulo Python gerado pelo backend python em vez de executar")
+    arg_parser.add_argument("--dump-optimized", action="store_true",
+                            help="mostra o programa após a dobra de constantes e a remoção de ramos mortos, sem executar")
+    arg_parser.add_argument("--no-optimize", action="store_true",
+                            help="desativa a dobra de constantes e a remoção de ramos mortos")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="não lê nem grava o cache em disco (__qkcache__) do programa e dos módulos")
+    arg_parser.add_argument("--max-steps", type=int, default=None,
+                            help="máximo de passos (iterações de while/each e chamadas de função); padrão: sem limite")
+    arg_parser.add_argument("--timeout", type=float, default=None,
+                            help="tempo máximo de execução em segundos; padrão: sem limite")
+    arg_parser.add_argument("--max-collection-size", type=int, default=None,
+                            help="máximo de elementos por array ou dicionário; padrão: sem limite")
+    arg_parser.add_argument("--max-depth", type=int, default=None,
+                            help="máximo de chamadas aninhadas; padrão: sem limite (fora do motor vm "
+                                 "a pilha do Python também limita a recursão)")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="mede tempo e execuções por função e por linha e mostra um relatório ao final")
+    arg_parser.add_argument("--profile-sample", type=float, default=None, metavar="MS",
+                            help="perfil por amostragem a cada MS milissegundos (menor custo); implica --profile")
+    arg_parser.add_argument("--profile-top", type=int, default=20, metavar="N",
+                            help="funções e linhas mostradas no relatório do perfil (padrão: 20)")
+    arg_parser.add_argument("--profile-output", default=None, metavar="ARQUIVO",
+                            help="arquivo de pilhas colapsadas para flamegraph (padrão: <arquivo>.folded)")
+    arg_parser.add_argument("--memoize", nargs="?", const=True, default=False, metavar="FUNÇÕES",
+                            help="memoiza as funções puras (análise automática) ou só as funções listadas, "
+                                 "separadas por vírgula")
+    arg_parser.add_argument("--memo-size", type=int, default=1024, metavar="N",
+                            help="entradas do cache LRU de cada função memoizada (padrão: 1024)")
+    arg_parser.add_argument("--stats", choices=("json",), default=None,
+                            help="grava as métricas da execução (QuokkaInterpreter.stats()) ao final")
+    arg_parser.add_argument("--stats-output", default=None, metavar="ARQUIVO",
+                            help="arquivo das métricas (padrão: <arquivo>.stats.json)")
+    args = arg_parser.parse_args()
 
-    arquivo_qk = sys.argv[1]
+    arquivo_qk = args.arquivo
 
     try:
         with open(arquivo_qk, 'r', encoding='utf-8') as f:
@@ -17,12 +60,64 @@ if __name__ == "__main__":
         print(f"Erro: arquivo '{arquivo_qk}' não encontrado.")
         sys.exit(1)
 
+    if args.dis or args.dump_python or args.dump_optimized:
+        try:
+            interpreter = QuokkaInterpreter(auto_load_libs=False, optimize=not args.no_optimize)
+            if args.dis:
+                print(interpreter.disassemble(code))
+            elif args.dump_python:
+                print(interpreter.transpile(code))
+            else:
+                print(format_program(interpreter.analyze(code)))
+        except QuokkaError as e:
+            print(f"ERRO: {e.message}")
+            if e.line > 0:
+                print(f"Linha: {e.line}, Coluna: {e.column}")
+            sys.exit(1)
+        sys.exit(0)
+
     print("=== INTERPRETADOR QUOKKA ===")
     print(f"Executando '{arquivo_qk}'...\n")
     
     # Cria o interpretador com debug
-    interpreter = QuokkaInterpreter()
+    memoize = args.memoize
+    if isinstance(memoize, str):
+        memoize = [name.strip() for name in memoize.split(",") if name.strip()]
+    interpreter = QuokkaInterpreter(engine=args.engine, use_cache=not args.no_cache,
+                                    max_steps=args.max_steps, timeout=args.timeout,
+                                    max_collection_size=args.max_collection_size,
+                                    max_depth=args.max_depth, memoize=memoize, memo_size=args.memo_size,
+                                    optimize=not args.no_optimize)
     #interpreter.enable_debug_mode()
-    interpreter.interpret(code)
+    profiler = None
+    if args.profile or args.profile_sample is not None:
+        if args.profile_sample is not None:
+            profiler = SamplingProfiler(args.profile_sample / 1000)
+        else:
+            profiler = Profiler()
+        interpreter.set_tracer(profiler)
+        profiler.start()
+    elif args.stats:
+        # Com --profile as métricas saem sem as contagens de declarações e chamadas
+        interpreter.set_tracer(StatsTracer())
+    interpreter.interpret(code, path=arquivo_qk)
+
+    print("\n=== EXECUÇÃO FINALIZADA ===")
+
+    if profiler is not None:
+        profiler.stop()
+        collapsed = args.profile_output or os.path.splitext(arquivo_qk)[0] + ".folded"
+        profiler.write_collapsed(collapsed)
+        print()
+        print(profiler.report(args.profile_top))
+        print(f"\nPilhas colapsadas (flamegraph): {collapsed}")
+
+    if interpreter.memo is not None:
+        print()
+        print(interpreter.memo.report())
 
-    print("\n=== EXECUÇÃO FINALIZADA ===") 
\ No newline at end of file
+    if args.stats:
+        stats_path = args.stats_output or os.path.splitext(arquivo_qk)[0] + ".stats.json"
+        with open(stats_path, "w", encoding="utf-8") as f:
+            json.dump(interpreter.stats(), f, indent=2, ensure_ascii=False)
+        print(f"\nMétricas: {stats_path}")
@@ -0,0 +1,243 @@
+"""
+Memoização opcional de funções Quokka puras (QuokkaInterpreter(memoize=...),
+main.py --memoize).
+
+Com memoize=True, uma análise da AST decide quais funções podem ser
+memoizadas: as que não usam print nem prompt, só leem seus parâmetros e
+variáveis que elas mesmas criam, e só chamam funções que também passam na
+análise (recursão é permitida). Com uma lista de nomes, as funções listadas
+são memoizadas sem a análise: quem lista garante que são puras.
+
+Como '=' em uma função atualiza uma global de mesmo nome, uma chamada só usa
+o cache se nenhuma das variáveis atribuídas pela função existe como global
+naquele momento. Argumentos QuokkaArray/QuokkaDict (mutáveis) também fazem a
+chamada passar direto, sem cache, e resultados mutáveis nunca são guardados:
+o cache só tem chaves e valores imutáveis.
+
+Cada função tem um cache LRU de até size entradas, com contagem de acertos,
+faltas e chamadas que passaram direto. Definir ou importar funções esvazia
+os caches e refaz a análise.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ast_nodes import (
+    Append, AppendPair, Assign, Block, Call, CompoundAssign, Each, FunctionDef,
+    IncDec, IndexAssign, KeyAssign, Name, Node, Print, Prompt,
+)
+from ast_parser import QuokkaParser
+from runtime import QuokkaArray, QuokkaDict, QuokkaValue
+
+# Tipos de argumento que entram na chave do cache (o tipo também entra: 1, 1.0 e true são chaves diferentes)
+_KEY_TYPES = frozenset((int, float, str, bool, type(None)))
+
+_UNPLANNED = object()
+
+
+def function_body(function) -> Block:
+    """Corpo da função como AST (no motor "tokens" o corpo é analisado a partir dos tokens)"""
+    if isinstance(function, FunctionDef):
+        return function.body
+    return QuokkaParser(function.body)._parse_block()
+
+
+class FunctionEffects:
+    """O que o corpo de uma função lê, atribui e chama, e se usa print/prompt"""
+
+    def __init__(self, params: Iterable[str], body: Block):
+        self.params: Set[str] = set(params)
+        self.assigned: Set[str] = set()
+        self.reads: Set[str] = set()
+        self.calls: Set[str] = set()
+        self.io = False
+        self._visit(body)
+
+    @property
+    def free_reads(self) -> Set[str]:
+        """Nomes lidos que não são parâmetros nem variáveis criadas pela função (globais)"""
+        return self.reads - self.params - self.assigned
+
+    def _visit(self, node):
+        cls = node.__class__
+        if cls is Print or cls is Prompt:
+            self.io = True
+        elif cls is Name:
+            self.reads.add(node.name)
+        elif cls is Call:
+            self.calls.add(node.name)
+        elif cls is Assign:
+            self.assigned.add(node.name)
+        elif cls is CompoundAssign or cls is IncDec:
+            self.assigned.add(node.name)
+            self.reads.add(node.name)
+        elif cls is Append or cls is AppendPair or cls is IndexAssign or cls is KeyAssign:
+            # Altera a coleção guardada na variável: precisa ser local
+            self.reads.add(node.name)
+        elif cls is Each:
+            self.reads.add(node.collection)
+            self.assigned.add(node.item)
+            self.assigned.add("__index__")
+
+        for value in vars(node).values():
+            if isinstance(value, Node):
+                self._visit(value)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    if isinstance(item, Node):
+                        self._visit(item)
+                    elif isinstance(item, tuple):
+                        # Pares (chave, valor) de DictLiteral
+                        for part in item:
+                            if isinstance(part, Node):
+                                self._visit(part)
+
+
+class FunctionMemo:
+    """Cache LRU de uma função e suas contagens"""
+    __slots__ = ("entries", "hits", "misses", "bypassed")
+
+    def __init__(self):
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Chamadas sem cache: argumentos mutáveis ou variáveis da função que existem como globais
+        self.bypassed = 0
+
+
+class MemoTable:
+    """Caches das funções memoizadas de um interpretador"""
+
+    def __init__(self, interpreter, size: int = 1024, functions: Optional[Iterable[str]] = None):
+        if size < 1:
+            raise ValueError("O tamanho do cache de memoização deve ser positivo")
+        self.interpreter = interpreter
+        self.size = size
+        # Funções marcadas explicitamente (None = decidir pela análise)
+        self.marked: Optional[Set[str]] = set(functions) if functions is not None else None
+        self.memos: Dict[str, FunctionMemo] = {}
+        # Nome -> variáveis atribuídas pela função (None = não memoizar)
+        self._plans: Dict[str, Optional[Tuple[str, ...]]] = {}
+        self._impure: Set[str] = set()
+
+    def reset(self):
+        """Esvazia os caches e refaz a análise (funções definidas ou importadas)"""
+        self._plans.clear()
+        self._impure.clear()
+        for memo in self.memos.values():
+            memo.entries.clear()
+
+    def wrap(self, call_function: Callable) -> Callable:
+        """Envolve o call_function de um motor com a consulta aos caches"""
+        lookup = self.lookup
+        store = self.store
+
+        def call_memoized(func_name: str, args: List[QuokkaValue]) -> QuokkaValue:
+            found, entry = lookup(func_name, args)
+            if found:
+                return entry
+            value = call_function(func_name, args)
+            if entry is not None:
+                store(entry, value)
+            return value
+        return call_memoized
+
+    def lookup(self, func_name: str, args: List[QuokkaValue]) -> Tuple[bool, object]:
+        """
+        Consulta o cache sem executar a função: (True, valor) em um acerto,
+        senão (False, entrada), com a entrada a preencher por store() ao fim
+        da chamada (None quando o resultado não vai para o cache)
+        """
+        plan = self._plans.get(func_name, _UNPLANNED)
+        if plan is _UNPLANNED:
+            plan = self._plan(func_name)
+        if plan is None:
+            return False, None
+
+        memo = self.memos[func_name]
+        key = []
+        for arg in args:
+            if arg.__class__ not in _KEY_TYPES:
+                key = None
+                break
+            key.append(arg.__class__)
+            key.append(arg)
+        global_variables = self.interpreter.global_env.variables
+        if key is None or any(name in global_variables for name in plan):
+            memo.bypassed += 1
+            return False, None
+
+        key = tuple(key)
+        entries = memo.entries
+        if key in entries:
+            memo.hits += 1
+            entries.move_to_end(key)
+            return True, entries[key]
+        memo.misses += 1
+        return False, (memo, key)
+
+    def store(self, entry: Tuple[FunctionMemo, tuple], value: QuokkaValue):
+        """Guarda o resultado de uma chamada que não estava no cache (arrays e dicionários não são guardados)"""
+        if not isinstance(value, (QuokkaArray, QuokkaDict)):
+            memo, key = entry
+            entries = memo.entries
+            entries[key] = value
+            if len(entries) > self.size:
+                entries.popitem(last=False)
+
+    def _plan(self, func_name: str) -> Optional[Tuple[str, ...]]:
+        """Decide se func_name é memoizada e guarda as variáveis que ela atribui"""
+        interpreter = self.interpreter
+        function = interpreter.functions.get(func_name)
+        plan = None
+        # Funções com implementação nativa já são rápidas; a análise ficaria com o .qk
+        if function is not None and func_name not in interpreter.intrinsics:
+            if self.marked is not None:
+                memoize = func_name in self.marked
+            else:
+                memoize = self._is_pure(func_name, set())
+            if memoize:
+                effects = FunctionEffects(function.params, function_body(function))
+                plan = tuple(sorted(effects.assigned - effects.params))
+                self.memos.setdefault(func_name, FunctionMemo())
+        self._plans[func_name] = plan
+        return plan
+
+    def _is_pure(self, func_name: str, visiting: Set[str]) -> bool:
+        """Análise de pureza; funções em análise mais acima na recursão são consideradas puras"""
+        if func_name in self._impure:
+            return False
+        if func_name in visiting:
+            return True
+        function = self.interpreter.functions.get(func_name)
+        pure = False
+        if function is not None:
+            effects = FunctionEffects(function.params, function_body(function))
+            pure = not effects.io and not effects.free_reads
+            if pure:
+                visiting.add(func_name)
+                pure = all(self._is_pure(callee, visiting) for callee in effects.calls)
+                visiting.discard(func_name)
+        # Só a impureza é guardada: um "puro" pode depender de uma suposição da recursão
+        if not pure:
+            self._impure.add(func_name)
+        return pure
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Acertos, faltas, chamadas sem cache e entradas de cada função memoizada"""
+        return {
+            name: {"hits": memo.hits, "misses": memo.misses, "bypassed": memo.bypassed,
+                   "entries": len(memo.entries)}
+            for name, memo in self.memos.items()
+        }
+
+    def report(self) -> str:
+        """Tabela com as contagens de cada função memoizada"""
+        out = [f"=== MEMOIZAÇÃO (até {self.size} entradas por função) ==="]
+        if not self.memos:
+            out.append("Nenhuma função memoizada")
+            return "\n".join(out)
+        out.append(f"  {'acertos':>10} {'faltas':>10} {'sem cache':>10} {'entradas':>9}  função")
+        for name, counts in sorted(self.stats().items(), key=lambda item: item[1]["hits"], reverse=True):
+            out.append(f"  {counts['hits']:>10} {counts['misses']:>10} {counts['bypassed']:>10} "
+                       f"{counts['entries']:>9}  {name}")
+        return "\n".join(out)
@@ -0,0 +1,104 @@
+"""
+Cache em disco da forma analisada dos arquivos .qk (como o __pycache__ do Python).
+
+Para cada arquivo fonte é gravado __qkcache__/<nome>.qkc no mesmo diretório,
+com o resultado da análise: a AST (motores "ast", "closure", "vm" e "python")
+ou o TokenStore (motor "tokens"). Uma entrada vale enquanto a versão do
+interpretador, o tamanho e o mtime do fonte forem os mesmos; se apenas o
+mtime mudou, o hash do conteúdo decide. Entradas inválidas são ignoradas e
+regravadas na próxima análise.
+"""
+import os
+import pickle
+import sys
+from typing import Any, Optional
+
+CACHE_DIR = "__qkcache__"
+CACHE_EXTENSION = ".qkc"
+
+# Versão do interpretador gravada em cada entrada. Deve ser alterada sempre que
+# o lexer, o parser, os nós da AST ou o TokenStore mudarem de formato.
+INTERPRETER_VERSION = "1.4-dev.3"
+CACHE_VERSION = f"{INTERPRETER_VERSION}/py{sys.version_info[0]}.{sys.version_info[1]}"
+
+# Tipos de entrada guardados no mesmo arquivo
+KINDS = ("program", "library", "tokens")
+
+
+def cache_path(source_path: str) -> str:
+    """Caminho do arquivo de cache de source_path: dir/__qkcache__/nome.qkc"""
+    directory, filename = os.path.split(os.path.abspath(source_path))
+    name = os.path.splitext(filename)[0]
+    return os.path.join(directory, CACHE_DIR, name + CACHE_EXTENSION)
+
+
+def source_hash(code: str) -> str:
+    # hashlib só é importado quando necessário: com mtime e tamanho iguais o hash não é calculado
+    import hashlib
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def _read_entry(source_path: str) -> Optional[dict]:
+    """Lê o arquivo de cache inteiro, ou None se não existir ou for ilegível"""
+    try:
+        with open(cache_path(source_path), "rb") as f:
+            entry = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+        return None
+    return entry
+
+
+def _is_fresh(entry: dict, source_path: str) -> bool:
+    """Confere tamanho e mtime do fonte; se só o mtime diferir, compara o hash do conteúdo"""
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return False
+    if stat.st_size != entry["size"]:
+        return False
+    if stat.st_mtime_ns == entry["mtime"]:
+        return True
+    try:
+        with open(source_path, "r", encoding="utf-8") as f:
+            return source_hash(f.read()) == entry["hash"]
+    except OSError:
+        return False
+
+
+def load(source_path: str, kind: str) -> Optional[Any]:
+    """Devolve a forma analisada (kind) guardada para source_path, ou None se não houver entrada válida"""
+    entry = _read_entry(source_path)
+    if entry is None or kind not in entry["data"] or not _is_fresh(entry, source_path):
+        return None
+    return entry["data"][kind]
+
+
+def store(source_path: str, kind: str, value: Any, code: str):
+    """
+    Grava a forma analisada (kind) de source_path, cujo conteúdo é code.
+
+    Outras formas já gravadas para a mesma versão do fonte são mantidas. Falhas
+    de escrita (diretório somente leitura, estrutura grande demais) são
+    ignoradas: o cache é apenas uma otimização.
+    """
+    try:
+        stat = os.stat(source_path)
+        digest = source_hash(code)
+        entry = _read_entry(source_path)
+        if entry is None or entry["hash"] != digest:
+            entry = {"version": CACHE_VERSION, "hash": digest, "data": {}}
+        entry["size"] = stat.st_size
+        entry["mtime"] = stat.st_mtime_ns
+        entry["data"][kind] = value
+
+        path = cache_path(source_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escrita atômica: outro processo nunca lê um arquivo pela metade
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except Exception:
+        pass
@@ -0,0 +1,74 @@
+"""
+Registro de módulos compartilhado por todos os interpretadores do processo.
+
+Cada módulo é analisado uma única vez por processo (e por forma: AST para os
+motores "ast", "closure", "vm" e "python"; QuokkaFunction para o motor
+"tokens"). O resultado, um LoadedModule imutável, é reaproveitado por todas
+as instâncias de QuokkaInterpreter: importar um módulo já registrado apenas
+copia a tabela de funções. As entradas são indexadas pelo caminho absoluto
+devolvido por _find_module e descartadas se o arquivo mudar no disco.
+
+Os nós da AST e os corpos de função guardados aqui são compartilhados e não
+devem ser modificados pelos motores de execução.
+"""
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class LoadedModule:
+    """Módulo já analisado: imports de topo e funções definidas, na ordem do arquivo"""
+    name: str
+    path: str
+    imports: Tuple[str, ...]
+    functions: Mapping[str, Any]
+    size: int
+    mtime: int
+
+
+class ModuleRegistry:
+    """Tabela (caminho, forma) -> LoadedModule"""
+
+    def __init__(self):
+        self._modules: Dict[Tuple[str, str], LoadedModule] = {}
+
+    def get(self, path: str, form: str) -> Optional[LoadedModule]:
+        """Módulo registrado para path, ou None se não houver ou se o arquivo mudou"""
+        module = self._modules.get((path, form))
+        if module is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size != module.size or stat.st_mtime_ns != module.mtime:
+            del self._modules[(path, form)]
+            return None
+        return module
+
+    def register(self, name: str, path: str, form: str, imports, functions: Dict[str, Any]) -> LoadedModule:
+        """Registra um módulo recém-analisado e devolve sua entrada imutável"""
+        stat = os.stat(path)
+        module = LoadedModule(
+            name=name,
+            path=path,
+            imports=tuple(imports),
+            functions=MappingProxyType(dict(functions)),
+            size=stat.st_size,
+            mtime=stat.st_mtime_ns,
+        )
+        self._modules[(path, form)] = module
+        return module
+
+    def clear(self):
+        """Esquece todos os módulos (a próxima importação analisa de novo)"""
+        self._modules.clear()
+
+    def __len__(self):
+        return len(self._modules)
+
+
+# Registro único do processo
+MODULE_REGISTRY = ModuleRegistry()
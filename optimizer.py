@@ -0,0 +1,298 @@
+"""
+Otimização da AST antes da execução (motores "ast", "closure", "vm" e "python").
+
+- Dobra de constantes: operações aritméticas, comparações, concatenação de
+  strings, && e || e conversões (to_int, to_float, to_bool, to_str) cujos
+  operandos são literais viram um único Literal, calculado com as mesmas
+  funções dos motores (BINARY_OPERATORS, convert_value). Uma operação que
+  falharia (divisão por zero, tipos incompatíveis) não é dobrada: o erro
+  continua acontecendo na execução, com a mesma mensagem.
+- Ramos mortos: if/else if com condição constante é trocado pelo ramo que
+  seria executado (if não cria escopo, então as declarações entram direto no
+  bloco de fora), e while com condição constante falsa é removido.
+
+Para não gastar tempo ou memória com código que talvez nem rode, resultados
+grandes (strings longas, potências com expoente alto, floats não finitos)
+não são dobrados. Funções de biblioteca não passam pela otimização.
+
+format_program() reescreve um Program como código Quokka (main.py
+--dump-optimized).
+"""
+import math
+from typing import List
+
+from ast_nodes import (
+    Node, Literal, Name, ArrayLiteral, DictLiteral, BinaryOp, Logical, Index, KeyAccess,
+    Call, Conversion, Prompt, Block, Print, If, While, Each, Break, Continue, Yield,
+    Assign, IndexAssign, KeyAssign, CompoundAssign, IncDec, Append, AppendPair,
+    ExprStatement, Import, GlobalBlock, FunctionDef, MainBlock, Program,
+)
+from evaluator import BINARY_OPERATORS
+from runtime import QuokkaError, convert_value, is_truthy
+
+# Limites para dobrar: maior string produzida e maior expoente de **
+MAX_FOLDED_STRING = 4096
+MAX_FOLDED_EXPONENT = 64
+
+
+def optimize_program(program: Program) -> Program:
+    """Otimiza (no lugar) os itens de topo do programa e o devolve"""
+    optimizer = ConstantFolder()
+    for item in program.body:
+        if isinstance(item, GlobalBlock):
+            item.declarations = [(name, None if value is None else optimizer.fold(value))
+                                 for name, value in item.declarations]
+        elif isinstance(item, (FunctionDef, MainBlock)):
+            optimizer.optimize_block(item.body)
+    return program
+
+
+class ConstantFolder:
+    """Dobra expressões constantes e remove ramos mortos"""
+
+    def optimize_block(self, block: Block):
+        statements = []
+        for statement in block.statements:
+            statements.extend(self.optimize_statement(statement))
+        block.statements = statements
+
+    def optimize_statement(self, node: Node) -> List[Node]:
+        """Declarações que substituem node (nenhuma, ela mesma ou as de um ramo)"""
+        cls = node.__class__
+        if cls is If:
+            return self._optimize_if(node)
+        if cls is While:
+            node.condition = self.fold(node.condition)
+            if node.condition.__class__ is Literal and not is_truthy(node.condition.value):
+                return []
+            self.optimize_block(node.body)
+            return [node]
+        if cls is Each:
+            self.optimize_block(node.body)
+            return [node]
+        self._fold_children(node)
+        return [node]
+
+    def _optimize_if(self, node: If) -> List[Node]:
+        node.condition = self.fold(node.condition)
+        if node.condition.__class__ is Literal:
+            if is_truthy(node.condition.value):
+                self.optimize_block(node.body)
+                return node.body.statements
+            orelse = node.orelse
+            if orelse is None:
+                return []
+            if orelse.__class__ is If:
+                return self._optimize_if(orelse)
+            self.optimize_block(orelse)
+            return orelse.statements
+
+        self.optimize_block(node.body)
+        if node.orelse is not None:
+            if node.orelse.__class__ is If:
+                replacement = self._optimize_if(node.orelse)
+                if len(replacement) == 1 and replacement[0].__class__ is If:
+                    node.orelse = replacement[0]
+                elif replacement:
+                    node.orelse = Block(replacement, node.orelse.line)
+                else:
+                    node.orelse = None
+            else:
+                self.optimize_block(node.orelse)
+        return [node]
+
+    def fold(self, node: Node) -> Node:
+        """Expressão com as subexpressões constantes já calculadas"""
+        self._fold_children(node)
+        cls = node.__class__
+        if cls is BinaryOp:
+            left, right = node.left, node.right
+            if left.__class__ is Literal and right.__class__ is Literal:
+                return self._constant(node, lambda: self._binary(node.op, left.value, right.value))
+        elif cls is Logical:
+            left, right = node.left, node.right
+            if left.__class__ is Literal and right.__class__ is Literal:
+                if node.op == "&&":
+                    return Literal(is_truthy(left.value) and is_truthy(right.value), node.line)
+                return Literal(is_truthy(left.value) or is_truthy(right.value), node.line)
+        elif cls is Conversion:
+            if node.arg.__class__ is Literal:
+                return self._constant(node, lambda: convert_value(node.name, node.arg.value))
+        return node
+
+    def _fold_children(self, node: Node):
+        """Dobra as expressões guardadas nos campos de node"""
+        for field_name, value in vars(node).items():
+            if isinstance(value, Block):
+                self.optimize_block(value)
+            elif isinstance(value, Node):
+                setattr(node, field_name, self.fold(value))
+            elif isinstance(value, list) and value:
+                if isinstance(value[0], Node):
+                    setattr(node, field_name, [self.fold(item) for item in value])
+                elif isinstance(value[0], tuple):
+                    # Pares (chave, valor) de DictLiteral
+                    setattr(node, field_name, [(key, self.fold(item)) for key, item in value])
+
+    def _binary(self, op: str, left, right):
+        """Resultado de left op right, ou None se não vale a pena dobrar"""
+        if op == "**" and isinstance(right, (int, float)) and abs(right) > MAX_FOLDED_EXPONENT:
+            return None
+        if op == "*" and (isinstance(left, str) or isinstance(right, str)):
+            count = right if isinstance(left, str) else left
+            text = left if isinstance(left, str) else right
+            if isinstance(count, int) and len(text) * count > MAX_FOLDED_STRING:
+                return None
+        return BINARY_OPERATORS[op](left, right)
+
+    def _constant(self, node: Node, compute) -> Node:
+        """Literal com o valor de compute(), ou node se o cálculo falha ou não compensa"""
+        try:
+            value = compute()
+        except (QuokkaError, ArithmeticError, TypeError, ValueError):
+            return node
+        if value is None:
+            return node
+        if isinstance(value, float) and not math.isfinite(value):
+            return node
+        if isinstance(value, str) and len(value) > MAX_FOLDED_STRING:
+            return node
+        if not isinstance(value, (bool, int, float, str)):
+            return node
+        return Literal(value, node.line)
+
+
+# ---------------------------------------------------------------------------
+# Reescrita da AST como código Quokka
+# ---------------------------------------------------------------------------
+
+def format_program(program: Program) -> str:
+    """Código Quokka equivalente ao programa (para inspecionar a otimização)"""
+    out: List[str] = []
+    for item in program.body:
+        if isinstance(item, Import):
+            out.append("import { " + " . ".join(f'"{name}"' for name in item.modules) + " }")
+        elif isinstance(item, GlobalBlock):
+            out.append("global{")
+            for name, value in item.declarations:
+                out.append(f"    {name}" if value is None else f"    {name} = {_bare(value)}")
+            out.append("}")
+        elif isinstance(item, FunctionDef):
+            out.append(f"fun {item.name}({', '.join(item.params)}) {{")
+            _format_block(item.body, 1, out)
+            out.append("}")
+        elif isinstance(item, MainBlock):
+            out.append("main{")
+            _format_block(item.body, 1, out)
+            out.append("}")
+        out.append("")
+    return "\n".join(out)
+
+
+def _format_block(block: Block, depth: int, out: List[str]):
+    for statement in block.statements:
+        _format_statement(statement, depth, out)
+
+
+def _format_statement(node: Node, depth: int, out: List[str]):
+    indent = "    " * depth
+    cls = node.__class__
+    if cls is If:
+        keyword = "if"
+        while True:
+            out.append(f"{indent}{keyword}({_bare(node.condition)}) {{")
+            _format_block(node.body, depth + 1, out)
+            if node.orelse is None:
+                out.append(f"{indent}}}")
+                return
+            if node.orelse.__class__ is If:
+                keyword = "} else if"
+                node = node.orelse
+                continue
+            out.append(f"{indent}}} else {{")
+            _format_block(node.orelse, depth + 1, out)
+            out.append(f"{indent}}}")
+            return
+    if cls is While:
+        out.append(f"{indent}while({_bare(node.condition)}) {{")
+        _format_block(node.body, depth + 1, out)
+        out.append(f"{indent}}}")
+    elif cls is Each:
+        out.append(f"{indent}each(${node.collection} : {node.item}) {{")
+        _format_block(node.body, depth + 1, out)
+        out.append(f"{indent}}}")
+    elif cls is Print:
+        out.append(f"{indent}print({_bare(node.value)})")
+    elif cls is Yield:
+        out.append(f"{indent}yield({_bare(node.value)})")
+    elif cls is Break:
+        out.append(f"{indent}break")
+    elif cls is Continue:
+        out.append(f"{indent}continue")
+    elif cls is Assign:
+        out.append(f"{indent}{node.name} = {_bare(node.value)}")
+    elif cls is IndexAssign:
+        out.append(f"{indent}{node.name}[{_bare(node.index)}] = {_bare(node.value)}")
+    elif cls is KeyAssign:
+        out.append(f"{indent}{node.name}{{{_bare(node.key)}}} = {_bare(node.value)}")
+    elif cls is CompoundAssign:
+        out.append(f"{indent}{node.name} {node.op} {_bare(node.value)}")
+    elif cls is IncDec:
+        out.append(f"{indent}{node.name}{node.op}")
+    elif cls is Append:
+        out.append(f"{indent}{node.name} << {_bare(node.value)}")
+    elif cls is AppendPair:
+        out.append(f"{indent}{node.name} << ('{node.key}' = {_bare(node.value)})")
+    elif cls is ExprStatement:
+        out.append(f"{indent}{_bare(node.expr)}")
+
+
+def format_expression(node: Node) -> str:
+    """Expressão como código Quokka (operações binárias sempre entre parênteses)"""
+    cls = node.__class__
+    if cls is Literal:
+        return _format_literal(node.value)
+    if cls is Name:
+        return node.name
+    if cls is ArrayLiteral:
+        return "{ " + " . ".join(_format_element(element) for element in node.elements) + " }"
+    if cls is DictLiteral:
+        return "{ " + " . ".join(f"'{key}' = {_format_element(value)}" for key, value in node.pairs) + " }"
+    if cls is BinaryOp or cls is Logical:
+        return f"({format_expression(node.left)} {node.op} {format_expression(node.right)})"
+    if cls is Index:
+        return f"{format_expression(node.obj)}[{format_expression(node.index)}]"
+    if cls is KeyAccess:
+        return f"{format_expression(node.obj)}{{{format_expression(node.key)}}}"
+    if cls is Call:
+        return f"{node.name}({', '.join(format_expression(arg) for arg in node.args)})"
+    if cls is Conversion:
+        return f"{node.name}({format_expression(node.arg)})"
+    if cls is Prompt:
+        return f"prompt({format_expression(node.message)})"
+    return f"<{cls.__name__}>"
+
+
+def _bare(node: Node) -> str:
+    """Expressão sem os parênteses de fora (condições, print, yield, lado direito de =)"""
+    text = format_expression(node)
+    return text[1:-1] if node.__class__ is BinaryOp or node.__class__ is Logical else text
+
+
+def _format_element(node: Node) -> str:
+    """Elemento de array/dicionário: nomes vão entre parênteses ('a . b' seria um nome composto)"""
+    text = format_expression(node)
+    return f"({text})" if node.__class__ in (Name, Index, KeyAccess) else text
+
+
+def _format_literal(value) -> str:
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, str):
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+        return f'"{escaped}"'
+    return repr(value)
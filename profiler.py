@@ -0,0 +1,210 @@
+"""
+Perfil de execução de programas Quokka (main.py --profile).
+
+O Profiler é um tracer (tracer.py): mede o tempo e o número de execuções
+de cada função Quokka e de cada linha do código, usando a linha guardada em
+cada declaração. O tempo decorrido entre dois avisos é atribuído à linha em
+execução, à função no topo da pilha (tempo próprio) e à pilha inteira, que
+alimenta o arquivo de pilhas colapsadas ("main;f;g 1234" por linha, em
+microssegundos) aceito por flamegraph.pl, speedscope e afins.
+
+O SamplingProfiler tem custo menor: os ganchos só mantêm a pilha e a linha
+atuais, e uma thread as registra a cada intervalo. Chamadas continuam
+contadas exatamente; tempos são estimados pelas amostras.
+
+Linhas são identificadas pela função em que estão ("fib:3"; "main:12"),
+o que separa as linhas dos módulos importados das do programa.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from tracer import Tracer
+
+# Nome da pilha de fora de qualquer função
+ROOT = "main"
+
+
+class FunctionStats:
+    """Chamadas, tempo total (com as funções chamadas) e tempo próprio de uma função"""
+    __slots__ = ("calls", "total", "own", "active")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+        # Chamadas em andamento (recursão conta o tempo total só uma vez)
+        self.active = 0
+
+
+class LineStats:
+    """Execuções e tempo próprio de uma linha"""
+    __slots__ = ("hits", "time")
+
+    def __init__(self):
+        self.hits = 0
+        self.time = 0.0
+
+
+class Profiler(Tracer):
+    """Perfil exato: mede com time.perf_counter() a cada declaração e chamada"""
+
+    def __init__(self):
+        self.functions: Dict[str, FunctionStats] = {ROOT: FunctionStats()}
+        self.lines: Dict[Tuple[str, int], LineStats] = {}
+        self.stacks: Dict[str, float] = {}
+        self.elapsed = 0.0
+        # Pilha de (função, caminho "main;f;g", linha de quem chamou, início)
+        self._frames: List[Tuple[str, str, Optional[Tuple[str, int]], float]] = []
+        self._function = ROOT
+        self._path = ROOT
+        self._line: Optional[Tuple[str, int]] = None
+        self._last = 0.0
+
+    def start(self):
+        """Começa a medir (antes de interpret())"""
+        self._start = self._last = time.perf_counter()
+        self.functions[ROOT].calls += 1
+
+    def stop(self):
+        """Fecha a última medida (depois de interpret())"""
+        self._flush()
+        self.elapsed = self._last - self._start
+        self.functions[ROOT].total = self.elapsed
+
+    def _flush(self) -> float:
+        """Atribui o tempo desde o último aviso à linha, à função e à pilha atuais"""
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.functions[self._function].own += elapsed
+        self.stacks[self._path] = self.stacks.get(self._path, 0.0) + elapsed
+        if self._line is not None:
+            self.lines[self._line].time += elapsed
+        return now
+
+    def on_statement(self, line):
+        self._flush()
+        key = self._line = (self._function, line)
+        stats = self.lines.get(key)
+        if stats is None:
+            stats = self.lines[key] = LineStats()
+        stats.hits += 1
+
+    def on_call(self, name, args):
+        now = self._flush()
+        stats = self.functions.get(name)
+        if stats is None:
+            stats = self.functions[name] = FunctionStats()
+        stats.calls += 1
+        stats.active += 1
+        self._frames.append((self._function, self._path, self._line, now))
+        self._function = name
+        self._path = f"{self._path};{name}"
+        self._line = None
+
+    def on_return(self, name, value):
+        now = self._flush()
+        caller, path, line, started = self._frames.pop()
+        stats = self.functions[name]
+        stats.active -= 1
+        if stats.active == 0:
+            stats.total += now - started
+        self._function, self._path, self._line = caller, path, line
+
+    def write_collapsed(self, path: str):
+        """Grava as pilhas colapsadas (microssegundos) para ferramentas de flamegraph"""
+        with open(path, "w", encoding="utf-8") as output:
+            for stack, seconds in sorted(self.stacks.items()):
+                micros = round(seconds * 1_000_000)
+                if micros > 0:
+                    output.write(f"{stack} {micros}\n")
+
+    def report(self, top: int = 20) -> str:
+        """Relatório com as funções e linhas de maior tempo próprio"""
+        out = ["=== PERFIL ===", f"Tempo total: {self.elapsed * 1000:.1f}ms", ""]
+
+        out.append(f"Funções (top {top} por tempo próprio)")
+        out.append(f"  {'chamadas':>10} {'total(ms)':>11} {'próprio(ms)':>12}  função")
+        functions = sorted(self.functions.items(), key=lambda item: item[1].own, reverse=True)
+        for name, stats in functions[:top]:
+            out.append(f"  {stats.calls:>10} {stats.total * 1000:>11.1f} {stats.own * 1000:>12.1f}  {name}")
+
+        out.append("")
+        out.append(f"Linhas (top {top} por tempo próprio)")
+        out.append(f"  {'execuções':>10} {'tempo(ms)':>11} {'%':>6}  linha")
+        total = self.elapsed or 1.0
+        lines = sorted(self.lines.items(), key=lambda item: item[1].time, reverse=True)
+        for (function, line), stats in lines[:top]:
+            hits = stats.hits if stats.hits else "-"
+            out.append(f"  {hits:>10} {stats.time * 1000:>11.1f} {stats.time / total * 100:>5.1f}%  {function}:{line}")
+        return "\n".join(out)
+
+
+class SamplingProfiler(Profiler):
+    """Perfil por amostragem: uma thread registra a pilha atual a cada interval segundos"""
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__()
+        if interval <= 0:
+            raise ValueError("interval deve ser positivo")
+        self.interval = interval
+        self.samples = 0
+        # Pilha de funções e linha atual; a thread só as lê
+        self._names: List[str] = [ROOT]
+        self._callers: List[Optional[int]] = []
+        self._current: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self.functions[ROOT].calls += 1
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._start
+        self.functions[ROOT].total = self.elapsed
+
+    def on_statement(self, line):
+        self._current = line
+
+    def on_call(self, name, args):
+        stats = self.functions.get(name)
+        if stats is None:
+            stats = self.functions[name] = FunctionStats()
+        stats.calls += 1
+        self._callers.append(self._current)
+        self._names.append(name)
+        self._current = None
+
+    def on_return(self, name, value):
+        self._names.pop()
+        self._current = self._callers.pop()
+
+    def _sample_loop(self):
+        # Cada amostra vale o tempo real desde a anterior: com a GIL a thread
+        # pode acordar bem depois do intervalo pedido
+        last = self._start
+        while not self._stopped.wait(self.interval):
+            now = time.perf_counter()
+            self._record(tuple(self._names), self._current, now - last)
+            last = now
+
+    def _record(self, names: Tuple[str, ...], line: Optional[int], weight: float):
+        """Soma uma amostra: tempo próprio do topo, total de cada função distinta da pilha"""
+        self.samples += 1
+        function = names[-1]
+        self.functions[function].own += weight
+        for name in set(names[1:]):
+            self.functions[name].total += weight
+        path = ";".join(names)
+        self.stacks[path] = self.stacks.get(path, 0.0) + weight
+        if line is not None:
+            key = (function, line)
+            stats = self.lines.get(key)
+            if stats is None:
+                stats = self.lines[key] = LineStats()
+            stats.time += weight
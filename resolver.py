@@ -0,0 +1,91 @@
+"""
+Resolução de variáveis em tempo de compilação.
+
+Os motores que compilam a AST ("closure" e "python") não guardam as
+variáveis locais em cadeias de Environment: cada função (e o main) tem um
+frame, uma lista com uma posição fixa para cada nome local, decidida antes
+da execução. Uma posição com UNSET significa "o nome não existe em nenhum
+escopo local"; leituras e escritas caem então para as variáveis globais.
+
+As regras de escopo são as mesmas da cadeia de Environment:
+- funções veem apenas as globais e seus parâmetros;
+- no main fora de loops o escopo atual é o global;
+- '=' atualiza o escopo mais próximo que já tem o nome, senão cria o nome
+  no escopo atual;
+- cada iteração de while/each tem um escopo novo: nomes criados nela deixam
+  de existir no fim da iteração, e a variável do each (e __index__) escondem
+  as de mesmo nome dos escopos de fora.
+"""
+from typing import Dict, Iterable, List, Set
+
+from ast_nodes import Assign, Block, Each, If, While
+
+
+class _Unset:
+    """Marca uma variável local que não existe no escopo Quokka atual"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return "UNSET"
+
+UNSET = _Unset()
+
+
+def collect_assigned(block: Block, in_loop: bool, names: Set[str], loop_only: bool):
+    """Nomes que podem virar variáveis locais: alvos de '=' e variáveis de each"""
+    for statement in block.statements:
+        cls = statement.__class__
+        if cls is Assign:
+            if in_loop or not loop_only:
+                names.add(statement.name)
+        elif cls is If:
+            current = statement
+            while current is not None:
+                collect_assigned(current.body, in_loop, names, loop_only)
+                if isinstance(current.orelse, If):
+                    current = current.orelse
+                else:
+                    if current.orelse is not None:
+                        collect_assigned(current.orelse, in_loop, names, loop_only)
+                    current = None
+        elif cls is While:
+            collect_assigned(statement.body, True, names, loop_only)
+        elif cls is Each:
+            names.add(statement.item)
+            names.add("__index__")
+            collect_assigned(statement.body, True, names, loop_only)
+
+
+def created_in(block: Block) -> Set[str]:
+    """Nomes atribuídos com '=' em qualquer ponto de um bloco"""
+    names: Set[str] = set()
+    collect_assigned(block, True, names, loop_only=False)
+    return names
+
+
+class FrameLayout:
+    """Posição de cada variável local de uma função (ou do main) no frame"""
+
+    def __init__(self, kind: str, params: Iterable[str] = ()):
+        # "function", "main" ou "global"
+        self.kind = kind
+        self.slots: Dict[str, int] = {}
+        self.names: List[str] = []
+        # Parâmetros ocupam as primeiras posições, na ordem da declaração
+        self.param_slots = [self.slot(param) for param in params]
+
+    def slot(self, name: str) -> int:
+        """Posição de name no frame (reservada no primeiro uso)"""
+        index = self.slots.get(name)
+        if index is None:
+            index = self.slots[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    @property
+    def size(self) -> int:
+        return len(self.names)
+
+    def new_frame(self) -> list:
+        """Frame vazio: nenhum nome local existe ainda"""
+        return [UNSET] * len(self.names)
@@ -0,0 +1,341 @@
+from typing import Any, Dict, List, Optional, Union
+from dataclasses import dataclass
+
+# Objetos de runtime criados pelo processo (métricas de stats.py). Um dicionário
+# do módulo, e não atributos de classe: alterar um atributo de classe invalida
+# os caches de atributos do CPython para todos os métodos da classe.
+CREATED = {"environments": 0, "arrays": 0, "dicts": 0}
+
+class QuokkaArray:
+    """Representa um array do Quokka (lista com sintaxe especial)"""
+    def __init__(self, items: List[Any] = None):
+        CREATED["arrays"] += 1
+        self.items = items or []
+    
+    def __str__(self):
+        return "{ " + " . ".join(str(item) for item in self.items) + " }"
+    
+    def __repr__(self):
+        return f"QuokkaArray({self.items})"
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def __getitem__(self, index):
+        if isinstance(index, int) and 0 <= index < len(self.items):
+            return self.items[index]
+        return None
+    
+    def __setitem__(self, index, value):
+        if isinstance(index, int):
+            # Expande o array se necessário
+            while len(self.items) <= index:
+                self.items.append(None)
+            self.items[index] = value
+    
+    def append(self, value):
+        self.items.append(value)
+    
+    def to_list(self):
+        return self.items.copy()
+
+    def extend(self, other_array):
+        """Adiciona todos os elementos de outro array"""
+        if isinstance(other_array, QuokkaArray):
+            self.items.extend(other_array.items)
+        elif isinstance(other_array, list):
+            self.items.extend(other_array)
+        else:
+            raise ValueError("extend() requer um QuokkaArray ou lista")
+
+    def size(self):
+        """Retorna o tamanho do array"""
+        return len(self.items)
+
+class QuokkaDict:
+    """Representa um dicionário do Quokka"""
+    def __init__(self, items: Dict[str, Any] = None):
+        CREATED["dicts"] += 1
+        self.items = items or {}
+    
+    def __str__(self):
+        pairs = []
+        for key, value in self.items.items():
+            if isinstance(value, str):
+                value_str = f'"{value}"'
+            else:
+                value_str = str(value)
+            pairs.append(f"'{key}' = {value_str}")
+        return "{ " + " . ".join(pairs) + " }"
+    
+    def __repr__(self):
+        return f"QuokkaDict({self.items})"
+    
+    def __getitem__(self, key):
+        return self.items.get(str(key))
+    
+    def __setitem__(self, key, value):
+        self.items[str(key)] = value
+    
+    def __contains__(self, key):
+        return str(key) in self.items
+    
+    def keys(self):
+        return list(self.items.keys())
+    
+    def values(self):
+        return list(self.items.values())
+
+    def update(self, other_dict):
+        """Atualiza o dicionário com chaves de outro dicionário"""
+        if isinstance(other_dict, QuokkaDict):
+            self.items.update(other_dict.items)
+        elif isinstance(other_dict, dict):
+            self.items.update(other_dict)
+        else:
+            raise ValueError("update() requer um QuokkaDict ou dict")
+
+    def size(self):
+        """Retorna o número de chaves no dicionário"""
+        return len(self.items)
+# Tipos de dados que o Quokka pode ter
+QuokkaValue = Union[None, bool, int, float, str, QuokkaArray, QuokkaDict]
+
+@dataclass
+class QuokkaError(Exception):
+    """Erro customizado para o interpretador Quokka"""
+    message: str
+    line: int = 0
+    column: int = 0
+
+class LimitExceeded(QuokkaError):
+    """Limite do orçamento de execução (budget.py) excedido; atravessa as intrínsecas sem cair na versão .qk"""
+
+class BreakException(Exception):
+    """Exceção especial para implementar break (controle de fluxo)"""
+    pass
+
+class ContinueException(Exception):
+    """Exceção especial para implementar continue (controle de fluxo)"""
+    pass
+
+class Environment:
+    """Ambiente de execução - armazena variáveis e seus valores"""
+    
+    def __init__(self, parent: Optional['Environment'] = None):
+        CREATED["environments"] += 1
+        self.variables: Dict[str, QuokkaValue] = {}
+        self.parent = parent
+    
+    def define(self, name: str, value: QuokkaValue):
+        """Define uma nova variável"""
+        self.variables[name] = value
+    
+    def get(self, name: str) -> QuokkaValue:
+        """Busca o valor de uma variável"""
+        env = self
+        while env is not None:
+            variables = env.variables
+            if name in variables:
+                return variables[name]
+            env = env.parent
+        raise QuokkaError(f"Variável '{name}' não definida")
+    
+    def set(self, name: str, value: QuokkaValue):
+        """Atualiza o valor de uma variável existente"""
+        # Uma única subida pela cadeia: atualiza o escopo mais próximo que já tem o nome
+        env = self
+        while env is not None:
+            variables = env.variables
+            if name in variables:
+                variables[name] = value
+                return
+            env = env.parent
+        # Se não existe, cria nova
+        self.variables[name] = value
+    
+    def has(self, name: str) -> bool:
+        """Verifica se uma variável existe"""
+        env = self
+        while env is not None:
+            if name in env.variables:
+                return True
+            env = env.parent
+        return False
+
+    def reset(self, keep: int = 0):
+        """
+        Apaga as variáveis definidas depois das `keep` primeiras.
+
+        Permite que um loop use um único escopo para todas as iterações: no
+        início de cada uma, o que a anterior criou é removido (dicts mantêm a
+        ordem de inserção, então popitem tira sempre o nome mais recente).
+        """
+        variables = self.variables
+        while len(variables) > keep:
+            variables.popitem()
+
+    def create_local_scope(self) -> 'Environment':
+        """Cria um novo escopo local baseado no atual"""
+        return Environment(parent=self)
+
+    def get_all_variables(self) -> Dict[str, QuokkaValue]:
+        """Retorna todas as variáveis visíveis (incluindo do parent)"""
+        all_vars = {}
+        if self.parent:
+            all_vars.update(self.parent.get_all_variables())
+        all_vars.update(self.variables)
+        return all_vars
+
+class YieldException(Exception):
+    """Exceção especial para implementar yield (controle de fluxo)"""
+    def __init__(self, value):
+        self.value = value
+
+class ControlSignal:
+    """Sinal devolvido por uma declaração que interrompe o fluxo normal"""
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+# Os motores executam uma declaração e recebem None (segue para a próxima) ou
+# um destes sinais, que sobe pelos blocos até o loop ou a função que o trata.
+# As exceções acima ficam para quando o sinal precisa atravessar uma chamada
+# de função (break fora de loop dentro de uma função interrompe o loop de quem
+# chamou). Com RETURN, o valor do yield fica no executor.
+BREAK = ControlSignal("BREAK")
+CONTINUE = ControlSignal("CONTINUE")
+RETURN = ControlSignal("RETURN")
+
+
+def raise_signal(signal: ControlSignal, value: QuokkaValue = None):
+    """Lança a exceção equivalente a um sinal que saiu de uma função ou do main"""
+    if signal is BREAK:
+        raise BreakException()
+    if signal is CONTINUE:
+        raise ContinueException()
+    raise YieldException(value)
+
+# Funções de conversão nativas: to_int(), to_float(), to_bool(), to_str()
+CONVERSION_FUNCTIONS = ("to_int", "to_float", "to_bool", "to_str")
+
+def is_truthy(value: QuokkaValue) -> bool:
+    """Determina se um valor é considerado verdadeiro"""
+    if value is None or value is False:
+        return False
+    if value == 0 or value == "":
+        return False
+    return True
+
+def quokka_to_string(value: QuokkaValue) -> str:
+    """Converte um valor Quokka para string"""
+    if value is None:
+        return "null"
+    elif isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, QuokkaArray):
+        return str(value)
+    elif isinstance(value, QuokkaDict):
+        return str(value)
+    else:
+        return str(value)
+
+def convert_value(func_name: str, arg: QuokkaValue) -> QuokkaValue:
+    """Aplica uma função de conversão (to_int, to_float, to_bool, to_str) a um valor"""
+    try:
+        if func_name == "to_int":
+            if isinstance(arg, str):
+                return int(arg)
+            elif isinstance(arg, float):
+                return int(arg)
+            elif isinstance(arg, int):
+                return arg
+            else:
+                raise ValueError(f"Não é possível converter {type(arg)} para int")
+
+        elif func_name == "to_float":
+            if isinstance(arg, str):
+                return float(arg)
+            elif isinstance(arg, int):
+                return float(arg)
+            elif isinstance(arg, float):
+                return arg
+            else:
+                raise ValueError(f"Não é possível converter {type(arg)} para float")
+
+        elif func_name == "to_bool":
+            if isinstance(arg, str):
+                arg_lower = arg.lower().strip()
+                if arg_lower in ["true", "yes", "sim", "s", "1", "verdadeiro","y"]:
+                    return True
+                elif arg_lower in ["false", "no", "não", "n", "0", "falso"]:
+                    return False
+                else:
+                    raise ValueError(f"'{arg}' não é um valor booleano válido")
+            elif isinstance(arg, bool):
+                return arg
+            elif isinstance(arg, int):
+                return arg != 0
+            elif isinstance(arg, float):
+                return arg != 0.0
+            else:
+                raise ValueError(f"Não é possível converter {type(arg)} para bool")
+
+        elif func_name == "to_str":
+            if isinstance(arg, str):
+                return arg
+            elif isinstance(arg, int):
+                return str(arg)
+            elif isinstance(arg, float):
+                return str(arg)
+            else:
+                raise ValueError(f"Não é possível converter {type(arg)} para float")
+
+    except ValueError as e:
+        raise QuokkaError(f"Erro na conversão {func_name}: {e}")
+
+
+def quokka_add(left: QuokkaValue, right: QuokkaValue) -> QuokkaValue:
+    """Operador +: soma numérica ou, com uma string de um dos lados, concatenação"""
+    if isinstance(left, str) or isinstance(right, str):
+        return quokka_to_string(left) + quokka_to_string(right)
+    return left + right
+
+
+def quokka_power(left: QuokkaValue, right: QuokkaValue) -> QuokkaValue:
+    """Operador **: só entre números"""
+    if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+        raise QuokkaError("Potenciação só funciona com números")
+    return left ** right
+
+
+def each_items(collection: QuokkaValue, collection_name: str) -> List[QuokkaValue]:
+    """Lista percorrida por each(): itens do array, chaves do dicionário ou caracteres da string"""
+    if isinstance(collection, QuokkaArray):
+        # A própria lista: itens adicionados durante o loop também são visitados
+        return collection.items
+    elif isinstance(collection, QuokkaDict):
+        return list(collection.items.keys())
+    elif isinstance(collection, str):
+        return [char for char in collection]
+    raise QuokkaError(f"'{collection_name}' não é um array ou string válido para iteração")
+
+
+def call_intrinsic(native, args: List[QuokkaValue]) -> QuokkaValue:
+    """
+    Executa a implementação nativa de uma função de biblioteca (intrinsics.py).
+    NotImplemented indica que a intrínseca não trata esses argumentos e que a
+    versão em Quokka deve ser executada (ela produz o resultado ou o erro).
+    Limites do orçamento excedidos pela intrínseca (LimitExceeded) sobem
+    direto para quem chamou.
+    """
+    try:
+        return native(*args)
+    except LimitExceeded:
+        raise
+    except Exception:
+        return NotImplemented
@@ -0,0 +1,99 @@
+"""
+Métricas de execução de um interpretador Quokka (QuokkaInterpreter.stats()).
+
+Sempre coletadas, sem custo por declaração:
+- tempo das fases do programa principal: "lex", "parse", "optimize" e
+  "execute" (no motor "tokens" a análise acontece durante a execução e entra
+  em "execute"; com o cache em disco lex e parse ficam próximos de zero);
+- tempo de análise (ou leitura do cache) de cada módulo importado, já
+  incluído em "execute";
+- passos do orçamento de execução (iterações de while e each, chamadas de
+  funções Quokka e intrínsecas e elementos criados pelas intrínsecas);
+- Environment, QuokkaArray e QuokkaDict criados;
+- acertos e faltas dos caches de memoização (memo.py), se ativa.
+
+Declarações executadas e chamadas por função exigem um StatsTracer
+instalado (main.py --stats faz isso); sem ele esses campos ficam None.
+"""
+import time
+from typing import Dict
+
+from runtime import CREATED
+from tracer import Tracer
+
+
+def allocation_counts() -> Dict[str, int]:
+    """Objetos de runtime criados pelo processo até agora"""
+    return dict(CREATED)
+
+
+class StatsTracer(Tracer):
+    """Conta declarações executadas e chamadas de cada função"""
+
+    def __init__(self):
+        self.statements = 0
+        self.calls: Dict[str, int] = {}
+
+    def on_statement(self, line):
+        self.statements += 1
+
+    def on_call(self, name, args):
+        calls = self.calls
+        calls[name] = calls.get(name, 0) + 1
+
+
+class RuntimeStats:
+    """Fases, módulos e alocações da última chamada a interpret()"""
+
+    PHASES = ("lex", "parse", "optimize", "execute")
+
+    def __init__(self):
+        self.start()
+
+    def start(self):
+        """Zera as métricas (início de cada interpret())"""
+        self.phases: Dict[str, float] = dict.fromkeys(self.PHASES, 0.0)
+        self.modules: Dict[str, float] = {}
+        self._allocations = allocation_counts()
+
+    def add_phase(self, phase: str, started: float) -> float:
+        """Soma à fase o tempo desde started (time.perf_counter()) e devolve o instante atual"""
+        now = time.perf_counter()
+        self.phases[phase] += now - started
+        return now
+
+    def allocations(self) -> Dict[str, int]:
+        """Objetos de runtime criados desde start()"""
+        return {name: count - self._allocations[name] for name, count in allocation_counts().items()}
+
+    def as_dict(self, interpreter) -> Dict[str, object]:
+        """Métricas do interpretador em tipos simples (prontas para json.dump)"""
+        tracer = interpreter.tracer
+        counting = tracer if isinstance(tracer, StatsTracer) else None
+        available, materialized = interpreter.library_function_counts()
+        steps = interpreter.budget.steps
+        stats = {
+            "engine": interpreter.engine,
+            "phases": dict(self.phases),
+            "modules": dict(self.modules),
+            "steps": steps,
+            "allocations": self.allocations(),
+            "functions": {
+                "defined": len(interpreter.functions),
+                "library_available": available,
+                "library_materialized": materialized,
+            },
+            "statements": None,
+            "calls": None,
+            "loop_iterations": None,
+            "memo": interpreter.memo.stats() if interpreter.memo is not None else None,
+        }
+        if counting is not None:
+            stats["statements"] = counting.statements
+            stats["calls"] = dict(sorted(counting.calls.items(), key=lambda item: item[1], reverse=True))
+            # Os passos que não são chamadas de funções (Quokka ou intrínsecas) nem
+            # elementos criados por intrínsecas são iterações de loop (em while,
+            # inclusive a última verificação da condição)
+            stats["loop_iterations"] = max(steps - sum(counting.calls.values()) - interpreter.budget.native_steps, 0)
+        return stats
+
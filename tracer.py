@@ -0,0 +1,170 @@
+"""
+Rastreamento da execução de programas Quokka.
+
+Um Tracer recebe avisos (ganchos on_*) do interpretador e dos motores. Para
+rastrear, crie uma subclasse, sobrescreva só os ganchos de interesse e
+instale com QuokkaInterpreter.set_tracer(). Sem tracer instalado nada é
+verificado durante a execução: os motores decidem ao serem criados se
+envolvem as chamadas de função e se compilam os avisos por declaração, e
+on_statement só é instrumentado quando a subclasse o sobrescreve.
+
+Ganchos atendidos por motor:
+- todos: on_statement, on_call, on_return, on_define, on_import e os
+  ganchos de escopos, loops e alterações (STRUCTURE_HOOKS);
+- todos menos "tokens": on_finish.
+
+Os motores compilados ("closure", "vm" e "python") só instrumentam os
+ganchos de STRUCTURE_HOOKS quando o tracer sobrescreve algum deles
+(traces_structure); nesse caso todos os sete são avisados.
+
+enable_debug_mode() instala um DebugTracer, que imprime as mensagens
+"[DEBUG] ..." do modo debug.
+"""
+from typing import Callable, List, Optional
+
+from runtime import QuokkaArray, QuokkaDict, QuokkaValue
+
+
+class Tracer:
+    """Ganchos de rastreamento; a implementação padrão de cada um não faz nada"""
+
+    def on_statement(self, line: int):
+        """Uma declaração da linha line vai ser executada"""
+
+    def on_call(self, name: str, args: List[QuokkaValue]):
+        """Início da chamada da função name (inclusive intrínsecas nativas)"""
+
+    def on_return(self, name: str, value: QuokkaValue):
+        """Fim da chamada de name; também é chamado quando a chamada termina com erro"""
+
+    def on_scope_enter(self, context: str):
+        """Um escopo local foi criado (corpo de função, while)"""
+
+    def on_scope_exit(self, context: str):
+        """O escopo local criado para context foi descartado"""
+
+    def on_loop_iteration(self, kind: str, iteration: int, value: QuokkaValue, name: Optional[str] = None):
+        """
+        Início de uma iteração de loop. kind é "while" (value = valor da
+        condição) ou "each" (value = item, name = variável do item).
+        """
+
+    def on_loop_control(self, kind: str, statement: str, iteration: int):
+        """break ou continue (statement) interrompeu a iteração do loop kind"""
+
+    def on_loop_error(self, kind: str, iteration: int, error: Exception):
+        """Um erro saiu do corpo do loop kind"""
+
+    def on_update(self, name: str, operator: str, operand: Optional[QuokkaValue],
+                  old: QuokkaValue, new: QuokkaValue):
+        """+=, -= (operand = valor à direita), ++ ou -- (operand = None) alterou name"""
+
+    def on_append(self, name: str, value: QuokkaValue, key: Optional[str] = None):
+        """'name << value' (ou 'name << (key = value)' em dicionários)"""
+
+    def on_define(self, name: str, params: List[str]):
+        """Uma função foi definida"""
+
+    def on_import(self, module: str):
+        """Um módulo terminou de ser carregado"""
+
+    def on_finish(self, interpreter):
+        """O programa terminou (motores da AST)"""
+
+    def overrides(self, hook: str) -> bool:
+        """Indica se a subclasse implementa o gancho (os motores só instrumentam os implementados)"""
+        return getattr(type(self), hook) is not getattr(Tracer, hook)
+
+
+# Ganchos de escopos, loops e alterações de variáveis
+STRUCTURE_HOOKS = ("on_scope_enter", "on_scope_exit", "on_loop_iteration", "on_loop_control",
+                   "on_loop_error", "on_update", "on_append")
+
+
+def traces_structure(tracer: Optional[Tracer]) -> bool:
+    """Indica se o tracer sobrescreve algum gancho de escopos, loops ou alterações"""
+    return tracer is not None and any(tracer.overrides(hook) for hook in STRUCTURE_HOOKS)
+
+
+def statement_hook(tracer: Optional[Tracer]) -> Optional[Callable[[int], None]]:
+    """on_statement do tracer, ou None se não há tracer ou ele não trata declarações"""
+    if tracer is None or not tracer.overrides("on_statement"):
+        return None
+    return tracer.on_statement
+
+
+def traced_calls(call_function: Callable, tracer: Tracer) -> Callable:
+    """Envolve o call_function de um motor com os avisos on_call e on_return"""
+    on_call = tracer.on_call
+    on_return = tracer.on_return
+
+    def call_traced(func_name: str, args: List[QuokkaValue]) -> QuokkaValue:
+        on_call(func_name, args)
+        value = None
+        try:
+            value = call_function(func_name, args)
+            return value
+        finally:
+            on_return(func_name, value)
+    return call_traced
+
+
+class DebugTracer(Tracer):
+    """Modo debug: imprime escopos, iterações, chamadas e alterações de variáveis"""
+
+    def __init__(self, interpreter):
+        # Usado para mostrar os nomes dos parâmetros de cada chamada
+        self.interpreter = interpreter
+
+    def on_call(self, name, args):
+        function = self.interpreter.functions.get(name)
+        params = function.params if function is not None else []
+        print(f"[DEBUG] Executando função '{name}' com escopo local")
+        print(f"[DEBUG] Parâmetros: {dict(zip(params, args))}")
+
+    def on_scope_enter(self, context):
+        print(f"[DEBUG] Criando escopo local para: {context}")
+
+    def on_scope_exit(self, context):
+        print(f"[DEBUG] Escopo local restaurado: {context}")
+
+    def on_loop_iteration(self, kind, iteration, value, name=None):
+        if kind == "while":
+            print(f"[DEBUG] While loop {iteration}: condição = {value}")
+        else:
+            print(f"[DEBUG] Iteração {iteration}: {name} = {value}")
+
+    def on_loop_control(self, kind, statement, iteration):
+        where = "no each, iteração" if kind == "each" else "na iteração"
+        print(f"[DEBUG] {statement.capitalize()} executado {where} {iteration}")
+
+    def on_loop_error(self, kind, iteration, error):
+        print(f"[DEBUG] Erro no {kind} loop na iteração {iteration}: {error}")
+
+    def on_update(self, name, operator, operand, old, new):
+        if operand is None:
+            print(f"[DEBUG] {name} {operator}: {old} -> {new}")
+            print(f"[DEBUG] {name}{operator} = {new}")
+        else:
+            print(f"[DEBUG] {name} {operator} {operand}: {old} -> {new}")
+            print(f"[DEBUG] {name} {operator} {operand} = {new}")
+
+    def on_append(self, name, value, key=None):
+        if key is not None:
+            print(f"[DEBUG] {name} << ('{key}' = {value})")
+        elif isinstance(value, QuokkaDict):
+            print(f"[DEBUG] {name} << {value} (múltiplas chaves)")
+        elif isinstance(value, QuokkaArray):
+            print(f"[DEBUG] {name} << {value} (múltiplos elementos)")
+        else:
+            print(f"[DEBUG] {name} << {value}")
+
+    def on_define(self, name, params):
+        print(f"Função '{name}' definida com {len(params)} parâmetros")
+
+    def on_import(self, module):
+        print(f"✅ Módulo carregado: {module}")
+
+    def on_finish(self, interpreter):
+        available, materialized = interpreter.library_function_counts()
+        print(f"[DEBUG] Funções de biblioteca materializadas: {materialized} de {available}")
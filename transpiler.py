@@ -0,0 +1,825 @@
+import re
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from runtime import (
+    QuokkaArray, QuokkaDict, QuokkaValue, QuokkaError,
+    BreakException, ContinueException, YieldException,
+    is_truthy, quokka_to_string, convert_value, call_intrinsic, each_items,
+)
+from ast_nodes import (
+    Node, Literal, Name, ArrayLiteral, DictLiteral, BinaryOp, Logical, Index, KeyAccess,
+    Call, Conversion, Prompt, Block, Print, If, While, Each, Break, Continue, Yield,
+    Assign, IndexAssign, KeyAssign, CompoundAssign, IncDec, Append, AppendPair,
+    ExprStatement, GlobalBlock, MainBlock, FunctionDef, Program,
+)
+from evaluator import BINARY_OPERATORS
+from resolver import UNSET, collect_assigned, created_in
+from tracer import statement_hook, traced_calls, traces_structure
+
+
+# Operadores que viram o operador Python correspondente; os demais chamam
+# a implementação compartilhada (concatenação, divisão por zero, etc.)
+_INLINE_OPERATORS = {"-", "*", "==", "!=", ">", "<", ">=", "<="}
+_COMPARISON_OPERATORS = {"==", "!=", ">", "<", ">=", "<="}
+_HELPER_OPERATORS = {"+": "_add", "/": "_divide", "%": "_modulo", "**": "_power"}
+
+
+# ---------------------------------------------------------------------------
+# Funções auxiliares usadas pelo código gerado
+# ---------------------------------------------------------------------------
+
+def _index(obj, index):
+    if isinstance(obj, QuokkaArray):
+        if isinstance(index, int):
+            return obj[index]
+        raise QuokkaError("Índice de array deve ser um número")
+    raise QuokkaError("Tentativa de acessar índice em não-array")
+
+def _key_access(obj, key):
+    if not isinstance(key, str):
+        key = str(key)
+    if isinstance(obj, QuokkaDict):
+        return obj[key]
+    raise QuokkaError("Tentativa de acessar chave em não-dicionário")
+
+def _store_index(obj, index, value, name, budget):
+    if isinstance(obj, QuokkaArray):
+        if isinstance(index, int):
+            # Verificado antes de o array ser expandido até o índice
+            if index >= budget.size_limit:
+                raise budget.collection_too_large(name)
+            obj[index] = value
+            return
+        raise QuokkaError("Índice de array deve ser um número")
+    raise QuokkaError(f"'{name}' não é um array")
+
+def _literal_too_large(collection, budget, kind):
+    raise budget.literal_too_large(kind)
+
+def _store_key(obj, key, value, name):
+    if isinstance(obj, QuokkaDict):
+        obj[key] = value
+        return
+    raise QuokkaError(f"'{name}' não é um dicionário")
+
+def _append_target(collection, name):
+    if isinstance(collection, (QuokkaArray, QuokkaDict)):
+        return collection
+    raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{name}' é {type(collection).__name__}")
+
+def _append(collection, value):
+    if isinstance(collection, QuokkaArray):
+        if isinstance(value, QuokkaArray):
+            collection.items.extend(value.items)
+        else:
+            collection.append(value)
+        return
+    if not isinstance(value, QuokkaDict):
+        raise QuokkaError("Sintaxe inválida para append em dicionário. Use: dict << ('chave' = valor) ou dict << { 'chave' = valor }")
+    for key, item in value.items.items():
+        collection[key] = item
+
+def _append_pair_target(collection, name):
+    if isinstance(collection, QuokkaDict):
+        return collection
+    if isinstance(collection, QuokkaArray):
+        # ('chave' = valor) não é uma expressão válida para arrays
+        raise QuokkaError("Esperado ')', encontrado '='")
+    raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{name}' é {type(collection).__name__}")
+
+def _check_number(value, operator, side):
+    if not isinstance(value, (int, float)):
+        if side is None:
+            raise QuokkaError(f"Operador {operator} só pode ser usado com números")
+        raise QuokkaError(f"Operador {operator} requer um número à {side}")
+    return value
+
+def _operator_error(operator, name, error):
+    return QuokkaError(f"Erro ao executar {operator} em '{name}': {str(error)}")
+
+
+def _runtime_namespace() -> Dict[str, object]:
+    """Nomes disponíveis para o módulo gerado (G, _call, _budget, _size_limit e _trace são ligados pelo PythonBackend)"""
+    return {
+        "UNSET": UNSET,
+        "QuokkaArray": QuokkaArray,
+        "QuokkaDict": QuokkaDict,
+        "QuokkaError": QuokkaError,
+        "BreakException": BreakException,
+        "ContinueException": ContinueException,
+        "YieldException": YieldException,
+        "_truthy": is_truthy,
+        "_str": quokka_to_string,
+        "_convert": convert_value,
+        "_each_items": each_items,
+        "_add": BINARY_OPERATORS["+"],
+        "_divide": BINARY_OPERATORS["/"],
+        "_modulo": BINARY_OPERATORS["%"],
+        "_power": BINARY_OPERATORS["**"],
+        "_index": _index,
+        "_key_access": _key_access,
+        "_store_index": _store_index,
+        "_literal_too_large": _literal_too_large,
+        "_store_key": _store_key,
+        "_append_target": _append_target,
+        "_append": _append,
+        "_append_pair_target": _append_pair_target,
+        "_check_number": _check_number,
+        "_operator_error": _operator_error,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Geração de código
+# ---------------------------------------------------------------------------
+
+class _Loop:
+    """Loop em geração: nomes a descartar ao fim de cada iteração, tipo e contador da iteração (tracer)"""
+    def __init__(self, resets: List[str], kind: str = "", counter: str = ""):
+        self.resets = resets
+        self.kind = kind
+        self.counter = counter
+
+
+class _Unit:
+    """
+    Estado de geração de uma função Python (global, main ou função Quokka).
+
+    Cada variável Quokka que pode ser local vira uma variável Python local,
+    iniciada com UNSET. Uma local UNSET significa "não existe neste escopo":
+    leituras e escritas caem para o escopo global (dicionário G), como na
+    cadeia de Environment dos outros motores.
+    """
+
+    def __init__(self, kind: str, local_names: Set[str], params: List[str] = ()):
+        self.kind = kind
+        self.lines: List[str] = []
+        self.indent = 1
+        self.depth = 0
+        self.loops: List[_Loop] = []
+        self.temp_count = 0
+        self.local_names = local_names
+        # Nomes que com certeza existem em um escopo local (parâmetros, variável do each)
+        self.definite: Set[str] = set(params)
+        self.python_names: Dict[str, str] = {}
+        taken = set()
+        for name in sorted(local_names):
+            python_name = "q_" + re.sub(r"\W", "_", name)
+            while python_name in taken:
+                python_name += "_"
+            taken.add(python_name)
+            self.python_names[name] = python_name
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.indent + line)
+
+    def temp(self, prefix: str = "_t") -> str:
+        self.temp_count += 1
+        return f"{prefix}{self.temp_count}"
+
+    @property
+    def at_global_scope(self) -> bool:
+        """No main fora de loops (e no bloco global) o escopo atual é o global"""
+        return self.kind != "function" and self.depth == 0
+
+
+def _contains_call(node) -> bool:
+    """Indica se algum nó da subárvore chama uma função (que pode lançar break/continue)"""
+    if isinstance(node, Call):
+        return True
+    if isinstance(node, Block):
+        return any(_contains_call(statement) for statement in node.statements)
+    if isinstance(node, Node):
+        for value in vars(node).values():
+            if isinstance(value, (Node, Block)) and _contains_call(value):
+                return True
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, tuple):
+                        item = item[-1]
+                    if isinstance(item, (Node, Block)) and _contains_call(item):
+                        return True
+    return False
+
+
+class QuokkaTranspiler:
+    """
+    Traduz a AST do Quokka para código-fonte Python.
+
+    Cada bloco global, função e main vira uma função Python; o resultado é
+    compilado com compile() e executado pelo PythonBackend. A semântica é a
+    mesma dos outros motores: + concatena via quokka_to_string, índices fora
+    do array devolvem null, yield retorna da função e cada iteração de loop
+    tem seu próprio escopo.
+    """
+
+    def __init__(self, trace_statements: bool = False, size_limit: int = sys.maxsize,
+                 trace_structure: bool = False):
+        self._function_count = 0
+        # Emite _trace(linha) antes de cada declaração
+        self.trace_statements = trace_statements
+        # Emite chamadas a _tracer para escopos, loops, atualizações e appends
+        self.trace_structure = trace_structure
+        # Limite de elementos por coleção do orçamento: literais maiores viram erro
+        self.size_limit = size_limit
+        self._statement_emitters = {
+            Print: self._emit_print,
+            If: self._emit_if,
+            While: self._emit_while,
+            Each: self._emit_each,
+            Break: self._emit_break,
+            Continue: self._emit_continue,
+            Yield: self._emit_yield,
+            Assign: self._emit_assign,
+            IndexAssign: self._emit_index_assign,
+            KeyAssign: self._emit_key_assign,
+            CompoundAssign: self._emit_compound_assign,
+            IncDec: self._emit_inc_dec,
+            Append: self._emit_append,
+            AppendPair: self._emit_append_pair,
+            ExprStatement: self._emit_expr_statement,
+        }
+        self._expression_translators = {
+            Literal: self._translate_literal,
+            Name: self._translate_name,
+            ArrayLiteral: self._translate_array,
+            DictLiteral: self._translate_dict,
+            BinaryOp: self._translate_binary,
+            Logical: self._translate_logical,
+            Index: self._translate_index,
+            KeyAccess: self._translate_key_access,
+            Call: self._translate_call,
+            Conversion: self._translate_conversion,
+            Prompt: self._translate_prompt,
+        }
+
+    # ------------------------------------------------------------------
+    # Itens de topo
+    # ------------------------------------------------------------------
+
+    def transpile_program(self, program: Program) -> Tuple[str, Dict[Node, str]]:
+        """Gera o módulo do programa inteiro; devolve o código e o nome Python de cada item"""
+        sections = ["# Módulo gerado pelo transpilador do Quokka"]
+        python_names: Dict[Node, str] = {}
+        for item in program.body:
+            if isinstance(item, GlobalBlock):
+                python_names[item], source = self.transpile_global(item)
+            elif isinstance(item, FunctionDef):
+                python_names[item], source = self.transpile_function(item)
+            elif isinstance(item, MainBlock):
+                python_names[item], source = self.transpile_main(item)
+            else:
+                continue
+            sections.append(source)
+        return "\n\n".join(sections) + "\n", python_names
+
+    def transpile_global(self, node: GlobalBlock) -> Tuple[str, str]:
+        python_name = self._next_name("qk_global")
+        unit = _Unit("global", set())
+        for var_name, expr in node.declarations:
+            value = self.translate(expr, unit) if expr is not None else "None"
+            unit.emit(f"G[{var_name!r}] = {value}")
+        return python_name, self._finish(python_name, [], unit)
+
+    def transpile_main(self, node: MainBlock) -> Tuple[str, str]:
+        python_name = self._next_name("qk_main")
+        local_names: Set[str] = set()
+        collect_assigned(node.body, False, local_names, loop_only=True)
+        unit = _Unit("main", local_names)
+        self._emit_locals(unit, [])
+        self.emit_block(node.body, unit)
+        return python_name, self._finish(python_name, [], unit)
+
+    def transpile_function(self, function: FunctionDef) -> Tuple[str, str]:
+        python_name = self._next_name("qk_fun_" + re.sub(r"\W", "_", function.name))
+        local_names = set(function.params)
+        collect_assigned(function.body, False, local_names, loop_only=False)
+        unit = _Unit("function", local_names, function.params)
+
+        params = [unit.python_names[param] for param in function.params]
+        if len(set(params)) != len(params):
+            # Parâmetros repetidos: o último valor vence, como no dicionário de parâmetros
+            arguments = [f"_p{index}" for index in range(len(params))]
+            for param, argument in zip(params, arguments):
+                unit.emit(f"{param} = {argument}")
+            params = arguments
+        self._emit_locals(unit, function.params)
+        if self.trace_structure:
+            context = f"função '{function.name}'"
+            unit.emit(f"_tracer.on_scope_enter({context!r})")
+            unit.emit("try:")
+            self._emit_body(function.body, unit)
+            unit.emit("finally:")
+            unit.emit(f"    _tracer.on_scope_exit({context!r})")
+        else:
+            self.emit_block(function.body, unit)
+        return python_name, self._finish(python_name, params, unit)
+
+    def _next_name(self, prefix: str) -> str:
+        self._function_count += 1
+        return f"{prefix}_{self._function_count}"
+
+    def _emit_locals(self, unit: _Unit, params: List[str]):
+        names = [unit.python_names[name] for name in sorted(unit.local_names) if name not in params]
+        if names:
+            unit.emit(" = ".join(names) + " = UNSET")
+
+    def _finish(self, python_name: str, params: List[str], unit: _Unit) -> str:
+        header = f"def {python_name}({', '.join(params)}):"
+        body = unit.lines or ["    pass"]
+        return "\n".join([header] + body)
+
+    # ------------------------------------------------------------------
+    # Variáveis
+    # ------------------------------------------------------------------
+
+    def _load(self, name: str, unit: _Unit) -> str:
+        if name in unit.definite:
+            return unit.python_names[name]
+        if name not in unit.local_names or unit.at_global_scope:
+            return f"G[{name!r}] if {name!r} in G else _undefined({name!r})"
+        local = unit.python_names[name]
+        return f"{local} if {local} is not UNSET else G[{name!r}] if {name!r} in G else _undefined({name!r})"
+
+    def _emit_store(self, name: str, value: str, unit: _Unit):
+        """Atribuição '=': atualiza a variável visível mais interna ou cria no escopo atual"""
+        if name in unit.definite:
+            unit.emit(f"{unit.python_names[name]} = {value}")
+        elif unit.at_global_scope:
+            unit.emit(f"G[{name!r}] = {value}")
+        else:
+            local = unit.python_names[name]
+            unit.emit(f"if {local} is UNSET and {name!r} in G:")
+            unit.emit(f"    G[{name!r}] = {value}")
+            unit.emit("else:")
+            unit.emit(f"    {local} = {value}")
+
+    def _emit_update(self, name: str, value: str, unit: _Unit):
+        """Atualiza uma variável que já se sabe existir (após uma leitura bem-sucedida)"""
+        if name in unit.definite:
+            unit.emit(f"{unit.python_names[name]} = {value}")
+        elif name not in unit.local_names or unit.at_global_scope:
+            unit.emit(f"G[{name!r}] = {value}")
+        else:
+            local = unit.python_names[name]
+            unit.emit(f"if {local} is UNSET:")
+            unit.emit(f"    G[{name!r}] = {value}")
+            unit.emit("else:")
+            unit.emit(f"    {local} = {value}")
+
+    # ------------------------------------------------------------------
+    # Declarações
+    # ------------------------------------------------------------------
+
+    def emit_block(self, block: Block, unit: _Unit):
+        start = len(unit.lines)
+        for statement in block.statements:
+            if self.trace_statements:
+                unit.emit(f"_trace({statement.line})")
+            self._statement_emitters[statement.__class__](statement, unit)
+        if len(unit.lines) == start:
+            unit.emit("pass")
+
+    def _emit_body(self, block: Block, unit: _Unit):
+        unit.indent += 1
+        self.emit_block(block, unit)
+        unit.indent -= 1
+
+    def _emit_print(self, node: Print, unit: _Unit):
+        if isinstance(node.value, Literal) and isinstance(node.value.value, str):
+            unit.emit(f"print({node.value.value!r})")
+        else:
+            unit.emit(f"print(_str({self.translate(node.value, unit)}))")
+
+    def _emit_if(self, node: If, unit: _Unit):
+        keyword = "if"
+        current = node
+        while True:
+            unit.emit(f"{keyword} {self.translate_condition(current.condition, unit)}:")
+            self._emit_body(current.body, unit)
+            orelse = current.orelse
+            if orelse is None:
+                return
+            if not isinstance(orelse, If):
+                unit.emit("else:")
+                self._emit_body(orelse, unit)
+                return
+            keyword = "elif"
+            current = orelse
+
+    def _emit_loop_resets(self, created: Set[str], unit: _Unit) -> Tuple[List[str], List[str]]:
+        """
+        Variáveis criadas no corpo de um loop pertencem ao escopo da iteração.
+        Devolve as linhas que marcam, antes do loop, quais delas ainda não existem
+        e as que as descartam ao fim de cada iteração.
+        """
+        setup, resets = [], []
+        for name in sorted(created):
+            if name in unit.definite:
+                continue
+            local = unit.python_names[name]
+            if unit.at_global_scope:
+                # No main fora de loops nenhuma variável local existe ainda
+                resets.append(f"{local} = UNSET")
+            else:
+                flag = unit.temp("_new")
+                setup.append(f"{flag} = {local} is UNSET")
+                resets.append(f"if {flag}: {local} = UNSET")
+        return setup, resets
+
+    def _emit_loop_body(self, body: Block, resets: List[str], unit: _Unit, step: bool = False,
+                        loop: Optional[_Loop] = None, prologue: List[str] = ()):
+        catches = _contains_call(body)
+        loop = loop or _Loop(resets)
+        unit.indent += 1
+        unit.depth += 1
+        unit.loops.append(loop)
+        if step:
+            self._emit_step(unit)
+        for line in prologue:
+            unit.emit(line)
+        if catches:
+            # break/continue lançados por funções chamadas dentro do loop
+            unit.emit("try:")
+            self._emit_body(body, unit)
+            for exception, keyword in (("BreakException", "break"), ("ContinueException", "continue")):
+                unit.emit(f"except {exception}:")
+                if self.trace_structure:
+                    unit.emit(f"    {self._loop_control(loop, keyword)}")
+                for line in resets:
+                    unit.emit("    " + line)
+                unit.emit(f"    {keyword}")
+        else:
+            self.emit_block(body, unit)
+        for line in resets:
+            unit.emit(line)
+        unit.loops.pop()
+        unit.depth -= 1
+        unit.indent -= 1
+
+    def _emit_step(self, unit: _Unit):
+        """Consome um passo do orçamento de execução (uma iteração de loop)"""
+        unit.emit("_budget.countdown -= 1")
+        unit.emit("if _budget.countdown <= 0: _budget.check()")
+
+    def _loop_control(self, loop: _Loop, keyword: str) -> str:
+        return f"_tracer.on_loop_control({loop.kind!r}, {keyword!r}, {loop.counter})"
+
+    def _emit_while(self, node: While, unit: _Unit):
+        setup, resets = self._emit_loop_resets(created_in(node.body), unit)
+        for line in setup:
+            unit.emit(line)
+        if self.trace_structure:
+            self._emit_traced_while(node, resets, unit)
+            return
+        unit.emit("while True:")
+        unit.indent += 1
+        self._emit_step(unit)
+        unit.emit(f"if not {self.translate_condition(node.condition, unit)}:")
+        unit.emit("    break")
+        unit.indent -= 1
+        self._emit_loop_body(node.body, resets, unit)
+
+    def _emit_traced_while(self, node: While, resets: List[str], unit: _Unit):
+        """while com tracer: escopo do loop, cada iteração (com o valor da condição) e erros"""
+        counter, condition = unit.temp("_count"), unit.temp()
+        unit.emit("_tracer.on_scope_enter('while loop')")
+        unit.emit(f"{counter} = 0")
+        unit.emit("try:")
+        unit.indent += 1
+        unit.emit("while True:")
+        unit.indent += 1
+        unit.emit(f"{counter} += 1")
+        self._emit_step(unit)
+        unit.emit(f"{condition} = {self.translate(node.condition, unit)}")
+        unit.emit(f"_tracer.on_loop_iteration('while', {counter}, {condition})")
+        unit.emit(f"if not _truthy({condition}):")
+        unit.emit("    break")
+        unit.indent -= 1
+        self._emit_loop_body(node.body, resets, unit, loop=_Loop(resets, "while", counter))
+        unit.indent -= 1
+        # yield no main sai do loop por exceção, sem ser um erro
+        unit.emit("except YieldException:")
+        unit.emit("    raise")
+        unit.emit("except Exception as _error:")
+        unit.emit(f"    _tracer.on_loop_error('while', {counter}, _error)")
+        unit.emit("    raise")
+        unit.emit("finally:")
+        unit.emit("    _tracer.on_scope_exit('while loop')")
+
+    def _emit_each(self, node: Each, unit: _Unit):
+        item_name = node.item
+        item = unit.python_names[item_name]
+        index = unit.python_names["__index__"]
+        collection = f"_each_items({self._load(node.collection, unit)}, {node.collection!r})"
+
+        created = created_in(node.body) - {item_name, "__index__"}
+        setup, resets = self._emit_loop_resets(created, unit)
+        for line in setup:
+            unit.emit(line)
+
+        # item e __index__ são definidos no escopo da iteração: os valores de fora
+        # são guardados e restaurados ao final do loop
+        saved_item, saved_index = unit.temp("_saved"), unit.temp("_saved")
+        unit.emit(f"{saved_item}, {saved_index} = {item}, {index}")
+        if item_name == "__index__":
+            unit.emit(f"for {index}, _ in enumerate({collection}):")
+        else:
+            unit.emit(f"for {index}, {item} in enumerate({collection}):")
+
+        outer_definite = unit.definite
+        unit.definite = outer_definite | {item_name, "__index__"}
+        if self.trace_structure:
+            traced_item = "_" if item_name == "__index__" else item
+            self._emit_loop_body(node.body, resets, unit, step=True, loop=_Loop(resets, "each", index),
+                                 prologue=[f"_tracer.on_loop_iteration('each', {index}, {traced_item}, {item_name!r})"])
+        else:
+            self._emit_loop_body(node.body, resets, unit, step=True)
+        unit.definite = outer_definite
+        unit.emit(f"{item}, {index} = {saved_item}, {saved_index}")
+
+    def _emit_break(self, node: Break, unit: _Unit):
+        self._emit_jump(unit, "break", "BreakException")
+
+    def _emit_continue(self, node: Continue, unit: _Unit):
+        self._emit_jump(unit, "continue", "ContinueException")
+
+    def _emit_jump(self, unit: _Unit, keyword: str, exception: str):
+        if not unit.loops:
+            # Fora de um loop: propaga até o loop de quem chamou a função
+            unit.emit(f"raise {exception}()")
+            return
+        if self.trace_structure:
+            unit.emit(self._loop_control(unit.loops[-1], keyword))
+        for line in unit.loops[-1].resets:
+            unit.emit(line)
+        unit.emit(keyword)
+
+    def _emit_yield(self, node: Yield, unit: _Unit):
+        value = self.translate(node.value, unit)
+        if unit.kind == "function":
+            unit.emit(f"return {value}")
+        else:
+            unit.emit(f"raise YieldException({value})")
+
+    def _emit_assign(self, node: Assign, unit: _Unit):
+        value = self.translate(node.value, unit)
+        if not isinstance(node.value, (Literal, Name)) and not unit.at_global_scope and node.name not in unit.definite:
+            temp = unit.temp()
+            unit.emit(f"{temp} = {value}")
+            value = temp
+        self._emit_store(node.name, value, unit)
+
+    def _emit_size_check(self, target: str, name: str, unit: _Unit):
+        """Erro se a coleção em target passou do limite de elementos do orçamento"""
+        unit.emit(f"if len({target}.items) > _size_limit: raise _budget.collection_too_large({name!r})")
+
+    def _emit_index_assign(self, node: IndexAssign, unit: _Unit):
+        target = unit.temp()
+        unit.emit(f"{target} = {self._load(node.name, unit)}")
+        unit.emit(f"_store_index({target}, {self.translate(node.index, unit)}, "
+                  f"{self.translate(node.value, unit)}, {node.name!r}, _budget)")
+
+    def _emit_key_assign(self, node: KeyAssign, unit: _Unit):
+        target = unit.temp()
+        unit.emit(f"{target} = {self._load(node.name, unit)}")
+        key = unit.temp()
+        unit.emit(f"{key} = {self.translate(node.key, unit)}")
+        unit.emit(f"_store_key({target}, {key} if {key}.__class__ is str else str({key}), "
+                  f"{self.translate(node.value, unit)}, {node.name!r})")
+        self._emit_size_check(target, node.name, unit)
+
+    def _emit_compound_assign(self, node: CompoundAssign, unit: _Unit):
+        name, operator = node.name, node.op
+        python_operator = "+" if operator == "+=" else "-"
+        current, value = unit.temp(), unit.temp()
+        # Com tracer, o operando é mantido para on_update
+        result = unit.temp() if self.trace_structure else value
+        unit.emit("try:")
+        unit.indent += 1
+        unit.emit(f"{current} = {self._load(name, unit)}")
+        unit.emit(f"{value} = {self.translate(node.value, unit)}")
+        unit.emit(f"{result} = _check_number({current}, {operator!r}, 'esquerda') {python_operator} "
+                  f"_check_number({value}, {operator!r}, 'direita')")
+        unit.indent -= 1
+        unit.emit("except Exception as _error:")
+        unit.emit(f"    raise _operator_error({operator!r}, {name!r}, _error)")
+        self._emit_update(name, result, unit)
+        if self.trace_structure:
+            unit.emit(f"_tracer.on_update({name!r}, {operator!r}, {value}, {current}, {result})")
+
+    def _emit_inc_dec(self, node: IncDec, unit: _Unit):
+        name, operator = node.name, node.op
+        python_operator = "+" if operator == "++" else "-"
+        value = unit.temp()
+        unit.emit("try:")
+        if self.trace_structure:
+            current = unit.temp()
+            unit.emit(f"    {current} = {self._load(name, unit)}")
+            unit.emit(f"    {value} = _check_number({current}, {operator!r}, None) {python_operator} 1")
+        else:
+            unit.emit(f"    {value} = _check_number({self._load(name, unit)}, {operator!r}, None) {python_operator} 1")
+        unit.emit("except Exception as _error:")
+        unit.emit(f"    raise _operator_error({operator!r}, {name!r}, _error)")
+        self._emit_update(name, value, unit)
+        if self.trace_structure:
+            unit.emit(f"_tracer.on_update({name!r}, {operator!r}, None, {current}, {value})")
+
+    def _emit_append(self, node: Append, unit: _Unit):
+        target = unit.temp()
+        unit.emit(f"{target} = _append_target({self._load(node.name, unit)}, {node.name!r})")
+        if not self.trace_structure:
+            unit.emit(f"_append({target}, {self.translate(node.value, unit)})")
+            self._emit_size_check(target, node.name, unit)
+            return
+        value = unit.temp()
+        unit.emit(f"{value} = {self.translate(node.value, unit)}")
+        unit.emit(f"_append({target}, {value})")
+        self._emit_size_check(target, node.name, unit)
+        unit.emit(f"_tracer.on_append({node.name!r}, {value})")
+
+    def _emit_append_pair(self, node: AppendPair, unit: _Unit):
+        target = unit.temp()
+        unit.emit(f"{target} = _append_pair_target({self._load(node.name, unit)}, {node.name!r})")
+        if not self.trace_structure:
+            unit.emit(f"{target}[{node.key!r}] = {self.translate(node.value, unit)}")
+            self._emit_size_check(target, node.name, unit)
+            return
+        value = unit.temp()
+        unit.emit(f"{value} = {self.translate(node.value, unit)}")
+        unit.emit(f"{target}[{node.key!r}] = {value}")
+        self._emit_size_check(target, node.name, unit)
+        unit.emit(f"_tracer.on_append({node.name!r}, {value}, {node.key!r})")
+
+    def _emit_expr_statement(self, node: ExprStatement, unit: _Unit):
+        if isinstance(node.expr, Literal):
+            return
+        unit.emit(f"({self.translate(node.expr, unit)})")
+
+    # ------------------------------------------------------------------
+    # Expressões
+    # ------------------------------------------------------------------
+
+    def translate(self, node: Node, unit: _Unit) -> str:
+        return self._expression_translators[node.__class__](node, unit)
+
+    def translate_condition(self, node: Node, unit: _Unit) -> str:
+        """Condição de if/while: comparações e operações lógicas já produzem bool"""
+        if (isinstance(node, BinaryOp) and node.op in _COMPARISON_OPERATORS) or isinstance(node, Logical):
+            return self.translate(node, unit)
+        return f"_truthy({self.translate(node, unit)})"
+
+    def _translate_literal(self, node: Literal, unit: _Unit) -> str:
+        text = repr(node.value)
+        return f"({text})" if text.startswith("-") else text
+
+    def _translate_name(self, node: Name, unit: _Unit) -> str:
+        return f"({self._load(node.name, unit)})"
+
+    def _translate_array(self, node: ArrayLiteral, unit: _Unit) -> str:
+        elements = ", ".join(self.translate(element, unit) for element in node.elements)
+        if len(node.elements) > self.size_limit:
+            return f"_literal_too_large(QuokkaArray([{elements}]), _budget, 'Array')"
+        return f"QuokkaArray([{elements}])"
+
+    def _translate_dict(self, node: DictLiteral, unit: _Unit) -> str:
+        pairs = ", ".join(f"{key!r}: {self.translate(expr, unit)}" for key, expr in node.pairs)
+        if len({str(key) for key, _ in node.pairs}) > self.size_limit:
+            return f"_literal_too_large(QuokkaDict({{{pairs}}}), _budget, 'Dicionário')"
+        return f"QuokkaDict({{{pairs}}})"
+
+    def _translate_binary(self, node: BinaryOp, unit: _Unit) -> str:
+        left = self.translate(node.left, unit)
+        right = self.translate(node.right, unit)
+        if node.op in _INLINE_OPERATORS:
+            return f"({left} {node.op} {right})"
+        return f"{_HELPER_OPERATORS[node.op]}({left}, {right})"
+
+    def _translate_logical(self, node: Logical, unit: _Unit) -> str:
+        # & e | avaliam os dois lados, como os outros motores (sem curto-circuito)
+        left = self.translate_condition(node.left, unit)
+        right = self.translate_condition(node.right, unit)
+        operator = "&" if node.op == "&&" else "|"
+        return f"({left} {operator} {right})"
+
+    def _translate_index(self, node: Index, unit: _Unit) -> str:
+        return f"_index({self.translate(node.obj, unit)}, {self.translate(node.index, unit)})"
+
+    def _translate_key_access(self, node: KeyAccess, unit: _Unit) -> str:
+        return f"_key_access({self.translate(node.obj, unit)}, {self.translate(node.key, unit)})"
+
+    def _translate_call(self, node: Call, unit: _Unit) -> str:
+        args = ", ".join(self.translate(arg, unit) for arg in node.args)
+        return f"_call({node.name!r}, [{args}])"
+
+    def _translate_conversion(self, node: Conversion, unit: _Unit) -> str:
+        return f"_convert({node.name!r}, {self.translate(node.arg, unit)})"
+
+    def _translate_prompt(self, node: Prompt, unit: _Unit) -> str:
+        return f"input(_str({self.translate(node.message, unit)}))"
+
+
+class PythonBackend:
+    """
+    Executor do backend Python (QuokkaInterpreter com engine="python").
+
+    O programa é traduzido para um módulo Python (QuokkaTranspiler), compilado
+    uma única vez com compile() e executado com exec(); funções de bibliotecas
+    são traduzidas na primeira chamada.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.functions = interpreter.functions
+        self.intrinsics = interpreter.intrinsics
+        self.global_env = interpreter.global_env
+        self.budget = interpreter.budget
+        # Chamadas de funções Quokka em andamento, comparadas com max_depth (budget.py)
+        self._call_depth = 0
+        # Rastreamento: chamadas envolvidas e _trace gerado só com tracer
+        on_statement = statement_hook(interpreter.tracer)
+        # Com memoização, _call consulta o cache antes de executar a função
+        if interpreter.memo is not None:
+            self.call_function = interpreter.memo.wrap(self.call_function)
+        if interpreter.tracer is not None:
+            self.call_function = traced_calls(self.call_function, interpreter.tracer)
+        self.transpiler = QuokkaTranspiler(trace_statements=on_statement is not None,
+                                           size_limit=self.budget.size_limit,
+                                           trace_structure=traces_structure(interpreter.tracer))
+        self.namespace = _runtime_namespace()
+        self.namespace["G"] = self.global_env.variables
+        self.namespace["_call"] = self.call_function
+        self.namespace["_trace"] = on_statement
+        self.namespace["_tracer"] = interpreter.tracer
+        self.namespace["_undefined"] = _undefined
+        self.namespace["_budget"] = self.budget
+        self.namespace["_size_limit"] = self.budget.size_limit
+        # Função Python gerada para cada item de topo (global, main e funções)
+        self._compiled: Dict[Node, object] = {}
+
+    def prepare(self, program: Program):
+        """Traduz e compila o programa inteiro antes da execução"""
+        source, python_names = self.transpiler.transpile_program(program)
+        self._exec(source, "<quokka>")
+        for node, python_name in python_names.items():
+            self._compiled[node] = self.namespace[python_name]
+
+    def _exec(self, source: str, filename: str):
+        exec(compile(source, filename, "exec"), self.namespace)
+
+    def _compile_item(self, node: Node, translate) -> object:
+        compiled = self._compiled.get(node)
+        if compiled is None:
+            python_name, source = translate(node)
+            self._exec(source, "<quokka>")
+            compiled = self._compiled[node] = self.namespace[python_name]
+        return compiled
+
+    def run_global(self, node: GlobalBlock):
+        """Define as variáveis do bloco global"""
+        self._compile_item(node, self.transpiler.transpile_global)()
+
+    def run_main(self, node: MainBlock):
+        """Executa o bloco main no escopo global"""
+        self._compile_item(node, self.transpiler.transpile_main)()
+
+    def call_function(self, func_name: str, args: List[QuokkaValue]) -> QuokkaValue:
+        """Executa uma chamada de função"""
+        function = self.functions.get(func_name)
+        if function is None:
+            raise QuokkaError(f"Função '{func_name}' não definida")
+
+        if len(args) != len(function.params):
+            raise QuokkaError(f"Função '{func_name}' espera {len(function.params)} argumentos, recebeu {len(args)}")
+
+        # Cada chamada consome um passo do orçamento, inclusive as respondidas pela intrínseca
+        budget = self.budget
+        budget.countdown -= 1
+        if budget.countdown <= 0:
+            budget.check()
+
+        # Implementação nativa da biblioteca, se houver
+        native = self.intrinsics.get(func_name)
+        if native is not None:
+            result = call_intrinsic(native, args)
+            if result is not NotImplemented:
+                return result
+
+        compiled = self._compile_item(function, self.transpiler.transpile_function)
+        if self._call_depth >= budget.depth_limit:
+            raise budget.recursion_too_deep()
+        self._call_depth += 1
+        try:
+            return compiled(*args)
+        finally:
+            self._call_depth -= 1
+
+
+def _undefined(name: str):
+    raise QuokkaError(f"Variável '{name}' não definida")
+
+
+def transpile_program(program: Program) -> str:
+    """Código Python gerado para um programa (usado por main.py --dump-python)"""
+    return QuokkaTranspiler().transpile_program(program)[0]
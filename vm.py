@@ -0,0 +1,574 @@
+from typing import Dict, List
+
+from runtime import (
+    QuokkaArray, QuokkaDict, QuokkaValue, QuokkaError,
+    BreakException, ContinueException, YieldException, Environment,
+    is_truthy, quokka_to_string, convert_value, call_intrinsic, each_items,
+)
+from ast_nodes import GlobalBlock, MainBlock, FunctionDef
+from evaluator import BINARY_OPERATORS
+from bytecode import (
+    CodeObject, BytecodeCompiler,
+    LOAD_CONST, LOAD_NAME, STORE_NAME, DEFINE_NAME, POP_TOP,
+    BINARY_ADD, BINARY_SUB, BINARY_MUL, BINARY_DIV, BINARY_MOD, BINARY_POW,
+    COMPARE_EQ, COMPARE_NE, COMPARE_GT, COMPARE_LT, COMPARE_GE, COMPARE_LE,
+    LOGICAL_AND, LOGICAL_OR, JUMP, POP_JUMP_IF_FALSE,
+    BUILD_ARRAY, BUILD_DICT, INDEX, KEY_ACCESS, STORE_INDEX, STORE_KEY, APPEND, APPEND_PAIR,
+    INPLACE_ADD, INPLACE_SUB, INCREMENT, DECREMENT,
+    CALL, TAIL_CALL, CONVERT, PROMPT, PRINT, RETURN_VALUE, ENTER_SCOPE, EXIT_SCOPE, RESET_SCOPE,
+    WHILE_TICK, EACH_SETUP, EACH_NEXT, RAISE_BREAK, RAISE_CONTINUE,
+    RAISE_YIELD, TRACE_LINE, DUP_TOP, DUP_TOP_TWO, ROT_THREE,
+    TRACE_SCOPE_ENTER, TRACE_SCOPE_EXIT, TRACE_WHILE_COUNT, TRACE_WHILE, TRACE_EACH,
+    TRACE_LOOP_CONTROL, TRACE_UPDATE, TRACE_APPEND,
+)
+from tracer import statement_hook, traces_structure
+
+_add = BINARY_OPERATORS["+"]
+_divide = BINARY_OPERATORS["/"]
+_modulo = BINARY_OPERATORS["%"]
+_power = BINARY_OPERATORS["**"]
+
+
+def _error_prefix(code: CodeObject, position: int):
+    """Prefixo da região de erros ("x += expr") que contém a instrução em position, ou None"""
+    for start, end, prefix in code.error_wrappers:
+        if start <= position < end:
+            return prefix
+    return None
+
+
+def _find_loop_handler(code: CodeObject, position: int):
+    """Loop mais interno cujo corpo contém a instrução em position, ou None"""
+    for handler in code.loop_handlers:
+        if handler[0] <= position < handler[1]:
+            return handler
+    return None
+
+
+class QuokkaVM:
+    """
+    Máquina virtual de pilha para o bytecode do Quokka (QuokkaInterpreter com engine="vm").
+
+    while, if/else if e each viram saltos no bytecode: nada é re-analisado nem
+    pulado contando chaves durante a execução. Os escopos continuam sendo
+    Environment, com as mesmas regras dos outros motores.
+
+    Chamadas de funções Quokka não aninham chamadas Python: o quadro de quem
+    chama (código, posição, pilha e escopos) vai para uma lista no heap e o
+    laço de despacho continua no corpo da função chamada, de modo que a
+    profundidade da recursão só é limitada por max_depth (budget.py). Em
+    yield(f(...)) fora de loops (TAIL_CALL) a função chamada ocupa o quadro
+    da atual. Com memoização ou tracer os quadros continuam no heap: o cache
+    é consultado ao entrar na função e preenchido no RETURN_VALUE, e
+    on_call/on_return são avisados nos mesmos pontos (e a cada quadro
+    descartado por um erro); nesse caso não há TAIL_CALL.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.functions = interpreter.functions
+        self.intrinsics = interpreter.intrinsics
+        self.global_env = interpreter.global_env
+        self.budget = interpreter.budget
+        # Rastreamento: chamadas envolvidas, e TRACE_LINE e os avisos de escopos, loops
+        # e alterações compilados só quando o tracer os trata
+        self._on_statement = statement_hook(interpreter.tracer)
+        self.tracer = interpreter.tracer if traces_structure(interpreter.tracer) else None
+        # Memoização e on_call/on_return, tratados na entrada e na saída de cada quadro.
+        # O tracer fica por fora da memoização: também vê as chamadas respondidas pelo cache
+        self.memo = interpreter.memo
+        self.call_tracer = interpreter.tracer
+        self._call_hooks = self.memo is not None or self.call_tracer is not None
+        self.compiler = BytecodeCompiler(trace_statements=self._on_statement is not None,
+                                         trace_structure=self.tracer is not None,
+                                         tail_calls=not self._call_hooks)
+        # Bytecode de cada função, compilado na primeira chamada
+        self._compiled_functions: Dict[FunctionDef, CodeObject] = {}
+
+    # ------------------------------------------------------------------
+    # Itens de topo
+    # ------------------------------------------------------------------
+
+    def run_global(self, node: GlobalBlock):
+        """Define as variáveis do bloco global"""
+        for var_name, expr in node.declarations:
+            value = None
+            if expr is not None:
+                value = self.run(self.compiler.compile_expression_unit(expr, f"<global {var_name}>"), self.global_env)
+            self.global_env.define(var_name, value)
+
+    def run_main(self, node: MainBlock):
+        """Compila e executa o bloco main no escopo global"""
+        self.run(self.compiler.compile_main(node), self.global_env)
+
+    def call_function(self, func_name: str, args: List[QuokkaValue]) -> QuokkaValue:
+        """Executa uma chamada vinda de fora do bytecode em uma nova execução do laço"""
+        if not self._call_hooks:
+            code, env = self._enter_function(func_name, args)
+            return env if code is None else self.run(code, env)
+        code, env, call = self._enter_hooked(func_name, args)
+        if code is None:
+            return env
+        try:
+            value = self.run(code, env)
+        except BaseException:
+            self._abandon_call(call)
+            raise
+        self._leave_call(call, value)
+        return value
+
+    def _enter_hooked(self, func_name: str, args: List[QuokkaValue]):
+        """
+        _enter_function com memoização e on_call: (None, resultado, None) se o
+        cache ou a implementação nativa respondeu, ou (bytecode, escopo local,
+        chamada em andamento), a concluir com _leave_call ou _abandon_call
+        """
+        tracer = self.call_tracer
+        memo = self.memo
+        if tracer is not None:
+            tracer.on_call(func_name, args)
+        try:
+            entry = None
+            if memo is not None:
+                found, entry = memo.lookup(func_name, args)
+                if found:
+                    if tracer is not None:
+                        tracer.on_return(func_name, entry)
+                    return None, entry, None
+            code, env = self._enter_function(func_name, args)
+        except BaseException:
+            if tracer is not None:
+                tracer.on_return(func_name, None)
+            raise
+        call = (func_name, entry)
+        if code is None:
+            self._leave_call(call, env)
+        return code, env, call
+
+    def _leave_call(self, call: tuple, value: QuokkaValue):
+        """Fim de uma chamada iniciada por _enter_hooked: guarda o resultado no cache e avisa on_return"""
+        func_name, entry = call
+        if entry is not None:
+            self.memo.store(entry, value)
+        if self.call_tracer is not None:
+            self.call_tracer.on_return(func_name, value)
+
+    def _abandon_call(self, call: tuple):
+        """Chamada iniciada por _enter_hooked interrompida por um erro"""
+        if self.call_tracer is not None:
+            self.call_tracer.on_return(call[0], None)
+
+    def _enter_function(self, func_name: str, args: List[QuokkaValue]):
+        """
+        Prepara uma chamada: (None, resultado) se a implementação nativa
+        respondeu, ou (bytecode da função, escopo local com os parâmetros)
+        """
+        function = self.functions.get(func_name)
+        if function is None:
+            raise QuokkaError(f"Função '{func_name}' não definida")
+
+        params = function.params
+        if len(args) != len(params):
+            raise QuokkaError(f"Função '{func_name}' espera {len(params)} argumentos, recebeu {len(args)}")
+
+        # Cada chamada consome um passo do orçamento, inclusive as respondidas pela intrínseca
+        budget = self.budget
+        budget.countdown -= 1
+        if budget.countdown <= 0:
+            budget.check()
+
+        # Implementação nativa da biblioteca, se houver
+        native = self.intrinsics.get(func_name)
+        if native is not None:
+            result = call_intrinsic(native, args)
+            if result is not NotImplemented:
+                return None, result
+
+        code = self._compiled_functions.get(function)
+        if code is None:
+            code = self._compiled_functions[function] = self.compiler.compile_function(function)
+
+        # Funções só veem globais + parâmetros; o corpo roda em um escopo local
+        func_env = Environment(self.global_env)
+        func_env.variables.update(zip(params, args))
+        return code, Environment(func_env)
+
+    def _trace_loop_control(self, handler: tuple, error: Exception, stack: List[QuokkaValue], env: Environment):
+        """Aviso on_loop_control para um break/continue vindo de uma função chamada no corpo do loop"""
+        kind = handler[6]
+        statement = "break" if isinstance(error, BreakException) else "continue"
+        iteration = stack[handler[3] - 1] if kind == "while" else env.get("__index__")
+        self.tracer.on_loop_control(kind, statement, iteration)
+
+    def _trace_unwind(self, code: CodeObject, failed_at: int, stack: List[QuokkaValue], error: Exception):
+        """Avisos de um erro que sai da unidade: on_loop_error e on_scope_exit dos while e on_scope_exit da função"""
+        tracer = self.tracer
+        for start, end, counter in code.traced_whiles:
+            if start <= failed_at < end:
+                tracer.on_loop_error("while", stack[counter], error)
+                tracer.on_scope_exit("while loop")
+        if code.scope_context is not None:
+            tracer.on_scope_exit(code.scope_context)
+
+    # ------------------------------------------------------------------
+    # Laço de despacho
+    # ------------------------------------------------------------------
+
+    def run(self, code: CodeObject, env: Environment) -> QuokkaValue:
+        """Executa um CodeObject até RETURN_VALUE e devolve o valor retornado"""
+        instructions = code.code
+        consts = code.consts
+        names = code.names
+        stack: List[QuokkaValue] = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        budget = self.budget
+        size_limit = budget.size_limit
+        depth_limit = budget.depth_limit
+        call_hooks = self._call_hooks
+
+        # Escopo em que a unidade começou (profundidade 0 dos escopos de loop)
+        base_env = env
+        # Chamada em andamento no quadro atual, vinda de _enter_hooked (None sem memoização nem tracer)
+        call = None
+        # Quadros de quem chamou as funções em andamento: variáveis do laço de despacho
+        # (código, instruções, constantes, nomes, pilha, push, pop, pc, escopo, escopo base, chamada)
+        frames: List[tuple] = []
+
+        while True:
+            # Os ramos estão ordenados pela frequência típica de execução dos opcodes
+            try:
+                while True:
+                    opcode = instructions[pc]
+                    arg = instructions[pc + 1]
+                    pc += 2
+
+                    if opcode == LOAD_NAME:
+                        push(env.get(names[arg]))
+                    elif opcode == LOAD_CONST:
+                        push(consts[arg])
+                    elif opcode == STORE_NAME:
+                        env.set(names[arg], pop())
+                    elif opcode == POP_JUMP_IF_FALSE:
+                        if not is_truthy(pop()):
+                            pc = arg
+                    elif opcode == JUMP:
+                        pc = arg
+                    elif opcode == ENTER_SCOPE:
+                        env = Environment(env)
+                    elif opcode == EXIT_SCOPE:
+                        env = env.parent
+                        for _ in range(arg - 1):
+                            env = env.parent
+                    elif opcode == RESET_SCOPE:
+                        variables = env.variables
+                        while len(variables) > arg:
+                            variables.popitem()
+                    elif opcode == DEFINE_NAME:
+                        env.variables[names[arg]] = pop()
+                    elif opcode == EACH_NEXT:
+                        step = next(stack[-1], None)
+                        if step is None:
+                            pop()
+                            pc = arg
+                        else:
+                            budget.countdown -= 1
+                            if budget.countdown <= 0:
+                                budget.check()
+                            push(step[0])
+                            push(step[1])
+                    elif opcode == CALL:
+                        func_name, argc = consts[arg]
+                        if argc:
+                            args = stack[-argc:]
+                            del stack[-argc:]
+                        else:
+                            args = []
+                        if call_hooks:
+                            callee, value, entered = self._enter_hooked(func_name, args)
+                        else:
+                            callee, value = self._enter_function(func_name, args)
+                            entered = None
+                        if callee is None:
+                            push(value)
+                            continue
+                        if len(frames) >= depth_limit:
+                            if entered is not None:
+                                self._abandon_call(entered)
+                            raise budget.recursion_too_deep()
+                        frames.append((code, instructions, consts, names, stack, push, pop, pc, env, base_env, call))
+                        call = entered
+                        code = callee
+                        instructions = code.code
+                        consts = code.consts
+                        names = code.names
+                        stack = []
+                        push = stack.append
+                        pop = stack.pop
+                        pc = 0
+                        env = base_env = value
+                    elif opcode == RETURN_VALUE:
+                        value = pop()
+                        if not frames:
+                            return value
+                        if call is not None:
+                            self._leave_call(call, value)
+                        code, instructions, consts, names, stack, push, pop, pc, env, base_env, call = frames.pop()
+                        push(value)
+                    elif opcode == BINARY_ADD:
+                        right = pop()
+                        stack[-1] = _add(stack[-1], right)
+                    elif opcode == COMPARE_LT:
+                        right = pop()
+                        stack[-1] = stack[-1] < right
+                    elif opcode == COMPARE_EQ:
+                        right = pop()
+                        stack[-1] = stack[-1] == right
+                    elif opcode == BINARY_MOD:
+                        right = pop()
+                        stack[-1] = _modulo(stack[-1], right)
+                    elif opcode == INCREMENT or opcode == DECREMENT:
+                        current_value = pop()
+                        if not isinstance(current_value, (int, float)):
+                            operator = "++" if opcode == INCREMENT else "--"
+                            raise QuokkaError(f"Operador {operator} só pode ser usado com números")
+                        env.set(names[arg], current_value + 1 if opcode == INCREMENT else current_value - 1)
+                    elif opcode == INPLACE_ADD or opcode == INPLACE_SUB:
+                        expression_value = pop()
+                        current_value = pop()
+                        operator = "+=" if opcode == INPLACE_ADD else "-="
+                        if not isinstance(current_value, (int, float)):
+                            raise QuokkaError(f"Operador {operator} requer um número à esquerda")
+                        if not isinstance(expression_value, (int, float)):
+                            raise QuokkaError(f"Operador {operator} requer um número à direita")
+                        if opcode == INPLACE_ADD:
+                            env.set(names[arg], current_value + expression_value)
+                        else:
+                            env.set(names[arg], current_value - expression_value)
+                    elif opcode == WHILE_TICK:
+                        budget.countdown -= 1
+                        if budget.countdown <= 0:
+                            budget.check()
+                    elif opcode == KEY_ACCESS:
+                        key = pop()
+                        obj = stack[-1]
+                        if not isinstance(key, str):
+                            key = str(key)
+                        if not isinstance(obj, QuokkaDict):
+                            raise QuokkaError("Tentativa de acessar chave em não-dicionário")
+                        stack[-1] = obj[key]
+                    elif opcode == INDEX:
+                        index = pop()
+                        obj = stack[-1]
+                        if not isinstance(obj, QuokkaArray):
+                            raise QuokkaError("Tentativa de acessar índice em não-array")
+                        if not isinstance(index, int):
+                            raise QuokkaError("Índice de array deve ser um número")
+                        stack[-1] = obj[index]
+                    elif opcode == BINARY_SUB:
+                        right = pop()
+                        stack[-1] = stack[-1] - right
+                    elif opcode == BINARY_MUL:
+                        right = pop()
+                        stack[-1] = stack[-1] * right
+                    elif opcode == COMPARE_GT:
+                        right = pop()
+                        stack[-1] = stack[-1] > right
+                    elif opcode == COMPARE_GE:
+                        right = pop()
+                        stack[-1] = stack[-1] >= right
+                    elif opcode == COMPARE_LE:
+                        right = pop()
+                        stack[-1] = stack[-1] <= right
+                    elif opcode == COMPARE_NE:
+                        right = pop()
+                        stack[-1] = stack[-1] != right
+                    elif opcode == BINARY_DIV:
+                        right = pop()
+                        stack[-1] = _divide(stack[-1], right)
+                    elif opcode == BINARY_POW:
+                        right = pop()
+                        stack[-1] = _power(stack[-1], right)
+                    elif opcode == LOGICAL_AND:
+                        right = is_truthy(pop())
+                        stack[-1] = is_truthy(stack[-1]) and right
+                    elif opcode == LOGICAL_OR:
+                        right = is_truthy(pop())
+                        stack[-1] = is_truthy(stack[-1]) or right
+                    elif opcode == EACH_SETUP:
+                        collection_name = names[arg]
+                        push(enumerate(each_items(env.get(collection_name), collection_name)))
+                    elif opcode == BUILD_ARRAY:
+                        if arg:
+                            items = stack[-arg:]
+                            del stack[-arg:]
+                        else:
+                            items = []
+                        if arg > size_limit:
+                            raise budget.literal_too_large("Array")
+                        push(QuokkaArray(items))
+                    elif opcode == BUILD_DICT:
+                        keys = consts[arg]
+                        if keys:
+                            values = stack[-len(keys):]
+                            del stack[-len(keys):]
+                        else:
+                            values = []
+                        dictionary = QuokkaDict(dict(zip(keys, values)))
+                        if len(dictionary.items) > size_limit:
+                            raise budget.literal_too_large("Dicionário")
+                        push(dictionary)
+                    elif opcode == APPEND:
+                        value = pop()
+                        collection = pop()
+                        if isinstance(collection, QuokkaArray):
+                            if isinstance(value, QuokkaArray):
+                                collection.items.extend(value.items)
+                            else:
+                                collection.items.append(value)
+                        elif isinstance(collection, QuokkaDict):
+                            if not isinstance(value, QuokkaDict):
+                                raise QuokkaError("Sintaxe inválida para append em dicionário. Use: dict << ('chave' = valor) ou dict << { 'chave' = valor }")
+                            for key, item in value.items.items():
+                                collection[key] = item
+                        else:
+                            raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{names[arg]}' é {type(collection).__name__}")
+                        if len(collection.items) > size_limit:
+                            raise budget.collection_too_large(names[arg])
+                    elif opcode == APPEND_PAIR:
+                        var_name, key = consts[arg]
+                        value = pop()
+                        collection = pop()
+                        if isinstance(collection, QuokkaDict):
+                            collection[key] = value
+                            if len(collection.items) > size_limit:
+                                raise budget.collection_too_large(var_name)
+                        elif isinstance(collection, QuokkaArray):
+                            raise QuokkaError("Esperado ')', encontrado '='")
+                        else:
+                            raise QuokkaError(f"Operador '<<' só funciona com arrays ou dicionários. '{var_name}' é {type(collection).__name__}")
+                    elif opcode == STORE_INDEX:
+                        value = pop()
+                        index = pop()
+                        obj = pop()
+                        if not isinstance(obj, QuokkaArray):
+                            raise QuokkaError(f"'{names[arg]}' não é um array")
+                        if not isinstance(index, int):
+                            raise QuokkaError("Índice de array deve ser um número")
+                        # Verificado antes de o array ser expandido até o índice
+                        if index >= size_limit:
+                            raise budget.collection_too_large(names[arg])
+                        obj[index] = value
+                    elif opcode == STORE_KEY:
+                        value = pop()
+                        key = pop()
+                        obj = pop()
+                        if not isinstance(key, str):
+                            key = str(key)
+                        if not isinstance(obj, QuokkaDict):
+                            raise QuokkaError(f"'{names[arg]}' não é um dicionário")
+                        obj[key] = value
+                        if len(obj.items) > size_limit:
+                            raise budget.collection_too_large(names[arg])
+                    elif opcode == PRINT:
+                        print(quokka_to_string(pop()))
+                    elif opcode == POP_TOP:
+                        pop()
+                    elif opcode == CONVERT:
+                        stack[-1] = convert_value(names[arg], stack[-1])
+                    elif opcode == PROMPT:
+                        stack[-1] = input(quokka_to_string(stack[-1]))
+                    elif opcode == RAISE_BREAK:
+                        raise BreakException()
+                    elif opcode == RAISE_CONTINUE:
+                        raise ContinueException()
+                    elif opcode == RAISE_YIELD:
+                        raise YieldException(pop())
+                    elif opcode == TAIL_CALL:
+                        func_name, argc = consts[arg]
+                        if argc:
+                            args = stack[-argc:]
+                            del stack[-argc:]
+                        else:
+                            args = []
+                        # Sem quadro novo, o RETURN_VALUE seguinte devolve o resultado
+                        callee, value = self._enter_function(func_name, args)
+                        if callee is None:
+                            push(value)
+                            continue
+                        code = callee
+                        instructions = code.code
+                        consts = code.consts
+                        names = code.names
+                        stack = []
+                        push = stack.append
+                        pop = stack.pop
+                        pc = 0
+                        env = base_env = value
+                    elif opcode == TRACE_LINE:
+                        self._on_statement(arg)
+                    elif opcode == DUP_TOP:
+                        push(stack[-1])
+                    elif opcode == DUP_TOP_TWO:
+                        stack.extend(stack[-2:])
+                    elif opcode == ROT_THREE:
+                        stack.insert(-2, pop())
+                    elif opcode == TRACE_WHILE_COUNT:
+                        stack[-1] += 1
+                    elif opcode == TRACE_WHILE:
+                        self.tracer.on_loop_iteration("while", stack[-2], stack[-1])
+                    elif opcode == TRACE_EACH:
+                        self.tracer.on_loop_iteration("each", stack[-2], stack[-1], names[arg])
+                    elif opcode == TRACE_LOOP_CONTROL:
+                        kind, statement = consts[arg]
+                        # O while guarda o número da iteração no topo da pilha entre as declarações
+                        iteration = stack[-1] if kind == "while" else env.get("__index__")
+                        self.tracer.on_loop_control(kind, statement, iteration)
+                    elif opcode == TRACE_UPDATE:
+                        var_name, operator, has_operand = consts[arg]
+                        operand = pop() if has_operand else None
+                        self.tracer.on_update(var_name, operator, operand, pop(), env.get(var_name))
+                    elif opcode == TRACE_APPEND:
+                        var_name, key = consts[arg]
+                        self.tracer.on_append(var_name, pop(), key)
+                    elif opcode == TRACE_SCOPE_ENTER:
+                        self.tracer.on_scope_enter(consts[arg])
+                    elif opcode == TRACE_SCOPE_EXIT:
+                        self.tracer.on_scope_exit(consts[arg])
+                    else:
+                        raise QuokkaError(f"Opcode desconhecido: {opcode}")
+
+            except Exception as e:
+                # O erro sobe pelos quadros do heap como subiria pelas chamadas Python
+                error = e
+                while True:
+                    failed_at = pc - 2
+                    # Regiões como "x += expr" reapresentam qualquer erro com o prefixo do operador
+                    prefix = _error_prefix(code, failed_at)
+                    if prefix is not None:
+                        error = QuokkaError(f"{prefix}{str(error)}")
+                    elif isinstance(error, (BreakException, ContinueException)):
+                        # break/continue fora de loop dentro de uma função chamada no corpo de um loop
+                        handler = _find_loop_handler(code, failed_at)
+                        if handler is not None:
+                            if self.tracer is not None:
+                                self._trace_loop_control(handler, error, stack, env)
+                            break
+                    if self.tracer is not None and not isinstance(error, YieldException):
+                        self._trace_unwind(code, failed_at, stack, error)
+                    if call is not None:
+                        self._abandon_call(call)
+                    if not frames:
+                        raise error
+                    code, instructions, consts, names, stack, push, pop, pc, env, base_env, call = frames.pop()
+                _, _, scope_depth, stack_height, break_target, continue_target, _ = handler
+                depth = 0
+                scope = env
+                while scope is not base_env:
+                    scope = scope.parent
+                    depth += 1
+                for _ in range(depth - scope_depth):
+                    env = env.parent
+                del stack[stack_height:]
+                pc = break_target if isinstance(error, BreakException) else continue_target